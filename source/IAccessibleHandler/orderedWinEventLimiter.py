@@ -1,5 +1,4 @@
-from typing import Optional, List
-import heapq
+from typing import Dict, Optional, List, Tuple
 import itertools
 
 import winUser
@@ -18,6 +17,35 @@ MENU_EVENTIDS = (
 )
 
 
+_WinEventKeyT = Tuple[int, int, int, int, int]
+"""eventID, window, objectID, childID, threadID"""
+_CountedWinEventT = Tuple[int, int, int, int, int, int]
+"""The counter of the winEvent, followed by its L{_WinEventKeyT}"""
+
+
+def _mergeByCounter(
+		first: List[_CountedWinEventT],
+		second: List[_CountedWinEventT],
+) -> List[_CountedWinEventT]:
+	"""Merges two lists of counted winEvents which are each in counter order into one list in counter order."""
+	if not second:
+		return first
+	if not first:
+		return second
+	merged = []
+	secondIter = iter(second)
+	secondItem = next(secondIter)
+	for item in first:
+		while secondItem is not None and secondItem < item:
+			merged.append(secondItem)
+			secondItem = next(secondIter, None)
+		merged.append(item)
+	if secondItem is not None:
+		merged.append(secondItem)
+		merged.extend(secondIter)
+	return merged
+
+
 class OrderedWinEventLimiter(object):
 	"""Collects and limits winEvents based on whether they are focus changes,
 	or just generic (all other ones).
@@ -27,6 +55,11 @@ class OrderedWinEventLimiter(object):
 	Only allow one event for one specific object at a time:
 	- though push it further forward in time if a duplicate tries to get added.
 	- This is true for both generic and focus events.
+
+	Events are kept in dictionaries in the order in which they were last added,
+	and the number of generic events for each thread is counted as they are added.
+	Therefore, flushing the events only requires merging these in order,
+	and only has to count events per thread if a thread exceeded L{MAX_WINEVENTS_PER_THREAD}.
 	"""
 
 	def __init__(self, maxFocusItems=4):
@@ -35,11 +68,24 @@ class OrderedWinEventLimiter(object):
 		@type maxFocusItems: integer
 		"""
 		self.maxFocusItems = maxFocusItems
-		self._focusEventCache = {}
-		self._genericEventCache = {}
-		self._eventHeap = []
+		self._focusEventCache: Dict[_WinEventKeyT, int] = {}
+		self._genericEventCache: Dict[_WinEventKeyT, int] = {}
+		self._genericEventCountsPerThread: Dict[int, int] = {}
 		self._eventCounter = itertools.count()
-		self._lastMenuEvent = None
+		self._lastMenuEvent: Optional[_CountedWinEventT] = None
+
+	def _addGenericEvent(self, key: _WinEventKeyT) -> None:
+		"""Adds an event to the generic event cache, replacing an existing event for the same object.
+		The existing event is removed first, so that the cache stays in the order in which events were added.
+		"""
+		if self._genericEventCache.pop(key, None) is None:
+			threadID = key[-1]
+			self._genericEventCountsPerThread[threadID] = self._genericEventCountsPerThread.get(threadID, 0) + 1
+		self._genericEventCache[key] = next(self._eventCounter)
+
+	def _removeGenericEvent(self, key: _WinEventKeyT) -> None:
+		if self._genericEventCache.pop(key, None) is not None:
+			self._genericEventCountsPerThread[key[-1]] -= 1
 
 	def addEvent(
 			self,
@@ -61,65 +107,88 @@ class OrderedWinEventLimiter(object):
 			if objectID in (winUser.OBJID_SYSMENU, winUser.OBJID_MENU) and childID == 0:
 				# This is a focus event on a menu bar itself, which is just silly. Ignore it.
 				return False
-			self._focusEventCache[(eventID, window, objectID, childID, threadID)] = next(self._eventCounter)
+			key = (eventID, window, objectID, childID, threadID)
+			self._focusEventCache.pop(key, None)
+			self._focusEventCache[key] = next(self._eventCounter)
 			return True
 		elif eventID == winUser.EVENT_SYSTEM_FOREGROUND:
 			self._focusEventCache.pop((winUser.EVENT_OBJECT_FOCUS, window, objectID, childID, threadID), None)
-			self._focusEventCache[(eventID, window, objectID, childID, threadID)] = next(self._eventCounter)
+			key = (eventID, window, objectID, childID, threadID)
+			self._focusEventCache.pop(key, None)
+			self._focusEventCache[key] = next(self._eventCounter)
 		elif eventID == winUser.EVENT_OBJECT_SHOW:
-			k = (winUser.EVENT_OBJECT_HIDE, window, objectID, childID, threadID)
-			if k in self._genericEventCache:
-				del self._genericEventCache[k]
+			self._removeGenericEvent((winUser.EVENT_OBJECT_HIDE, window, objectID, childID, threadID))
 		elif eventID == winUser.EVENT_OBJECT_HIDE:
-			k = (winUser.EVENT_OBJECT_SHOW, window, objectID, childID, threadID)
-			if k in self._genericEventCache:
-				del self._genericEventCache[k]
+			self._removeGenericEvent((winUser.EVENT_OBJECT_SHOW, window, objectID, childID, threadID))
 		elif eventID in MENU_EVENTIDS:
 			self._lastMenuEvent = (next(self._eventCounter), eventID, window, objectID, childID, threadID)
 			return True
-		self._genericEventCache[(eventID, window, objectID, childID, threadID)] = next(self._eventCounter)
+		self._addGenericEvent((eventID, window, objectID, childID, threadID))
 		return True
 
-	def flushEvents(
+	def _limitGenericEvents(
 			self,
-			alwaysAllowedObjects: Optional[List[IAccessibleObjectIdentifierType]] = None
-	) -> List:
-		"""Returns a list of winEvents that have been added.
-		Due to limiting, it will not necessarily be all the winEvents that were originally added.
-		They are definitely guaranteed to be in the correct order though.
-		winEvents for objects listed in alwaysAllowedObjects will always be emitted,
-		Even if the winEvent limit for that thread has been exceeded.
-		@return Tuple[eventID,window,objectID,childID]
+			genericEvents: Dict[_WinEventKeyT, int],
+			countsPerThread: Dict[int, int],
+			alwaysAllowedObjects: Optional[List[IAccessibleObjectIdentifierType]],
+	) -> List[_CountedWinEventT]:
+		"""Drops all but the latest L{MAX_WINEVENTS_PER_THREAD} generic events for each thread,
+		except for events for objects whose events are always allowed.
+		@return: The remaining events in counter order.
 		"""
-		if self._lastMenuEvent is not None:
-			heapq.heappush(self._eventHeap, self._lastMenuEvent)
-			self._lastMenuEvent = None
-		g = self._genericEventCache
-		self._genericEventCache = {}
+		if all(count <= MAX_WINEVENTS_PER_THREAD for count in countsPerThread.values()):
+			# No thread exceeded the limit, so all events are kept.
+			return [(v,) + k for k, v in genericEvents.items()]
+		limitedEvents = []
 		threadCounters = {}
-		for k, v in sorted(g.items(), key=lambda item: item[1], reverse=True):
+		# Walk from the latest event to the earliest, so the latest events for each thread are kept.
+		for k, v in reversed(list(genericEvents.items())):
+			threadID = k[-1]
+			if countsPerThread[threadID] <= MAX_WINEVENTS_PER_THREAD:
+				limitedEvents.append((v,) + k)
+				continue
 			# Increase the event count for this thread by 1.
-			threadCount = threadCounters.get(k[-1], 0)
-			threadCounters[k[-1]] = threadCount + 1
+			threadCount = threadCounters.get(threadID, 0)
+			threadCounters[threadID] = threadCount + 1
 			if isMSAADebugLoggingEnabled():
 				if threadCount == MAX_WINEVENTS_PER_THREAD:
-					log.debug(f"winEvent limit for thread {k[-1]} hit for this core cycle")
+					log.debug(f"winEvent limit for thread {threadID} hit for this core cycle")
 			# Find out if this event is for an object whos events are always allowed.
 			eventsForObjectAlwaysAllowed = alwaysAllowedObjects and k[1:-1] in alwaysAllowedObjects
 			if threadCount >= MAX_WINEVENTS_PER_THREAD and not eventsForObjectAlwaysAllowed:
 				# Skip this event if too many events have already been emitted for this thread
 				# and this event is not for an object whos events are always allowed.
 				continue
-			heapq.heappush(self._eventHeap, (v,) + k)
-		f = self._focusEventCache
+			limitedEvents.append((v,) + k)
+		limitedEvents.reverse()
+		return limitedEvents
+
+	def flushEvents(
+			self,
+			alwaysAllowedObjects: Optional[List[IAccessibleObjectIdentifierType]] = None
+	) -> List:
+		"""Returns a list of winEvents that have been added.
+		Due to limiting, it will not necessarily be all the winEvents that were originally added.
+		They are definitely guaranteed to be in the correct order though.
+		winEvents for objects listed in alwaysAllowedObjects will always be emitted,
+		Even if the winEvent limit for that thread has been exceeded.
+		@return Tuple[eventID,window,objectID,childID]
+		"""
+		genericEvents = self._limitGenericEvents(
+			self._genericEventCache,
+			self._genericEventCountsPerThread,
+			alwaysAllowedObjects
+		)
+		self._genericEventCache = {}
+		self._genericEventCountsPerThread = {}
+		focusEvents = [(v,) + k for k, v in self._focusEventCache.items()][0 - self.maxFocusItems:]
 		self._focusEventCache = {}
-		for k, v in sorted(f.items(), key=lambda item: item[1])[0 - self.maxFocusItems:]:
-			heapq.heappush(self._eventHeap, (v,) + k)
-		e = self._eventHeap
-		self._eventHeap = []
+		if self._lastMenuEvent is not None:
+			focusEvents = _mergeByCounter(focusEvents, [self._lastMenuEvent])
+			self._lastMenuEvent = None
 		r = []
-		for count in range(len(e)):
-			event = heapq.heappop(e)[1:]
+		for event in _mergeByCounter(genericEvents, focusEvents):
+			event = event[1:]
 			if isMSAADebugLoggingEnabled():
 				eventID, window, objectID, childID, threadID = event
 				log.debug(
@@ -146,7 +146,9 @@ class UIATextInfo(textInfos.TextInfo):
 		UIAHandler.TextUnit_Character
 	]
 
-	def find(self,text,caseSensitive=False,reverse=False):
+	def find(self, text, caseSensitive=False, reverse=False, useRegex=False, wholeWord=False):
+		if useRegex or wholeWord:
+			raise NotImplementedError("UI Automation can't search for regular expressions or whole words")
 		tempRange=self._rangeObj.clone()
 		documentRange=self.obj.UIATextPattern.documentRange
 		if reverse:
@@ -672,7 +672,9 @@ class WordDocumentTextInfo(textInfos.TextInfo):
 			ui.reportTextCopiedToClipboard(self.text)
 		return True
 
-	def find(self,text,caseSensitive=False,reverse=False):
+	def find(self, text, caseSensitive=False, reverse=False, useRegex=False, wholeWord=False):
+		if useRegex or wholeWord:
+			raise NotImplementedError("Word documents can't be searched for regular expressions or whole words")
 		f=self._rangeObj.find
 		f.text=text
 		f.matchCase=caseSensitive
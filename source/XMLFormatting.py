@@ -8,13 +8,32 @@ from xml.parsers import expat
 import textInfos
 import textUtils
 from logHandler import log
-from textUtils import WCHAR_ENCODING, isLowSurrogate
+from textUtils import WCHAR_ENCODING, isHighSurrogate, isLowSurrogate
 
 CommandsT = typing.Union[textInfos.FieldCommand, typing.Optional[str]]
 CommandListT = typing.List[CommandsT]
 
 
 class XMLTextParser(object): 
+	"""Parses the XML text of a range, as produced for example by virtual buffers,
+	into a list of field commands and text.
+	Character data is collected in a list and joined once for each run of text,
+	as joining the expat chunks one by one would be quadratic in the length of the run.
+	"""
+
+	#: The number of characters of XML text fed to the parser at a time by L{iterparse}.
+	ITERPARSE_CHUNK_SIZE: int = 65536
+
+	def __init__(self):
+		self._commandList: CommandListT = []
+		#: The fragments of the run of text currently being parsed.
+		self._textFragments: typing.List[str] = []
+
+	def _flushText(self):
+		"""Adds the run of text currently being parsed to the command list as a single string."""
+		if self._textFragments:
+			self._commandList.append("".join(self._textFragments))
+			self._textFragments.clear()
 
 	def _startElementHandler(self,tagName,attrs):
 		if tagName=='unich':
@@ -28,9 +47,11 @@ class XMLTextParser(object):
 			return
 		elif tagName=='control':
 			newAttrs=textInfos.ControlField(attrs)
+			self._flushText()
 			self._commandList.append(textInfos.FieldCommand("controlStart",newAttrs))
 		elif tagName=='text':
 			newAttrs=textInfos.FormatField(attrs)
+			self._flushText()
 			self._commandList.append(textInfos.FieldCommand("formatChange",newAttrs))
 		else:
 			raise ValueError("Unknown tag name: %s"%tagName)
@@ -47,6 +68,7 @@ class XMLTextParser(object):
 
 	def _EndElementHandler(self,tagName):
 		if tagName=="control":
+			self._flushText()
 			self._commandList.append(textInfos.FieldCommand("controlEnd",None))
 		elif tagName in ("text","unich"):
 			pass
@@ -54,25 +76,59 @@ class XMLTextParser(object):
 			raise ValueError("unknown tag name: %s"%tagName)
 
 	def _CharacterDataHandler(self, data: typing.Optional[str], processBufferedSurrogates=False):
-		cmdList=self._commandList
 		if not isinstance(data, str):
 			dataStr = repr(data)
 			log.warning(f"unknown type for data: {dataStr}")
-		if cmdList and isinstance(cmdList[-1],str):
-			cmdList[-1] += data
-			if processBufferedSurrogates:
-				cmdList[-1] = cmdList[-1].encode(WCHAR_ENCODING, errors="surrogatepass").decode(WCHAR_ENCODING)
-		else:
-			cmdList.append(data)
+			self._flushText()
+			self._commandList.append(data)
+			return
+		fragments = self._textFragments
+		if processBufferedSurrogates and fragments and fragments[-1]:
+			# A low surrogate can only pair with a high surrogate immediately before it,
+			# so there is no need to re-encode the rest of the run.
+			lastFragment = fragments[-1]
+			if isHighSurrogate(lastFragment[-1]):
+				fragments[-1] = lastFragment[:-1]
+				data = (lastFragment[-1] + data).encode(WCHAR_ENCODING, errors="surrogatepass").decode(WCHAR_ENCODING)
+		fragments.append(data)
 
-	def parse(self, XMLText) -> CommandListT:
+	def _createParser(self) -> expat.XMLParserType:
 		parser = expat.ParserCreate('utf-8')
 		parser.StartElementHandler = self._startElementHandler
 		parser.EndElementHandler = self._EndElementHandler
 		parser.CharacterDataHandler = self._CharacterDataHandler
-		self._commandList: XMLTextParser.CommandListT = []
+		self._commandList = []
+		self._textFragments = []
+		return parser
+
+	def parse(self, XMLText) -> CommandListT:
+		parser = self._createParser()
 		try:
 			parser.Parse(XMLText)
 		except Exception:
 			log.error("XML: %s" % XMLText, exc_info=True)
+		self._flushText()
 		return self._commandList
+
+	def iterparse(self, XMLText, chunkSize: typing.Optional[int] = None) -> typing.Iterator[CommandsT]:
+		"""Parses the XML text, yielding commands as soon as they have been parsed,
+		so that large ranges can be processed before all of their XML text has been parsed.
+		The commands yielded are the same as those in the list returned by L{parse}.
+		A run of text is yielded as a single string once it is complete.
+		@param chunkSize: The number of characters of XML text to parse at a time,
+			L{ITERPARSE_CHUNK_SIZE} if C{None}.
+		"""
+		if chunkSize is None:
+			chunkSize = self.ITERPARSE_CHUNK_SIZE
+		parser = self._createParser()
+		commandList = self._commandList
+		try:
+			for chunkStart in range(0, len(XMLText), chunkSize):
+				parser.Parse(XMLText[chunkStart:chunkStart + chunkSize], False)
+				yield from commandList
+				commandList.clear()
+		except Exception:
+			log.error("XML: %s" % XMLText, exc_info=True)
+		self._flushText()
+		yield from commandList
+		commandList.clear()
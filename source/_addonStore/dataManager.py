@@ -7,15 +7,21 @@
 # Can be removed in a future version of python (3.8+)
 from __future__ import annotations
 
+import functools
 import json
 import os
 import pathlib
+import struct
 import threading
 from typing import (
 	TYPE_CHECKING,
+	Any,
+	Dict,
+	List,
 	Optional,
 	Set,
 	Tuple,
+	Union,
 )
 
 import requests
@@ -36,7 +42,8 @@ from .models.addon import (
 	InstalledAddonStoreModel,
 	_createAddonGUICollection,
 	_createInstalledStoreModelFromData,
-	_createStoreCollectionFromJson,
+	_createLazyStoreCollection,
+	_createStoreCollectionFromData,
 )
 from .models.channel import Channel
 from .network import (
@@ -57,6 +64,92 @@ if TYPE_CHECKING:
 addonDataManager: Optional["_DataManager"] = None
 
 
+#: Identifies the format of add-on store cache files, see L{_writeAddonCacheFile}.
+_CACHE_FILE_FORMAT_ID = b"NVDA add-on store cache 1\n"
+#: The length of the header which follows the format ID in add-on store cache files.
+_cacheHeaderLength = struct.Struct("<I")
+
+
+def _writeAddonCacheFile(
+		cacheFilePath: str,
+		addons: List[Dict[str, Any]],
+		cacheHash: str,
+		cachedLanguage: str,
+		nvdaAPIVersion: Union[addonAPIVersion.AddonApiVersionT, str],
+):
+	"""Write add-on store data to a cache file.
+	After the format ID and the length of the header,
+	the file has a JSON header with details of the cache and an index of the add-ons,
+	followed by the data for each add-on as a separate JSON record.
+	The index lists the channel, add-on ID, offset and length of the record for each add-on,
+	so that the data for an add-on can be parsed only when it is needed.
+	"""
+	index = []
+	records = []
+	offset = 0
+	for addon in addons:
+		record = json.dumps(addon, ensure_ascii=False).encode("utf-8")
+		index.append((addon["channel"], addon["addonId"], offset, len(record)))
+		records.append(record)
+		offset += len(record)
+	header = json.dumps({
+		"cacheHash": cacheHash,
+		"cachedLanguage": cachedLanguage,
+		"nvdaAPIVersion": nvdaAPIVersion,
+		"index": index,
+	}, ensure_ascii=False).encode("utf-8")
+	with open(cacheFilePath, "wb") as cacheFile:
+		cacheFile.write(_CACHE_FILE_FORMAT_ID)
+		cacheFile.write(_cacheHeaderLength.pack(len(header)))
+		cacheFile.write(header)
+		cacheFile.writelines(records)
+
+
+def _readAddonCacheFile(cacheFilePath: str) -> CachedAddonsModel:
+	"""Read a cache file written by L{_writeAddonCacheFile}.
+	Only the header is parsed; the data for each add-on is kept unparsed
+	until the model for that add-on is fetched from the returned collection.
+	@raise ValueError: If the file is not a valid cache file.
+	"""
+	with open(cacheFilePath, "rb") as cacheFile:
+		if cacheFile.read(len(_CACHE_FILE_FORMAT_ID)) != _CACHE_FILE_FORMAT_ID:
+			raise ValueError("Unknown add-on store cache format")
+		try:
+			headerLength, = _cacheHeaderLength.unpack(cacheFile.read(_cacheHeaderLength.size))
+		except struct.error as e:
+			raise ValueError("Truncated add-on store cache") from e
+		header = json.loads(cacheFile.read(headerLength).decode("utf-8"))
+		records = cacheFile.read()
+	try:
+		index = header["index"]
+		cacheHash = header["cacheHash"]
+		cachedLanguage = header["cachedLanguage"]
+		nvdaAPIVersion = header["nvdaAPIVersion"]
+	except KeyError as e:
+		raise ValueError(f"Add-on store cache header is missing {e}") from e
+	addonCollection = _createLazyStoreCollection()
+	for channel, addonId, offset, length in index:
+		if offset + length > len(records):
+			raise ValueError("Truncated add-on store cache")
+		addonCollection[Channel(channel)]._setUnloaded(
+			addonId,
+			functools.partial(_loadAddonCacheRecord, records, offset, length),
+		)
+	if isinstance(nvdaAPIVersion, list):
+		# API versions are stored as tuples, which load as lists.
+		nvdaAPIVersion = tuple(nvdaAPIVersion)
+	return CachedAddonsModel(
+		cachedAddonData=addonCollection,
+		cacheHash=cacheHash,
+		cachedLanguage=cachedLanguage,
+		nvdaAPIVersion=nvdaAPIVersion,
+	)
+
+
+def _loadAddonCacheRecord(records: bytes, offset: int, length: int) -> Dict[str, Any]:
+	return json.loads(records[offset:offset + length].decode("utf-8"))
+
+
 def initialize():
 	global addonDataManager
 	if config.isAppX:
@@ -67,8 +160,10 @@ def initialize():
 
 
 class _DataManager:
-	_cacheLatestFilename: str = "_cachedLatestAddons.json"
-	_cacheCompatibleFilename: str = "_cachedCompatibleAddons.json"
+	_cacheLatestFilename: str = "_cachedLatestAddons.dat"
+	_cacheCompatibleFilename: str = "_cachedCompatibleAddons.dat"
+	#: Cache files from before the cache was indexed, which are removed if found.
+	_legacyCacheFilenames: Tuple[str, ...] = ("_cachedLatestAddons.json", "_cachedCompatibleAddons.json")
 	_downloadsPendingInstall: Set[Tuple["AddonListItemVM[_AddonStoreModel]", os.PathLike]] = set()
 	_downloadsPendingCompletion: Set["AddonListItemVM[_AddonStoreModel]"] = set()
 
@@ -83,6 +178,7 @@ class _DataManager:
 			# ensure caching dirs exist
 			pathlib.Path(WritePaths.addonStoreDir).mkdir(parents=True, exist_ok=True)
 			pathlib.Path(self._installedAddonDataCacheDir).mkdir(parents=True, exist_ok=True)
+			self._removeLegacyCacheFiles()
 
 		self._latestAddonCache = self._getCachedAddonData(self._cacheLatestFile)
 		self._compatibleAddonCache = self._getCachedAddonData(self._cacheCompatibleFile)
@@ -93,6 +189,16 @@ class _DataManager:
 			name="initialiseAvailableAddons",
 		).start()
 
+	def _removeLegacyCacheFiles(self):
+		for filename in self._legacyCacheFilenames:
+			legacyCacheFile = os.path.join(WritePaths.addonStoreDir, filename)
+			try:
+				os.remove(legacyCacheFile)
+			except FileNotFoundError:
+				pass
+			except OSError:
+				log.debugWarning(f"Unable to remove legacy add-on store cache {legacyCacheFile}", exc_info=True)
+
 	def _getLatestAddonsDataForVersion(self, apiVersion: str) -> Optional[bytes]:
 		url = _getAddonStoreURL(self._preferredChannel, self._lang, apiVersion)
 		try:
@@ -124,61 +230,42 @@ class _DataManager:
 		cacheHash = response.json()
 		return cacheHash
 
-	def _cacheCompatibleAddons(self, addonData: str, cacheHash: Optional[str]):
+	def _cacheCompatibleAddons(self, addonData: List[Dict[str, Any]], cacheHash: Optional[str]):
 		if not NVDAState.shouldWriteToDisk():
 			return
 		if not addonData or not cacheHash:
 			return
-		cacheData = {
-			"cacheHash": cacheHash,
-			"data": addonData,
-			"cachedLanguage": self._lang,
-			"nvdaAPIVersion": addonAPIVersion.CURRENT,
-		}
-		with open(self._cacheCompatibleFile, 'w', encoding='utf-8') as cacheFile:
-			json.dump(cacheData, cacheFile, ensure_ascii=False)
-
-	def _cacheLatestAddons(self, addonData: str, cacheHash: Optional[str]):
+		_writeAddonCacheFile(
+			self._cacheCompatibleFile,
+			addonData,
+			cacheHash=cacheHash,
+			cachedLanguage=self._lang,
+			nvdaAPIVersion=addonAPIVersion.CURRENT,
+		)
+
+	def _cacheLatestAddons(self, addonData: List[Dict[str, Any]], cacheHash: Optional[str]):
 		if not NVDAState.shouldWriteToDisk():
 			return
 		if not addonData or not cacheHash:
 			return
-		cacheData = {
-			"cacheHash": cacheHash,
-			"data": addonData,
-			"cachedLanguage": self._lang,
-			"nvdaAPIVersion": _LATEST_API_VER,
-		}
-		with open(self._cacheLatestFile, 'w', encoding='utf-8') as cacheFile:
-			json.dump(cacheData, cacheFile, ensure_ascii=False)
+		_writeAddonCacheFile(
+			self._cacheLatestFile,
+			addonData,
+			cacheHash=cacheHash,
+			cachedLanguage=self._lang,
+			nvdaAPIVersion=_LATEST_API_VER,
+		)
 
 	def _getCachedAddonData(self, cacheFilePath: str) -> Optional[CachedAddonsModel]:
 		if not os.path.exists(cacheFilePath):
 			return None
 		try:
-			with open(cacheFilePath, 'r', encoding='utf-8') as cacheFile:
-				cacheData = json.load(cacheFile)
+			return _readAddonCacheFile(cacheFilePath)
 		except Exception:
 			log.exception(f"Invalid add-on store cache")
 			if NVDAState.shouldWriteToDisk():
 				os.remove(cacheFilePath)
 			return None
-		try:
-			data = cacheData["data"]
-			cacheHash = cacheData["cacheHash"]
-			cachedLanguage = cacheData["cachedLanguage"]
-			nvdaAPIVersion = cacheData["nvdaAPIVersion"]
-		except KeyError:
-			log.exception(f"Invalid add-on store cache:\n{cacheData}")
-			if NVDAState.shouldWriteToDisk():
-				os.remove(cacheFilePath)
-			return None
-		return CachedAddonsModel(
-			cachedAddonData=_createStoreCollectionFromJson(data),
-			cacheHash=cacheHash,
-			cachedLanguage=cachedLanguage,
-			nvdaAPIVersion=tuple(nvdaAPIVersion),  # loads as list,
-		)
 
 	# Translators: A title of the dialog shown when fetching add-on data from the store fails
 	_updateFailureMessage = pgettext("addonStore", "Add-on data update failure")
@@ -198,13 +285,13 @@ class _DataManager:
 		if shouldRefreshData:
 			apiData = self._getLatestAddonsDataForVersion(_getCurrentApiVersionForURL())
 			if apiData:
-				decodedApiData = apiData.decode()
+				addonData: List[Dict[str, Any]] = json.loads(apiData.decode())
 				self._cacheCompatibleAddons(
-					addonData=decodedApiData,
+					addonData=addonData,
 					cacheHash=cacheHash,
 				)
 				self._compatibleAddonCache = CachedAddonsModel(
-					cachedAddonData=_createStoreCollectionFromJson(decodedApiData),
+					cachedAddonData=_createStoreCollectionFromData(addonData),
 					cacheHash=cacheHash,
 					cachedLanguage=self._lang,
 					nvdaAPIVersion=addonAPIVersion.CURRENT,
@@ -236,13 +323,13 @@ class _DataManager:
 		if shouldRefreshData:
 			apiData = self._getLatestAddonsDataForVersion(_LATEST_API_VER)
 			if apiData:
-				decodedApiData = apiData.decode()
+				addonData: List[Dict[str, Any]] = json.loads(apiData.decode())
 				self._cacheLatestAddons(
-					addonData=decodedApiData,
+					addonData=addonData,
 					cacheHash=cacheHash,
 				)
 				self._latestAddonCache = CachedAddonsModel(
-					cachedAddonData=_createStoreCollectionFromJson(decodedApiData),
+					cachedAddonData=_createStoreCollectionFromData(addonData),
 					cacheHash=cacheHash,
 					cachedLanguage=self._lang,
 					nvdaAPIVersion=_LATEST_API_VER,
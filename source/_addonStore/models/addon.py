@@ -8,13 +8,14 @@
 from __future__ import annotations
 
 import dataclasses
-import json
 import os
 from typing import (
 	TYPE_CHECKING,
 	Any,
+	Callable,
 	Dict,
 	Generator,
+	Iterator,
 	List,
 	Optional,
 	Union,
@@ -26,6 +27,7 @@ from typing_extensions import (
 from requests.structures import CaseInsensitiveDict
 
 import addonAPIVersion
+from logHandler import log
 from NVDAState import WritePaths
 
 from .channel import Channel
@@ -360,14 +362,89 @@ def _createAddonGUICollection() -> "AddonGUICollectionT":
 	}
 
 
-def _createStoreCollectionFromJson(jsonData: str) -> "AddonGUICollectionT":
-	"""Use json string to construct a listing of available addons.
-	See https://github.com/nvaccess/addon-datastore#api-data-generation-details
-	for details of the data.
+@dataclasses.dataclass(frozen=True)
+class _UnloadedAddonStoreModel:
+	"""Stands in for an add-on store model which has not been created yet."""
+	getData: Callable[[], Dict[str, Any]]
+	"""Fetches the add-on store data to create the model from."""
+
+
+class _LazyAddonStoreModels(CaseInsensitiveDict):
+	"""A case insensitive dictionary of add-on store models,
+	which only creates each model from its data when the model is first fetched.
+	The store lists thousands of add-ons, most of which are never looked at in a session.
+	Add-ons whose data is invalid are dropped when their model can't be created.
+	As every model is fetched when listing add-ons,
+	all models are created before the add-ons are iterated or counted,
+	so that invalid add-ons are never listed.
 	"""
-	data: List[Dict[str, Any]] = json.loads(jsonData)
-	addonCollection = _createAddonGUICollection()
 
+	def _setUnloaded(self, addonId: str, getData: Callable[[], Dict[str, Any]]):
+		"""Add an add-on whose model should be created from the data returned by C{getData} when needed."""
+		self._store[addonId.lower()] = (addonId, _UnloadedAddonStoreModel(getData))
+
+	def _createModel(self, lowerKey: str) -> Optional[AddonStoreModel]:
+		"""Creates the model for an unloaded add-on, dropping the add-on if its data is invalid.
+		@return: The model, or C{None} if the add-on was dropped.
+		"""
+		addonId, unloadedModel = self._store[lowerKey]
+		try:
+			model = _createStoreModelFromData(unloadedModel.getData())
+		except (KeyError, TypeError, ValueError):
+			log.error(f"Invalid add-on store data for {addonId}", exc_info=True)
+			del self._store[lowerKey]
+			return None
+		self._store[lowerKey] = (addonId, model)
+		return model
+
+	def _createModels(self):
+		for lowerKey, (_addonId, model) in list(self._store.items()):
+			if isinstance(model, _UnloadedAddonStoreModel):
+				self._createModel(lowerKey)
+
+	def __getitem__(self, key: str) -> AddonStoreModel:
+		lowerKey = key.lower()
+		_addonId, model = self._store[lowerKey]
+		if isinstance(model, _UnloadedAddonStoreModel):
+			model = self._createModel(lowerKey)
+			if model is None:
+				raise KeyError(key)
+		return model
+
+	def __iter__(self) -> Iterator[str]:
+		self._createModels()
+		return super().__iter__()
+
+	def __len__(self) -> int:
+		self._createModels()
+		return super().__len__()
+
+	def lower_items(self):
+		self._createModels()
+		return super().lower_items()
+
+	def copy(self) -> "_LazyAddonStoreModels":
+		models = _LazyAddonStoreModels()
+		models._store = self._store.copy()
+		return models
+
+
+def _createLazyStoreCollection() -> "AddonGUICollectionT":
+	"""Like L{_createAddonGUICollection}, but add-on store models for each channel may be added unloaded.
+	@see: L{_LazyAddonStoreModels}
+	"""
+	return {
+		channel: _LazyAddonStoreModels()
+		for channel in Channel
+		if channel != Channel.ALL
+	}
+
+
+def _createStoreCollectionFromData(data: List[Dict[str, Any]]) -> "AddonGUICollectionT":
+	"""Construct a listing of available addons from parsed add-on store data.
+	Models are only created for the add-ons which are fetched from the listing.
+	"""
+	addonCollection = _createLazyStoreCollection()
 	for addon in data:
-		addonCollection[addon["channel"]][addon["addonId"]] = _createStoreModelFromData(addon)
+		addonCollection[Channel(addon["channel"])]._setUnloaded(addon["addonId"], addon.copy)
 	return addonCollection
@@ -4,6 +4,7 @@
 # Copyright (C) 2008-2023 NV Access Limited, Joseph Lee, Babbage B.V., Davy Kager, Bram Duvigneau,
 # Leonard de Ruijter, Burman's Computer and Education Ltd.
 
+import bisect
 import itertools
 import os
 import typing
@@ -473,6 +474,9 @@ class Region(object):
 		#: Whether this region should be positioned at the absolute left of the display when focused.
 		#: @type: bool
 		self.focusToHardLeft = False
+		#: Everything which affected the last translation of this region,
+		#: used to skip translation when none of it has changed.
+		self._translationFingerprint: Optional[Tuple[Any, ...]] = None
 
 	def update(self):
 		"""Update this region.
@@ -481,13 +485,31 @@ class Region(object):
 		Typeform information from L{rawTextTypeforms} is used, if any.
 		L{rawToBraillePos} and L{brailleToRawPos} are updated according to the translation.
 		L{brailleCursorPos}, L{brailleSelectionStart} and L{brailleSelectionEnd} are similarly updated based on L{cursorPos}, L{selectionStart} and L{selectionEnd}, respectively.
+		If none of these inputs nor the relevant braille settings have changed since the last update,
+		the previous translation is kept as is.
 		@postcondition: L{brailleCells}, L{brailleCursorPos}, L{brailleSelectionStart} and L{brailleSelectionEnd} are updated and ready for rendering.
 		"""
+		settings = config.conf.getSnapshot()
 		mode = louis.dotsIO
-		if config.conf["braille"]["expandAtCursor"] and self.cursorPos is not None:
+		if settings[("braille", "expandAtCursor")] and self.cursorPos is not None:
 			mode |= louis.compbrlAtCursor
+		translationTable = settings[("braille", "translationTable")]
+		showSelection = settings[("braille", "showSelection")]
+		fingerprint = (
+			self.rawText,
+			tuple(self.rawTextTypeforms) if self.rawTextTypeforms is not None else None,
+			self.cursorPos,
+			self.selectionStart,
+			self.selectionEnd,
+			translationTable,
+			mode,
+			showSelection,
+		)
+		if fingerprint == self._translationFingerprint:
+			return
+		self._translationFingerprint = fingerprint
 		self.brailleCells, self.brailleToRawPos, self.rawToBraillePos, self.brailleCursorPos = louisHelper.translate(
-			[os.path.join(brailleTables.TABLES_DIR, config.conf["braille"]["translationTable"]),
+			[os.path.join(brailleTables.TABLES_DIR, translationTable),
 				"braille-patterns.cti"],
 			self.rawText,
 			typeform=self.rawTextTypeforms,
@@ -497,7 +519,7 @@ class Region(object):
 		if (
 			self.selectionStart is not None
 			and self.selectionEnd is not None
-			and config.conf["braille"]["showSelection"]
+			and showSelection
 		):
 			try:
 				# Mark the selection.
@@ -1491,6 +1513,32 @@ def rindex(seq, item, start, end):
 			return index
 	raise ValueError("%r is not in sequence" % item)
 
+
+class _CollectedRegionOutput:
+	"""A copy of the output of a region when it was collected by L{BrailleBuffer}.
+	This is compared with the current output of the region to find out whether it has changed.
+	The output is compared rather than relying on L{Region.update},
+	since some regions set their cells themselves or change them in place.
+	"""
+
+	__slots__ = ("brailleCells", "rawToBraillePos", "brailleToRawPos", "rawText")
+
+	def __init__(self, region: Region):
+		self.brailleCells = list(region.brailleCells)
+		self.rawToBraillePos = list(region.rawToBraillePos)
+		self.brailleToRawPos = list(region.brailleToRawPos)
+		self.rawText = region.rawText
+
+	def hasChanged(self, region: Region) -> bool:
+		"""Whether the output of the given region differs from this copy."""
+		return (
+			region.rawText != self.rawText
+			or region.brailleCells != self.brailleCells
+			or region.rawToBraillePos != self.rawToBraillePos
+			or region.brailleToRawPos != self.brailleToRawPos
+		)
+
+
 class BrailleBuffer(baseObject.AutoPropertyObject):
 
 	def __init__(self, handler):
@@ -1509,6 +1557,27 @@ class BrailleBuffer(baseObject.AutoPropertyObject):
 		#: The position in L{brailleCells} where the display window starts (inclusive).
 		#: @type: int
 		self.windowStartPos = 0
+		self._clearPositions()
+
+	def _clearPositions(self):
+		#: The visible regions with their start and end positions in L{brailleCells}, as of the last L{update}.
+		self._regionsWithPositions: List[RegionWithPositions] = []
+		#: The start position in L{brailleCells} of each region in L{_regionsWithPositions}.
+		self._regionStarts: List[int] = []
+		#: The end position in L{brailleCells} of each region in L{_regionsWithPositions}.
+		self._regionEnds: List[int] = []
+		#: Maps each region in L{_regionsWithPositions} to its index.
+		self._regionIndexes: Dict[Region, int] = {}
+		#: The start position in L{rawText} of each region in L{_regionsWithPositions}.
+		self._regionRawStarts: List[int] = []
+		#: The start position in L{_rawToBraillePos} of each region in L{_regionsWithPositions}.
+		#: This differs from the start in L{rawText} if liblouis was given text containing null characters.
+		self._regionRawMapStarts: List[int] = []
+		#: The output of each region in L{_regionsWithPositions} when it was last collected,
+		#: used to find the regions which have changed since.
+		self._regionOutputs: List[_CollectedRegionOutput] = []
+		self._rawToBraillePos: List[int] = []
+		self._brailleToRawPos: List[int] = []
 
 	def clear(self):
 		"""Clear the entire buffer.
@@ -1520,6 +1589,7 @@ class BrailleBuffer(baseObject.AutoPropertyObject):
 		self.brailleCursorPos = None
 		self.brailleCells = []
 		self.windowStartPos = 0
+		self._clearPositions()
 
 	def _get_visibleRegions(self):
 		if not self.regions:
@@ -1530,56 +1600,52 @@ class BrailleBuffer(baseObject.AutoPropertyObject):
 		for region in self.regions:
 			yield region
 
-	def _get_regionsWithPositions(self):
-		start = 0
-		for region in self.visibleRegions:
-			end = start + len(region.brailleCells)
-			yield RegionWithPositions(region, start, end)
-			start = end
+	regionsWithPositions: List[RegionWithPositions]
+
+	def _get_regionsWithPositions(self) -> List[RegionWithPositions]:
+		"""@return: The visible regions with their start and end positions in L{brailleCells}.
+		These positions are calculated by L{update}, so they always correspond with L{brailleCells}.
+		The returned list must not be modified.
+		"""
+		return self._regionsWithPositions
+
+	rawToBraillePos: List[int]
 
-	def _get_rawToBraillePos(self):
+	def _get_rawToBraillePos(self) -> List[int]:
 		"""@return: a list mapping positions in L{rawText} to positions in L{brailleCells} for the entire buffer.
-		@rtype: [int, ...]
+		It is calculated by L{update} and must not be modified.
 		"""
-		rawToBraillePos = []
-		for region, regionStart, regionEnd in self.regionsWithPositions:
-			rawToBraillePos.extend(p+regionStart for p in region.rawToBraillePos)
-		return rawToBraillePos
+		return self._rawToBraillePos
 
 	brailleToRawPos: List[int]
 
-	def _get_brailleToRawPos(self):
+	def _get_brailleToRawPos(self) -> List[int]:
 		"""@return: a list mapping positions in L{brailleCells} to positions in L{rawText} for the entire buffer.
-		@rtype: [int, ...]
+		It is calculated by L{update} and must not be modified.
 		"""
-		brailleToRawPos = []
-		start = 0
-		for region in self.visibleRegions:
-			brailleToRawPos.extend(p+start for p in region.brailleToRawPos)
-			start+=len(region.rawText)
-		return brailleToRawPos
+		return self._brailleToRawPos
 
 	def bufferPosToRegionPos(self, bufferPos):
-		for region, start, end in self.regionsWithPositions:
-			if end > bufferPos:
-				return region, bufferPos - start
-		raise LookupError("No such position")
+		# The first region which ends after bufferPos contains it.
+		index = bisect.bisect_right(self._regionEnds, bufferPos)
+		if index == len(self._regionEnds):
+			raise LookupError("No such position")
+		return self._regionsWithPositions[index].region, bufferPos - self._regionStarts[index]
 
 	def regionPosToBufferPos(self, region, pos, allowNearest=False):
-		start: int = 0
-		for testRegion, start, end in self.regionsWithPositions:
-			if region == testRegion:
-				if pos < end - start:
-					# The requested position is still valid within the region.
-					return start + pos
-				elif allowNearest:
-					# The position within the region isn't valid,
-					# but the region is valid, so return its start.
-					return start
-				break
-		if allowNearest:
+		index = self._regionIndexes.get(region)
+		if index is not None:
+			start = self._regionStarts[index]
+			if pos < self._regionEnds[index] - start:
+				# The requested position is still valid within the region.
+				return start + pos
+			elif allowNearest:
+				# The position within the region isn't valid,
+				# but the region is valid, so return its start.
+				return start
+		elif allowNearest:
 			# Resort to the start of the last region.
-			return start
+			return self._regionStarts[-1] if self._regionStarts else 0
 		raise LookupError("No such position")
 
 	def bufferPositionsToRawText(self, startPos, endPos):
@@ -1632,20 +1698,20 @@ class BrailleBuffer(baseObject.AutoPropertyObject):
 			or whether the braille region that corresponds with the focus represents a multi line edit box.
 		3. Whether word wrap is enabled."""
 		startPos = endPos - self.handler.displaySize
-		# Loop through the currently displayed regions in reverse order
+		# Loop through the currently displayed regions which start before endPos in reverse order
 		# If focusToHardLeft is set for one of the regions, the display shouldn't scroll further back than the start of that region
-		for region, regionStart, regionEnd in reversed(list(self.regionsWithPositions)):
-			if regionStart<endPos:
-				if region.focusToHardLeft:
-					# Only scroll to the start of this region.
-					restrictPos = regionStart
-					break
-				elif config.conf["braille"]["focusContextPresentation"]!=CONTEXTPRES_CHANGEDCONTEXT:
-					# We aren't currently dealing with context change presentation
-					# thus, we only need to consider the last region
-					# since it doesn't have focusToHardLeftSet, the window start position isn't restricted
-					restrictPos = 0
-					break
+		regionsBeforeEnd = bisect.bisect_left(self._regionStarts, endPos)
+		for region, regionStart, regionEnd in reversed(self._regionsWithPositions[:regionsBeforeEnd]):
+			if region.focusToHardLeft:
+				# Only scroll to the start of this region.
+				restrictPos = regionStart
+				break
+			elif config.conf["braille"]["focusContextPresentation"] != CONTEXTPRES_CHANGEDCONTEXT:
+				# We aren't currently dealing with context change presentation
+				# thus, we only need to consider the last region
+				# since it doesn't have focusToHardLeftSet, the window start position isn't restricted
+				restrictPos = 0
+				break
 		else:
 			restrictPos = 0
 		if startPos <= restrictPos:
@@ -1727,24 +1793,97 @@ class BrailleBuffer(baseObject.AutoPropertyObject):
 			self.windowEndPos = end
 
 	def update(self):
-		self.rawText = ""
-		self.brailleCells = []
+		"""Collects the text and cells of the visible regions into this buffer.
+		This also calculates the positions of the regions and the position maps for the entire buffer,
+		so that they don't have to be recalculated each time they are used.
+		If the visible regions are the same as on the last update,
+		only the regions which have changed since then are spliced into the existing cells and position maps.
+		"""
+		visibleRegions = list(self.visibleRegions)
+		if (
+			len(visibleRegions) == len(self._regionsWithPositions)
+			and all(
+				region is collected.region
+				for region, collected in zip(visibleRegions, self._regionsWithPositions)
+			)
+		):
+			for index, region in enumerate(visibleRegions):
+				if self._regionOutputs[index].hasChanged(region):
+					self._spliceRegion(index)
+		else:
+			self._collectRegions(visibleRegions)
 		self.cursorPos = None
-		start = 0
+		for region, start, end in self._regionsWithPositions:
+			if region.brailleCursorPos is not None:
+				self.cursorPos = start + region.brailleCursorPos
 		if log.isEnabledFor(log.IO):
-			logRegions = []
-		for region in self.visibleRegions:
+			log.io("Braille regions text: %r" % [region.rawText for region in visibleRegions])
+
+	def _collectRegions(self, visibleRegions: List[Region]):
+		"""Collects the text, cells and positions of all the given regions from scratch."""
+		rawTextParts = []
+		self.brailleCells = []
+		self._clearPositions()
+		start = 0
+		rawStart = 0
+		for index, region in enumerate(visibleRegions):
 			rawText = region.rawText
-			if log.isEnabledFor(log.IO):
-				logRegions.append(rawText)
+			rawTextParts.append(rawText)
 			cells = region.brailleCells
-			self.rawText+=rawText
 			self.brailleCells.extend(cells)
-			if region.brailleCursorPos is not None:
-				self.cursorPos = start + region.brailleCursorPos
-			start += len(cells)
-		if log.isEnabledFor(log.IO):
-			log.io("Braille regions text: %r" % logRegions)
+			end = start + len(cells)
+			self._regionsWithPositions.append(RegionWithPositions(region, start, end))
+			self._regionStarts.append(start)
+			self._regionEnds.append(end)
+			self._regionIndexes.setdefault(region, index)
+			self._regionRawStarts.append(rawStart)
+			self._regionRawMapStarts.append(len(self._rawToBraillePos))
+			self._rawToBraillePos.extend(p + start for p in region.rawToBraillePos)
+			self._brailleToRawPos.extend(p + rawStart for p in region.brailleToRawPos)
+			self._regionOutputs.append(_CollectedRegionOutput(region))
+			start = end
+			rawStart += len(rawText)
+		self.rawText = "".join(rawTextParts)
+
+	def _spliceRegion(self, index: int):
+		"""Replaces the text, cells and positions collected for a changed region,
+		shifting the positions of the regions after it.
+		@param index: The index of the region in L{regionsWithPositions}.
+		"""
+		region, start, end = self._regionsWithPositions[index]
+		isLast = index == len(self._regionsWithPositions) - 1
+		rawStart = self._regionRawStarts[index]
+		rawEnd = len(self.rawText) if isLast else self._regionRawStarts[index + 1]
+		rawMapStart = self._regionRawMapStarts[index]
+		rawMapEnd = len(self._rawToBraillePos) if isLast else self._regionRawMapStarts[index + 1]
+		cells = region.brailleCells
+		rawText = region.rawText
+		delta = len(cells) - (end - start)
+		rawDelta = len(rawText) - (rawEnd - rawStart)
+		rawMapDelta = len(region.rawToBraillePos) - (rawMapEnd - rawMapStart)
+		self.brailleCells[start:end] = cells
+		self.rawText = self.rawText[:rawStart] + rawText + self.rawText[rawEnd:]
+		# Shift the positions after this region before replacing its own positions.
+		if delta:
+			self._rawToBraillePos[rawMapEnd:] = [p + delta for p in self._rawToBraillePos[rawMapEnd:]]
+		self._rawToBraillePos[rawMapStart:rawMapEnd] = [p + start for p in region.rawToBraillePos]
+		if rawDelta:
+			self._brailleToRawPos[end:] = [p + rawDelta for p in self._brailleToRawPos[end:]]
+		self._brailleToRawPos[start:end] = [p + rawStart for p in region.brailleToRawPos]
+		self._regionsWithPositions[index] = RegionWithPositions(region, start, start + len(cells))
+		self._regionEnds[index] = start + len(cells)
+		for laterIndex in range(index + 1, len(self._regionsWithPositions)):
+			laterRegion, laterStart, laterEnd = self._regionsWithPositions[laterIndex]
+			self._regionsWithPositions[laterIndex] = RegionWithPositions(
+				laterRegion,
+				laterStart + delta,
+				laterEnd + delta
+			)
+			self._regionStarts[laterIndex] += delta
+			self._regionEnds[laterIndex] += delta
+			self._regionRawStarts[laterIndex] += rawDelta
+			self._regionRawMapStarts[laterIndex] += rawMapDelta
+		self._regionOutputs[index] = _CollectedRegionOutput(region)
 
 	def updateDisplay(self):
 		if self is self.handler.buffer:
@@ -2054,6 +2193,8 @@ class BrailleHandler(baseObject.AutoPropertyObject):
 			self._tether = config.conf["braille"]["tetherTo"]
 		self._detector = None
 		self._rawText = u""
+		self._translationTable: str = config.conf["braille"]["translationTable"]
+		"""The translation table in use, used to tell when it changes on a profile switch."""
 
 		self.queuedWriteLock = threading.Lock()
 		self.ackTimerHandle = winKernel.createWaitableTimer()
@@ -2623,6 +2764,12 @@ class BrailleHandler(baseObject.AutoPropertyObject):
 
 		self._tether = config.conf["braille"]["tetherTo"]
 
+		translationTable = config.conf["braille"]["translationTable"]
+		if translationTable != self._translationTable:
+			self._translationTable = translationTable
+			# Translations made with the previous table are no longer useful.
+			louisHelper.invalidateTranslationCache()
+
 	def handleDisplayUnavailable(self):
 		"""Called when the braille display becomes unavailable.
 		This logs an error and disables the display.
@@ -7,10 +7,13 @@
 from typing import (
 	Any,
 	Callable,
+	Iterator,
+	List,
 	Union,
 	cast,
 )
 import os
+import heapq
 import itertools
 import collections
 import winsound
@@ -73,37 +76,70 @@ def reportPassThrough(treeInterceptor,onlyIfChanged=True):
 		reportPassThrough.last = treeInterceptor.passThrough
 reportPassThrough.last = False
 
+
+class _QuickNavItemHeapEntry:
+	"""The current item of one of the iterators merged by L{mergeQuickNavItemIterators}.
+	Entries are ordered by their items in the direction of the merge.
+	Entries with equal items are ordered by when they were pushed onto the heap,
+	so items are yielded in the same order as they would be by repeatedly taking the first of the current items.
+	Only a single comparison of the items is needed for each comparison of entries.
+	"""
+	__slots__ = ("item", "iterator", "sequence", "reverse")
+
+	def __init__(self, item: "QuickNavItem", iterator: Iterator["QuickNavItem"], sequence: int, reverse: bool):
+		self.item = item
+		self.iterator = iterator
+		#: The order in which this entry was pushed onto the heap.
+		self.sequence = sequence
+		#: Whether items are merged from last to first.
+		self.reverse = reverse
+
+	def __lt__(self, other: "_QuickNavItemHeapEntry") -> bool:
+		if self.reverse:
+			first, second = other.item, self.item
+		else:
+			first, second = self.item, other.item
+		if self.sequence < other.sequence:
+			# This entry comes first unless the other item comes strictly before this one.
+			return not (second < first)
+		return first < second
+
+
 def mergeQuickNavItemIterators(iterators,direction="next"):
 	"""
 	Merges multiple iterators that emit L{QuickNavItem} objects, yielding them from first to last. 
-	They are sorted using min or max (__lt__ should be implemented on the L{QuickNavItem} objects).
+	They are sorted using a heap of the current value of each iterator
+	(__lt__ should be implemented on the L{QuickNavItem} objects),
+	so each value costs a number of comparisons logarithmic in the number of iterators.
+	Items which are equal are yielded in the order in which they were fetched from their iterators.
 	@param iters: the iterators you want to merge. 
 	@type iters: sequence of iterators that emit L{QuicknavItem} objects.
 	@param direction: the direction these iterators are searching (e.g. next, previous)
 	@type direction: string
 	"""
-	finder=min if direction=="next" else max
-	curValues=[]
-	# Populate a list with all iterators and their corisponding first value
+	reverse = direction != "next"
+	sequence = itertools.count()
+	heap = []
+	# Populate the heap with all iterators and their corisponding first value
 	for it in iterators:
 		try:
 			val=next(it)
 		except StopIteration:
 			continue
-		curValues.append((it,val))
+		heap.append(_QuickNavItemHeapEntry(val, it, next(sequence), reverse))
+	heapq.heapify(heap)
 	# Until all iterators have been used up,
-	# Find the first (minimum or maximum) of all the values,
-	# emit that, and update the list with the next available value for the iterator whose value was emitted.
-	while len(curValues)>0:
-		first=finder(curValues,key=lambda x: x[1])
-		curValues.remove(first)
-		it,val=first
-		yield val
+	# emit the first (minimum or maximum) of all the values,
+	# and replace it on the heap with the next available value for the iterator whose value was emitted.
+	while heap:
+		entry = heap[0]
+		yield entry.item
 		try:
-			newVal=next(it)
+			newVal = next(entry.iterator)
 		except StopIteration:
+			heapq.heappop(heap)
 			continue
-		curValues.append((it,newVal))
+		heapq.heapreplace(heap, _QuickNavItemHeapEntry(newVal, entry.iterator, next(sequence), reverse))
 
 class QuickNavItem(object, metaclass=ABCMeta):
 	""" Emitted by L{BrowseModeTreeInterceptor._iterNodesByType}, this represents one of many positions in a browse mode document, based on the type of item being searched for (e.g. link, heading, table etc)."""  
@@ -934,6 +970,59 @@ qn(
 del qn
 
 
+class _ElementsListFilter:
+	"""Finds the elements of the Elements List whose labels contain a filter text, ignoring case.
+	Labels are fetched and lowercased once rather than for every filter text.
+	When the filter text contains the previous filter text,
+	only the elements which matched the previous filter text are searched.
+	"""
+
+	def __init__(self, labels: List[str]):
+		"""
+		@param labels: The label of each element, in the order of the elements.
+		"""
+		self.labels = labels
+		self._lowerLabels = [label.lower() for label in labels]
+		self._lastFilterText = ""
+		self._lastMatches: List[int] = list(range(len(labels)))
+
+	def setLabel(self, index: int, label: str):
+		"""Updates the label of an element, e.g. after it has been renamed."""
+		self.labels[index] = label
+		self._lowerLabels[index] = label.lower()
+		# The element may now match filter texts which it didn't match before.
+		self._lastFilterText = ""
+		self._lastMatches = list(range(len(self.labels)))
+
+	def addLabels(self, labels: List[str]) -> List[int]:
+		"""Adds the labels of further elements, e.g. while the Elements List is being populated.
+		@return: The indexes of the added elements which match the current filter text.
+		"""
+		firstIndex = len(self.labels)
+		self.labels.extend(labels)
+		self._lowerLabels.extend(label.lower() for label in labels)
+		lowerLabels = self._lowerLabels
+		filterText = self._lastFilterText
+		newMatches = [index for index in range(firstIndex, len(lowerLabels)) if filterText in lowerLabels[index]]
+		self._lastMatches = self._lastMatches + newMatches
+		return newMatches
+
+	def getMatches(self, filterText: str) -> List[int]:
+		"""Gets the indexes of the elements whose labels contain the filter text, ignoring case.
+		"""
+		filterText = filterText.lower()
+		if self._lastFilterText in filterText:
+			# Only elements matching the previous filter text can match this one.
+			candidates = self._lastMatches
+		else:
+			candidates = range(len(self._lowerLabels))
+		lowerLabels = self._lowerLabels
+		matches = [index for index in candidates if filterText in lowerLabels[index]]
+		self._lastFilterText = filterText
+		self._lastMatches = matches
+		return matches
+
+
 class ElementsListDialog(
 		DpiScalingHelperMixinWithoutInit,
 		gui.contextHelp.ContextHelpMixin,
@@ -962,6 +1051,16 @@ class ElementsListDialog(
 
 	lastSelectedElementType=0
 
+	#: The number of elements gathered before the dialog is first populated.
+	#: Gathering continues until the element nearest the caret has been found,
+	#: so that it can be selected initially.
+	#: The remaining elements are added in the background, see L{ELEMENT_CHUNK_SIZE}.
+	INITIAL_ELEMENT_COUNT = 50
+	#: The number of elements added to the dialog at a time while it is populated in the background.
+	ELEMENT_CHUNK_SIZE = 100
+	#: The minimum number of seconds between announcements of the progress of populating the dialog.
+	PROGRESS_INTERVAL = 3
+
 	def __init__(self, document):
 		super().__init__(
 			parent=gui.mainFrame,
@@ -969,6 +1068,9 @@ class ElementsListDialog(
 			title=_("Elements List")
 		)
 		self.document = document
+		#: The ID of the generator which adds the remaining elements in the background, if any.
+		self._populateGeneratorId: Optional[int] = None
+		self.Bind(wx.EVT_WINDOW_DESTROY, self.onDestroy)
 		mainSizer = wx.BoxSizer(wx.VERTICAL)
 		contentsSizer = wx.BoxSizer(wx.VERTICAL)
 
@@ -1043,12 +1145,38 @@ class ElementsListDialog(
 			self.activateButton.Disable()
 			self.SetAffirmativeId(self.moveButton.GetId())
 
-		# Gather the elements of this type.
+		# Stop adding elements of the previous type.
+		self._cancelPopulating()
+		# Gather the first elements of this type.
 		self._elements = []
 		self._initialElement = None
+		self._isAfterSelection = False
+		elements = self._iterElements(elType)
+		for element in elements:
+			self._elements.append(element)
+			if self._isAfterSelection and len(self._elements) >= self.INITIAL_ELEMENT_COUNT:
+				break
+		else:
+			# All elements have been gathered.
+			elements = None
+
+		self._elementsFilter = _ElementsListFilter([element.item.label for element in self._elements])
+		#: The indexes of the elements currently shown in the tree.
+		self._shownElementIndexes: Optional[List[int]] = None
 
+		self._elementsToTreeItems = {}
+
+		# Start with no filtering.
+		self.filterEdit.ChangeValue("")
+		self.filter("", newElementType=True)
+		if elements is not None:
+			self._populateGeneratorId = queueHandler.registerGeneratorObject(self._populate(elements))
+
+	def _iterElements(self, elType: str) -> Iterator[Element]:
+		"""Yields the elements of the given type, finding the parent of each element
+		and the element which should be selected initially as it goes.
+		"""
 		parentElements = []
-		isAfterSelection=False
 		for item in self.document._iterNodesByType(elType):
 			# Find the parent element, if any.
 			for parent in reversed(parentElements):
@@ -1063,25 +1191,94 @@ class ElementsListDialog(
 				parent = None
 
 			element=self.Element(item,parent)
-			self._elements.append(element)
 
-			if not isAfterSelection:
-				isAfterSelection=item.isAfterSelection
-				if not isAfterSelection:
+			if not self._isAfterSelection:
+				self._isAfterSelection = item.isAfterSelection
+				if not self._isAfterSelection:
 					# The element immediately preceding or overlapping the caret should be the initially selected element.
 					# Since we have not yet passed the selection, use this as the initial element. 
-					try:
-						self._initialElement = self._elements[-1]
-					except IndexError:
-						# No previous element.
-						pass
+					self._initialElement = element
+
+			yield element
 
 			# This could be the parent of a subsequent element, so add it to the parents stack.
 			parentElements.append(element)
 
-		# Start with no filtering.
-		self.filterEdit.ChangeValue("")
-		self.filter("", newElementType=True)
+	def _populate(self, elements: Iterator[Element]):
+		"""Adds the remaining elements to the dialog in chunks, yielding after each chunk.
+		This is run by L{queueHandler.registerGeneratorObject},
+		so that NVDA and the dialog stay responsive while a large document is searched.
+		"""
+		lastProgressTime = time.time()
+		reportedProgress = False
+		chunk = []
+		for element in elements:
+			if not self:
+				# The dialog has been destroyed.
+				return
+			chunk.append(element)
+			if len(chunk) < self.ELEMENT_CHUNK_SIZE:
+				continue
+			self._addElements(chunk)
+			chunk = []
+			if time.time() - lastProgressTime >= self.PROGRESS_INTERVAL:
+				lastProgressTime = time.time()
+				reportedProgress = True
+				self._reportElementCount()
+			yield
+		if not self:
+			return
+		self._addElements(chunk)
+		self._populateGeneratorId = None
+		if reportedProgress:
+			# Let the user know that all elements have now been added.
+			self._reportElementCount()
+
+	def _reportElementCount(self):
+		elementCount = len(self._elements)
+		ui.message(
+			# Translators: Reported while the browse mode Elements List dialog is being populated
+			# and when it has been populated, e.g. "2000 elements".
+			ngettext("{count} element", "{count} elements", elementCount).format(count=elementCount)
+		)
+
+	def _cancelPopulating(self):
+		if self._populateGeneratorId is not None:
+			queueHandler.cancelGeneratorObject(self._populateGeneratorId)
+			self._populateGeneratorId = None
+
+	def onDestroy(self, evt: wx.WindowDestroyEvent):
+		# Destroy events of child windows are propagated to the dialog.
+		if evt.GetEventObject() is self:
+			self._cancelPopulating()
+		evt.Skip()
+
+	def _addElements(self, elements: List[Element]):
+		"""Adds elements gathered in the background to the dialog,
+		adding those which match the filter text to the end of the tree.
+		"""
+		self._elements.extend(elements)
+		newMatches = self._elementsFilter.addLabels([element.item.label for element in elements])
+		if not newMatches:
+			return
+		wasEmpty = not self._shownElementIndexes
+		self._shownElementIndexes = self._shownElementIndexes + newMatches
+		elementsToTreeItems = self._elementsToTreeItems
+		labels = self._elementsFilter.labels
+		self.tree.Freeze()
+		try:
+			for index in newMatches:
+				element = self._elements[index]
+				parentItem = elementsToTreeItems.get(element.parent) if element.parent else None
+				item = self.tree.AppendItem(parentItem or self.treeRoot, labels[index])
+				self.tree.SetItemData(item, element)
+				elementsToTreeItems[element] = item
+				if parentItem:
+					self.tree.Expand(parentItem)
+		finally:
+			self.tree.Thaw()
+		if wasEmpty:
+			self._selectItem(None)
 
 	def filter(self, filterText, newElementType=False):
 		# If this is a new element type, use the element nearest the cursor.
@@ -1091,39 +1288,49 @@ class ElementsListDialog(
 			defaultElement = self._initialElement if newElementType else self.tree.GetItemData(self.tree.GetSelection())
 		except:
 			defaultElement = self._initialElement
-		# Clear the tree.
-		self.tree.DeleteChildren(self.treeRoot)
-
-		# Populate the tree with elements matching the filter text.
-		elementsToTreeItems = {}
-		defaultItem = None
-		matched = False
-		#Do case-insensitive matching by lowering both filterText and each element's text.
-		filterText=filterText.lower()
-		for element in self._elements:
-			label=element.item.label
-			if filterText and filterText not in label.lower():
-				continue
-			matched = True
-			parent = element.parent
-			if parent:
-				parent = elementsToTreeItems.get(parent)
-			item = self.tree.AppendItem(parent or self.treeRoot, label)
-			self.tree.SetItemData(item, element)
-			elementsToTreeItems[element] = item
-			if element == defaultElement:
-				defaultItem = item
-
-		self.tree.ExpandAll()
-
-		if not matched:
+		matchingIndexes = self._elementsFilter.getMatches(filterText)
+		if not newElementType and matchingIndexes == self._shownElementIndexes:
+			# The tree already shows exactly these elements, with the selected element still selected.
+			return
+		self._shownElementIndexes = matchingIndexes
+
+		# Don't redraw the tree until it has been populated.
+		self.tree.Freeze()
+		try:
+			# Clear the tree.
+			self.tree.DeleteChildren(self.treeRoot)
+
+			# Populate the tree with elements matching the filter text.
+			elementsToTreeItems = self._elementsToTreeItems = {}
+			defaultItem = None
+			labels = self._elementsFilter.labels
+			for index in matchingIndexes:
+				element = self._elements[index]
+				parent = element.parent
+				if parent:
+					parent = elementsToTreeItems.get(parent)
+				item = self.tree.AppendItem(parent or self.treeRoot, labels[index])
+				self.tree.SetItemData(item, element)
+				elementsToTreeItems[element] = item
+				if element == defaultElement:
+					defaultItem = item
+
+			self.tree.ExpandAll()
+		finally:
+			self.tree.Thaw()
+		if not matchingIndexes:
 			# No items, so disable the buttons.
 			self.activateButton.Disable()
 			self.moveButton.Disable()
 			return
+		self._selectItem(defaultItem)
 
+	def _selectItem(self, item):
+		"""Selects an item in the tree, which must not be empty, and enables the buttons.
+		@param item: The item to select, C{None} for the first item in the tree.
+		"""
 		# If there's no default item, use the first item in the tree.
-		self.tree.SelectItem(defaultItem or self.tree.GetFirstChild(self.treeRoot)[0])
+		self.tree.SelectItem(item or self.tree.GetFirstChild(self.treeRoot)[0])
 		# Enable the button(s).
 		# If the activate button isn't the default button, it is disabled for this element type and shouldn't be enabled here.
 		if self.AffirmativeId == self.activateButton.Id:
@@ -1185,8 +1392,13 @@ class ElementsListDialog(
 	def onTreeLabelEditEnd(self,evt):
 			selectedItemNewName=evt.GetLabel()
 			item=self.tree.GetSelection()
-			selectedItemType = self.tree.GetItemData(item).item
+			element = self.tree.GetItemData(item)
+			selectedItemType = element.item
 			selectedItemType.rename(selectedItemNewName)
+			for index, otherElement in enumerate(self._elements):
+				if otherElement is element:
+					self._elementsFilter.setLabel(index, selectedItemType.label)
+					break
 
 	def _clearSearchText(self):
 		self._searchText = ""
@@ -1236,6 +1448,7 @@ class ElementsListDialog(
 
 	def onAction(self, activate):
 		prevFocus = gui.mainFrame.prevFocus
+		self._cancelPopulating()
 		self.Close()
 		# Save off the last selected element type on to the class so its used in initialization next time.
 		self.__class__.lastSelectedElementType=self.lastSelectedElementType
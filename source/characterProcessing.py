@@ -23,6 +23,7 @@ from logHandler import log
 import globalVars
 import config
 from NVDAState import WritePaths
+from utils.lruCache import LRUCache
 
 
 _LocaleDataT = TypeVar("_LocaleDataT")
@@ -417,6 +418,118 @@ def _getSpeechSymbolsForLocale(locale: str) -> Tuple[SpeechSymbols, SpeechSymbol
 		pass
 	return builtin, user
 
+
+class _UnknownFirstChars(Exception):
+	"""Raised when the characters which can start a match of a regular expression can't be determined."""
+
+
+try:
+	# Python 3.11 and later
+	from re import _constants as _reConstants, _parser as _reParser
+except ImportError:
+	import sre_constants as _reConstants
+	import sre_parse as _reParser
+
+_FIRST_CHARS_CATEGORIES = {
+	_reConstants.CATEGORY_DIGIT: r"\d",
+	_reConstants.CATEGORY_SPACE: r"\s",
+	_reConstants.CATEGORY_WORD: r"\w",
+}
+#: Opcodes of repeats, which take (min, max, subpattern) arguments.
+#: Possessive repeats only exist in Python 3.11 and later.
+_REPEAT_OPCODES = tuple(
+	getattr(_reConstants, name)
+	for name in ("MAX_REPEAT", "MIN_REPEAT", "POSSESSIVE_REPEAT")
+	if hasattr(_reConstants, name)
+)
+#: The opcode of atomic groups, which only exist in Python 3.11 and later.
+_ATOMIC_GROUP_OPCODE = getattr(_reConstants, "ATOMIC_GROUP", None)
+
+
+def _getCharSetFirstChars(charSet) -> List[str]:
+	"""Converts the items of a parsed character set back to character set items.
+	@param charSet: A sequence of (opcode, argument) pairs as produced by the regular expression parser.
+	@raise _UnknownFirstChars: If the character set contains items which aren't supported.
+	"""
+	items = []
+	for op, av in charSet:
+		if op is _reConstants.LITERAL:
+			items.append(re.escape(chr(av)))
+		elif op is _reConstants.RANGE:
+			items.append(f"{re.escape(chr(av[0]))}-{re.escape(chr(av[1]))}")
+		elif op is _reConstants.CATEGORY and av in _FIRST_CHARS_CATEGORIES:
+			items.append(_FIRST_CHARS_CATEGORIES[av])
+		else:
+			raise _UnknownFirstChars
+	return items
+
+
+def _getGroupFirstChars(op, av) -> Tuple[List[str], bool]:
+	"""Collects the characters which can start a match of a group, alternation or repeat.
+	@return: A list of character set items, and whether the construct can match the empty string.
+	@raise _UnknownFirstChars: If the construct isn't supported.
+	"""
+	if op is _reConstants.SUBPATTERN:
+		group, addFlags, delFlags, sub = av
+		if addFlags & re.IGNORECASE:
+			raise _UnknownFirstChars
+		return _getFirstChars(sub)
+	if _ATOMIC_GROUP_OPCODE is not None and op is _ATOMIC_GROUP_OPCODE:
+		return _getFirstChars(av)
+	if op is _reConstants.BRANCH:
+		items = []
+		nullable = False
+		for branch in av[1]:
+			branchItems, branchNullable = _getFirstChars(branch)
+			items.extend(branchItems)
+			nullable = nullable or branchNullable
+		return items, nullable
+	if op in _REPEAT_OPCODES:
+		minCount, maxCount, sub = av
+		items, nullable = _getFirstChars(sub)
+		return items, nullable or minCount == 0
+	raise _UnknownFirstChars
+
+
+def _getFirstChars(subpattern) -> Tuple[List[str], bool]:
+	"""Collects the characters which can start a match of a parsed regular expression.
+	Zero width assertions are skipped, as they don't consume any characters.
+	@param subpattern: A sequence of (opcode, argument) pairs as produced by the regular expression parser.
+	@return: A list of character set items, and whether the subpattern can match the empty string.
+	@raise _UnknownFirstChars: If the subpattern contains constructs which aren't supported.
+	"""
+	items = []
+	for op, av in subpattern:
+		if op in (_reConstants.AT, _reConstants.ASSERT, _reConstants.ASSERT_NOT):
+			continue
+		if op is _reConstants.LITERAL:
+			items.append(re.escape(chr(av)))
+			return items, False
+		if op is _reConstants.IN:
+			items.extend(_getCharSetFirstChars(av))
+			return items, False
+		subItems, nullable = _getGroupFirstChars(op, av)
+		items.extend(subItems)
+		if not nullable:
+			return items, False
+	return items, True
+
+
+def _getFirstCharsSet(pattern: str) -> str:
+	"""Builds a character set matching at least every character which can start a match of a regular expression.
+	@param pattern: The regular expression.
+	@return: The contents of a regular expression character set, without the enclosing brackets.
+	@raise _UnknownFirstChars: If the characters can't be determined,
+		including when the regular expression can match the empty string.
+	"""
+	if re.compile(pattern).flags & re.IGNORECASE:
+		raise _UnknownFirstChars
+	items, nullable = _getFirstChars(_reParser.parse(pattern))
+	if nullable:
+		raise _UnknownFirstChars
+	return "".join(items)
+
+
 class SpeechSymbolProcessor(object):
 	"""
 	Handles processing of symbol pronunciation for a locale.
@@ -549,6 +662,73 @@ class SpeechSymbolProcessor(object):
 			log.error("Invalid complex symbol regular expression in locale %s: %s" % (locale, e))
 			raise LookupError
 
+		#: Characters which can start a complex symbol or a multi-character simple symbol,
+		#: or C{None} if the pre-scan can't be used.
+		self._complexFirstChars = self._getComplexFirstChars(complexSymbolsList, multiChars, locale)
+		#: Pre-scan regular expressions for each symbol level, see L{_getPrescanRegexp}.
+		self._prescanRegexps: Dict[SymbolLevel, Optional[re.Pattern]] = {}
+
+	@staticmethod
+	def _getComplexFirstChars(
+			complexSymbols: List[SpeechSymbol],
+			multiChars: List[str],
+			locale: str
+	) -> Optional[str]:
+		"""Gets the characters which can start a complex symbol or a multi-character simple symbol.
+		@return: The contents of a regular expression character set,
+			or C{None} if the characters can't be determined for a complex symbol.
+		"""
+		try:
+			return "".join(
+				_getFirstCharsSet(symbol.pattern) for symbol in complexSymbols
+			) + re.escape("".join({identifier[0] for identifier in multiChars}))
+		except (_UnknownFirstChars, re.error):
+			log.debugWarning(f"Can't pre-scan text for complex symbols in locale {locale}")
+			return None
+
+	def _isUnchangedByLevel(self, symbol: SpeechSymbol, level: SymbolLevel) -> bool:
+		"""Whether a single occurrence of a simple symbol is replaced by itself at the given level.
+		"""
+		if level >= symbol.level and symbol.replacement:
+			return False
+		return (
+			symbol.preserve == SYMPRES_ALWAYS
+			or (symbol.preserve == SYMPRES_NOREP and level < symbol.level)
+			or symbol.identifier == " "
+		)
+
+	def _getPrescanRegexp(self, level: SymbolLevel) -> Optional[re.Pattern]:
+		"""Gets a regular expression which finds anything in a text that processing at the given level could change.
+		It is a single character set of the characters which start symbols that aren't replaced by themselves,
+		plus the repeated character and trailing space rules of the full expression.
+		If it doesn't match, L{processText} can return the text as is without running the full expression.
+		@return: The regular expression, or C{None} if text must always be processed in full.
+		"""
+		try:
+			return self._prescanRegexps[level]
+		except KeyError:
+			pass
+		if self._complexFirstChars is None:
+			prescan = None
+		else:
+			changedChars = []
+			symbolChars = []
+			for identifier, symbol in self.computedSymbols.items():
+				if len(identifier) != 1 or symbol.pattern:
+					continue
+				symbolChars.append(identifier)
+				if not self._isUnchangedByLevel(symbol, level):
+					changedChars.append(identifier)
+			patterns = [r"  +$"]
+			if symbolChars:
+				patterns.append(r"(?P<repTmp>[%s])(?P=repTmp){3}" % re.escape("".join(symbolChars)))
+			firstChars = self._complexFirstChars + re.escape("".join(changedChars))
+			if firstChars:
+				patterns.append("[%s]" % firstChars)
+			prescan = re.compile("|".join(patterns), re.UNICODE)
+		self._prescanRegexps[level] = prescan
+		return prescan
+
 	def _replaceGroups(self, m: re.Match, string: str) -> str:
 		"""Replace matching group references (\\1, \\2, ...) with the corresponding matched groups.
 		Also replace \\\\ with \\ and reject other escapes, for escaping coherency.
@@ -618,6 +798,10 @@ class SpeechSymbolProcessor(object):
 				return suffix
 
 	def processText(self, text, level):
+		prescan = self._getPrescanRegexp(level)
+		if prescan is not None and not prescan.search(text):
+			# Nothing in this text would be changed.
+			return text
 		self._level = level
 		return self._regexp.sub(self._regexpRepl, text)
 
@@ -664,6 +848,7 @@ class SpeechSymbolProcessor(object):
 
 		# Do this in case the symbol wasn't in userSymbols before.
 		self.userSymbols.symbols[identifier] = userSymbol
+		_processedSymbolsCache.clear()
 		return True
 
 	def deleteSymbol(self, symbol):
@@ -677,6 +862,7 @@ class SpeechSymbolProcessor(object):
 			del self.userSymbols.symbols[symbol.identifier]
 		except KeyError:
 			pass
+		_processedSymbolsCache.clear()
 
 	def isBuiltin(self, symbolIdentifier: str) -> bool:
 		"""Determine whether a symbol is built in.
@@ -690,19 +876,32 @@ class SpeechSymbolProcessor(object):
 _localeSpeechSymbolProcessors: LocaleDataMap[SpeechSymbolProcessor] = LocaleDataMap(SpeechSymbolProcessor)
 
 
+#: Caches the results of L{processSpeechSymbols}, keyed on (locale, level, text).
+#: The same text is often spoken over and over, e.g. when focus returns to a control or a line is re-read.
+_processedSymbolsCache: LRUCache[Tuple[str, SymbolLevel, str], str] = LRUCache(maxSize=1000)
+
+
 def processSpeechSymbols(locale: str, text: str, level: SymbolLevel):
 	"""Process some text, converting symbols according to desired pronunciation.
 	@param locale: The locale of the text.
 	@param text: The text to process.
 	@param level: The symbol level to use.
 	"""
+	key = (locale, level, text)
+	result = _processedSymbolsCache.get(key)
+	if result is not None:
+		return result
 	try:
 		ss = _localeSpeechSymbolProcessors.fetchLocaleData(locale)
 	except LookupError:
 		if not locale.startswith("en_"):
-			return processSpeechSymbols("en", text, level)
+			result = processSpeechSymbols("en", text, level)
+			_processedSymbolsCache.set(key, result)
+			return result
 		raise
-	return ss.processText(text, level)
+	result = ss.processText(text, level)
+	_processedSymbolsCache.set(key, result)
+	return result
 
 def processSpeechSymbol(locale, symbol):
 	"""Process a single symbol according to desired pronunciation.
@@ -729,8 +928,11 @@ def clearSpeechSymbols():
 	"""
 	SpeechSymbolProcessor.localeSymbols.invalidateAllData()
 	_localeSpeechSymbolProcessors.invalidateAllData()
+	_processedSymbolsCache.clear()
 
 def handlePostConfigProfileSwitch(prevConf=None):
+	# The new profile may use different symbol settings.
+	_processedSymbolsCache.clear()
 	if not prevConf:
 		return
 	if prevConf["speech"]["includeCLDR"] is not config.conf["speech"]["includeCLDR"]:
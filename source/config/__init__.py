@@ -22,8 +22,9 @@ import itertools
 import contextlib
 from copy import deepcopy
 from collections import OrderedDict
+from types import MappingProxyType
 from configobj import ConfigObj
-from configobj.validate import Validator
+from configobj.validate import ValidateError, Validator
 from logHandler import log
 import logging
 from logging import DEBUG
@@ -45,6 +46,7 @@ from typing import (
 	Any,
 	Dict,
 	List,
+	Mapping,
 	Optional,
 	Set,
 	Tuple,
@@ -537,6 +539,11 @@ class ConfigManager(object):
 			"_featureFlag": _validateConfig_featureFlag
 		})
 		self.rootSection: Optional[AggregatedSection] = None
+		#: Incremented whenever resolved settings might have changed;
+		#: i.e. when profiles are switched or a setting is written.
+		#: Code which derives state from settings can compare this to know when to update that state.
+		self.generation: int = 0
+		self._snapshot: Optional[Mapping[Tuple[str, ...], Any]] = None
 		self._shouldHandleProfileSwitch: bool = True
 		self._pendingHandleProfileSwitch: bool = False
 		self._suspendedTriggers: Optional[List[ProfileTrigger]] = None
@@ -555,6 +562,7 @@ class ConfigManager(object):
 		init = currentRootSection is None
 		# Reset the cache.
 		self.rootSection = AggregatedSection(self, (), self.spec, self.profiles)
+		self._invalidateSnapshot()
 		if init:
 			# We're still initialising, so don't notify anyone about this change.
 			return
@@ -632,6 +640,49 @@ class ConfigManager(object):
 	def dict(self):
 		return self.rootSection.dict()
 
+	def getSnapshot(self) -> Mapping[Tuple[str, ...], Any]:
+		"""Get an immutable, flattened view of all resolved settings, keyed by key path;
+		e.g. C{("braille", "translationTable")}.
+		This is much cheaper to read from than descending through sections,
+		so it is intended for code which reads settings very often.
+		Settings in L{BASE_ONLY_SECTIONS} and settings which are not in the config spec are not included.
+		A new snapshot is built when it is first fetched after profiles are switched or settings are written;
+		see L{generation}.
+		"""
+		snapshot = self._snapshot
+		if snapshot is not None:
+			return snapshot
+		generation = self.generation
+		values = {}
+		for key in self.rootSection:
+			if key in self.BASE_ONLY_SECTIONS:
+				continue
+			section = self.rootSection.get(key)
+			if isinstance(section, AggregatedSection):
+				section._flattenInto(values)
+		snapshot = MappingProxyType(values)
+		if generation == self.generation:
+			# Settings weren't changed while the snapshot was being built.
+			self._snapshot = snapshot
+		return snapshot
+
+	def _invalidateSnapshot(self):
+		self.generation += 1
+		self._snapshot = None
+
+	def _updateSnapshot(self, keyPath: Tuple[str, ...], val: Any):
+		"""Update a single setting in the snapshot after it has been written,
+		rather than having the whole snapshot rebuilt.
+		"""
+		snapshot = self._snapshot
+		self.generation += 1
+		if snapshot is None or keyPath not in snapshot:
+			self._snapshot = None
+			return
+		values = dict(snapshot)
+		values[keyPath] = val
+		self._snapshot = MappingProxyType(values)
+
 	def listProfiles(self):
 		for name in os.listdir(WritePaths.profilesDir):
 			name, ext = os.path.splitext(name)
@@ -1191,6 +1242,22 @@ class AggregatedSection:
 	def copy(self):
 		return dict(self.items())
 
+	def _flattenInto(self, values: Dict[Tuple[str, ...], Any]):
+		"""Add the settings in this section and its subsections to C{values}, keyed by key path.
+		Settings which are not in the config spec are skipped,
+		as they have not been validated and may change type once their spec is known.
+		Settings which are not valid are also skipped.
+		"""
+		for key in self:
+			try:
+				val = self[key]
+			except (KeyError, ValidateError):
+				continue
+			if isinstance(val, AggregatedSection):
+				val._flattenInto(values)
+			elif self._spec.get(key) is not None:
+				values[self.path + (key,)] = val
+
 	def dict(self):
 		"""Return a deepcopy of self as a dictionary.
 		Adapted from L{configobj.Section.dict}.
@@ -1233,6 +1300,7 @@ class AggregatedSection:
 			elif cache is KeyError:
 				# This key now exists, so remove the cached non-existence.
 				del self._cache[key]
+			self.manager._invalidateSnapshot()
 			# If an AggregatedSection isn't already cached,
 			# An appropriate AggregatedSection will be created the next time this section is fetched.
 			return
@@ -1265,6 +1333,7 @@ class AggregatedSection:
 		self._getUpdateSection()[key] = val
 		self.manager._markWriteProfileDirty()
 		self._cache[key] = val
+		self.manager._updateSnapshot(self.path + (key,), val)
 
 	def _getUpdateSection(self):
 		profile = self.profiles[-1]
@@ -1296,6 +1365,7 @@ class AggregatedSection:
 		# Clear it and replace the content so it remains linked to the main spec.
 		self._spec.clear()
 		self._spec.update(val)
+		self.manager._invalidateSnapshot()
 
 class ProfileTrigger(object):
 	"""A trigger for automatic activation/deactivation of a configuration profile.
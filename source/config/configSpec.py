@@ -46,6 +46,13 @@ schemaVersion = integer(min=0, default={latestSchemaVersion})
 	autoLanguageSwitching = boolean(default=true)
 	autoDialectSwitching = boolean(default=false)
 	delayedCharacterDescriptions = boolean(default=false)
+	# The number of reading chunks after the one being spoken whose speech say all prepares ahead of time.
+	# 0 disables reading ahead.
+	sayAllReadAheadChunks = integer(default=3, min=0, max=10)
+	# The maximum number of ranges of text whose generated speech is cached for re-reading.
+	# 0 disables the cache.
+	# Only documents which report every change to their content, such as browse mode documents, use the cache.
+	textInfoSpeechCacheSize = integer(default=0, min=0)
 
 	[[__many__]]
 		capPitchChange = integer(default=30,min=-100,max=100)
@@ -188,6 +195,9 @@ schemaVersion = integer(min=0, default={latestSchemaVersion})
 	enableOnPageLoad = boolean(default=true)
 	autoFocusFocusableElements = boolean(default=False)
 	loadChromiumVBufOnBusyState = featureFlag(optionsEnum="BoolFlag", behaviorOfDefault="enabled")
+	# The maximum total length of the XML text of the ranges whose parsed fields are cached for each buffer.
+	# 0 disables the cache.
+	maxFieldsCacheSize = integer(default=1000000, min=0)
 
 [touch]
 	enabled = boolean(default=true)
@@ -8,6 +8,7 @@ Implementation of cursor managers.
 A cursor manager provides caret navigation and selection commands for a virtual text range.
 """
 
+import re
 import wx
 import core
 import baseObject
@@ -109,6 +110,10 @@ class CursorManager(documentBase.TextContainerObject,baseObject.ScriptableObject
 
 	_lastFindText=""
 	_lastCaseSensitivity=False
+	#: Whether the last text searched for was a regular expression.
+	_lastUseRegex = False
+	#: Whether the last search only found whole words.
+	_lastWholeWord = False
 
 	def __init__(self, *args, **kwargs):
 		super(CursorManager, self).__init__(*args, **kwargs)
@@ -173,11 +178,65 @@ class CursorManager(documentBase.TextContainerObject,baseObject.ScriptableObject
 			speech.speakSelectionChange(oldInfo, selection)
 		self.selection = selection
 
-	def doFindText(self, text, reverse=False, caseSensitive=False, willSayAllResume=False):
+	def doFindText(
+			self,
+			text,
+			reverse=False,
+			caseSensitive=False,
+			willSayAllResume=False,
+			useRegex=False,
+			wholeWord=False
+	):
+		"""
+		@param useRegex: Whether the text is a regular expression.
+			Only supported by TextInfos based on L{textInfos.offsets.OffsetsTextInfo};
+			the user is told if it isn't supported.
+		@param wholeWord: Whether to only find matches which don't start or end within a word.
+			Only supported by TextInfos based on L{textInfos.offsets.OffsetsTextInfo};
+			the user is told if it isn't supported.
+		"""
 		if not text:
 			return
 		info=self.makeTextInfo(textInfos.POSITION_CARET)
-		res=info.find(text,reverse=reverse,caseSensitive=caseSensitive)
+		# Only pass the extra search options when used,
+		# as not all TextInfo implementations support them.
+		kwargs = {}
+		if useRegex:
+			kwargs["useRegex"] = True
+		if wholeWord:
+			kwargs["wholeWord"] = True
+		try:
+			res = info.find(text, reverse=reverse, caseSensitive=caseSensitive, **kwargs)
+		except re.error as e:
+			wx.CallAfter(
+				gui.messageBox,
+				# Translators: message displayed to the user when
+				# searching for a regular expression which isn't valid.
+				# {error} is replaced with the reason it isn't valid.
+				_("Invalid regular expression: {error}").format(error=e),
+				# Translators: message dialog title displayed to the user when
+				# searching for a regular expression which isn't valid.
+				_("Find Error"),
+				wx.OK | wx.ICON_ERROR
+			)
+			return
+		except (NotImplementedError, TypeError):
+			if not kwargs:
+				raise
+			# The TextInfo doesn't support the search options,
+			# or predates them and doesn't accept them at all.
+			log.debugWarning(f"Search options {kwargs} not supported by {info!r}", exc_info=True)
+			wx.CallAfter(
+				gui.messageBox,
+				# Translators: message displayed to the user when
+				# searching for a regular expression or a whole word in a document which doesn't support it.
+				_("Regular expression and whole word searches are not supported in this document"),
+				# Translators: message dialog title displayed to the user when
+				# searching with options which the document doesn't support.
+				_("Find Error"),
+				wx.OK | wx.ICON_ERROR
+			)
+			return
 		if res:
 			self.selection=info
 			speech.cancelSpeech()
@@ -197,6 +256,8 @@ class CursorManager(documentBase.TextContainerObject,baseObject.ScriptableObject
 			)
 		CursorManager._lastFindText=text
 		CursorManager._lastCaseSensitivity=caseSensitive
+		CursorManager._lastUseRegex = useRegex
+		CursorManager._lastWholeWord = wholeWord
 
 	def script_find(self, gesture, reverse=False):
 		# #8566: We need this to be a modal dialog, but it mustn't block this script.
@@ -225,6 +286,8 @@ class CursorManager(documentBase.TextContainerObject,baseObject.ScriptableObject
 			self._lastFindText,
 			caseSensitive=self._lastCaseSensitivity,
 			willSayAllResume=willSayAllResume(gesture),
+			useRegex=self._lastUseRegex,
+			wholeWord=self._lastWholeWord,
 		)
 
 	@script(
@@ -244,6 +307,8 @@ class CursorManager(documentBase.TextContainerObject,baseObject.ScriptableObject
 			reverse=True,
 			caseSensitive=self._lastCaseSensitivity,
 			willSayAllResume=willSayAllResume(gesture),
+			useRegex=self._lastUseRegex,
+			wholeWord=self._lastWholeWord,
 		)
 
 	def script_moveByPage_back(self,gesture):
@@ -35,6 +35,33 @@ _pendingEventCountsByNameAndObj={}
 # Needed to ensure updates are atomic, as these might be updated from multiple threads simultaneously.
 _pendingEventCountsLock=threading.RLock()
 
+#: Events which only need to be handled once for an object, however many are queued before they run.
+#: A queued event of these types replaces any pending event of the same type for the same object,
+#: as long as it has no extra arguments.
+_COALESCABLE_EVENTS = frozenset({
+	"nameChange",
+	"descriptionChange",
+	"valueChange",
+	"locationChange",
+})
+
+#: Events which indicate that the content of an object may have changed independently of the caret.
+#: These discard the speech cached for re-reading text; see L{speech.clearTextInfoSpeechCache}.
+_CONTENT_CHANGE_EVENTS = frozenset({
+	"textChange",
+	"textInsert",
+	"textRemove",
+	"valueChange",
+	"nameChange",
+	"descriptionChange",
+	"stateChange",
+	"liveRegionChange",
+	"typedCharacter",
+	"documentLoadComplete",
+	"pageChange",
+	"UIA_layoutInvalidated",
+})
+
 #: the last object queued for a gainFocus event. Useful for code running outside NVDA's core queue 
 lastQueuedFocusObject=None
 
@@ -54,17 +81,30 @@ def queueEvent(eventName,obj,**kwargs):
 		_pendingEventCountsByName[eventName]=_pendingEventCountsByName.get(eventName,0)+1
 		_pendingEventCountsByObj[obj]=_pendingEventCountsByObj.get(obj,0)+1
 		_pendingEventCountsByNameAndObj[(eventName,obj)]=_pendingEventCountsByNameAndObj.get((eventName,obj),0)+1
-	queueHandler.queueFunction(
+	if eventName in _COALESCABLE_EVENTS and not kwargs:
+		coalescingKey = (eventName, obj)
+	else:
+		coalescingKey = None
+	replaced = queueHandler.queueFunction(
 		queueHandler.eventQueue,
 		_queueEventCallback,
 		eventName,
 		obj,
 		kwargs,
-		_immediate=eventName == "gainFocus"
+		_immediate=eventName == "gainFocus",
+		_coalescingKey=coalescingKey
 	)
+	if replaced:
+		# The callback for the replaced event will never run.
+		_removePendingEvent(eventName, obj)
 
 
 def _queueEventCallback(eventName,obj,kwargs):
+	_removePendingEvent(eventName, obj)
+	executeEvent(eventName, obj, **kwargs)
+
+
+def _removePendingEvent(eventName, obj):
 	with _pendingEventCountsLock:
 		curCount=_pendingEventCountsByName.get(eventName,0)
 		if curCount>1:
@@ -81,7 +121,6 @@ def _queueEventCallback(eventName,obj,kwargs):
 			_pendingEventCountsByNameAndObj[(eventName,obj)]=(curCount-1)
 		elif curCount==1:
 			del _pendingEventCountsByNameAndObj[(eventName,obj)]
-	executeEvent(eventName,obj,**kwargs)
 
 def isPendingEvents(eventName=None,obj=None):
 	"""Are there currently any events queued?
@@ -295,6 +334,8 @@ def executeEvent(
 	@param obj: the object the event is for
 	@param kwargs: Additional event parameters as keyword arguments.
 	"""
+	if eventName in _CONTENT_CHANGE_EVENTS:
+		speech.clearTextInfoSpeechCache()
 	if objectBelowLockScreenAndWindowsIsLocked(
 		obj,
 		shouldLog=config.conf["debugLog"]["events"],
@@ -6,9 +6,16 @@
 
 """Helper module to ease communication to and from liblouis."""
 
+from typing import (
+	List,
+	Optional,
+	Tuple,
+)
+
 import louis
 from logHandler import log
 import config
+from utils.lruCache import LRUCache
 
 LOUIS_TO_NVDA_LOG_LEVELS = {
 	louis.LOG_ALL: log.DEBUG,
@@ -48,13 +55,53 @@ def terminate():
 	louis.registerLogCallback(None)
 	# Free liblouis resources
 	louis.liblouis.lou_free()
+	invalidateTranslationCache()
+
+
+_TranslationCacheKeyT = Tuple[Tuple[str, ...], str, Optional[Tuple[int, ...]], Optional[int], int]
+_TranslationResultT = Tuple[Tuple[int, ...], Tuple[int, ...], Tuple[int, ...], Optional[int]]
+
+#: Caches the results of L{translate}, keyed on (table list, text, typeform, cursor position, mode).
+#: The same regions, such as the ancestors of the focus, are translated many times as focus and caret move.
+_translationCache: LRUCache[_TranslationCacheKeyT, _TranslationResultT] = LRUCache(maxSize=500)
+
+
+def invalidateTranslationCache():
+	"""Discards all cached translations.
+	This should be called when the translation table changes.
+	"""
+	_translationCache.clear()
+
 
 def translate(tableList, inbuf, typeform=None, cursorPos=None, mode=0):
 	"""
 	Convenience wrapper for louis.translate that:
-	* returns a list of integers instead of a string with cells, and
-	* distinguishes between cursor position 0 (cursor at first character) and None (no cursor at all)
+	* returns a list of integers instead of a string with cells,
+	* distinguishes between cursor position 0 (cursor at first character) and None (no cursor at all), and
+	* caches results, returning new lists on every call so callers are free to modify them.
 	"""
+	key = (
+		tuple(tableList),
+		inbuf,
+		tuple(typeform) if typeform is not None else None,
+		cursorPos,
+		mode,
+	)
+	cached = _translationCache.get(key)
+	if cached is None:
+		cached = _translate(tableList, inbuf, typeform, cursorPos, mode)
+		_translationCache.set(key, cached)
+	braille, brailleToRawPos, rawToBraillePos, brailleCursorPos = cached
+	return list(braille), list(brailleToRawPos), list(rawToBraillePos), brailleCursorPos
+
+
+def _translate(
+		tableList: List[str],
+		inbuf: str,
+		typeform: Optional[List[int]],
+		cursorPos: Optional[int],
+		mode: int
+) -> _TranslationResultT:
 	text = inbuf.replace('\0','')
 	braille, brailleToRawPos, rawToBraillePos, brailleCursorPos = louis.translate(
 		tableList,
@@ -64,9 +111,9 @@ def translate(tableList, inbuf, typeform=None, cursorPos=None, mode=0):
 		cursorPos=cursorPos or 0,
 		mode=mode
 	)
-	# liblouis gives us back a character string of cells, so convert it to a list of ints.
+	# liblouis gives us back a character string of cells, so convert it to ints.
 	# For some reason, the highest bit is set, so only grab the lower 8 bits.
-	braille = [ord(cell) & 255 for cell in braille]
+	braille = tuple(ord(cell) & 255 for cell in braille)
 	if cursorPos is None:
 		brailleCursorPos = None
-	return braille, brailleToRawPos, rawToBraillePos, brailleCursorPos
+	return braille, tuple(brailleToRawPos), tuple(rawToBraillePos), brailleCursorPos
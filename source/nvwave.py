@@ -18,8 +18,11 @@ from ctypes import (
 	windll,
 	POINTER,
 	Structure,
+	c_char,
 	c_uint,
+	cast,
 	create_unicode_buffer,
+	memmove,
 	sizeof,
 	byref,
 	c_void_p,
@@ -151,6 +154,106 @@ def _isDebugForNvWave():
 	return config.conf["debugLog"]["nvwave"]
 
 
+class _AudioRingBuffer:
+	"""A preallocated buffer for audio which is waiting to be played or is being played.
+	Audio is written directly after the audio waiting to be played.
+	The waiting audio is then taken as a slice of the buffer, which the device plays in place,
+	so audio is only copied once, when it is written.
+	The space used by the slice which was taken last isn't reused,
+	as the device may still be playing it.
+	When there is no room left at the end of the buffer,
+	the waiting audio is moved to the start of the buffer if there is room there,
+	otherwise a larger buffer is allocated.
+	"""
+
+	def __init__(self, size: int):
+		"""
+		@param size: The initial size of the buffer in bytes.
+		"""
+		self._lock = threading.Lock()
+		self._data = bytearray(size)
+		self._view = memoryview(self._data)
+		#: The offsets of the start and end of the audio waiting to be played.
+		self._start = 0
+		self._end = 0
+		#: The slice of the buffer which was taken last.
+		self._playing: memoryview = self._view[0:0]
+		#: The offset of the start of L{_playing}.
+		self._playingStart = 0
+		#: The number of times a larger buffer had to be allocated.
+		self.reallocations = 0
+
+	def __len__(self) -> int:
+		"""The number of bytes of audio waiting to be played."""
+		return self._end - self._start
+
+	def write(self, data: typing.Union[bytes, c_void_p], size: typing.Optional[int] = None):
+		"""Copies audio into the buffer after the audio which is waiting to be played.
+		@param data: The audio.
+		@param size: The size of the audio in bytes if data is a ctypes pointer.
+			If data is a Python bytes object, size should be None.
+		"""
+		if size is None:
+			size = len(data)
+		with self._lock:
+			offset = self._makeRoom(size)
+			if size:
+				memmove((c_char * size).from_buffer(self._view, offset), data, size)
+			self._end = offset + size
+
+	def _makeRoom(self, size: int) -> int:
+		"""Ensures that there is room for C{size} bytes directly after the waiting audio.
+		The waiting audio is moved if necessary.
+		@return: The offset at which to write the audio.
+		"""
+		waiting = self._end - self._start
+		if self._playing and self._end <= self._playingStart:
+			# The waiting audio has wrapped around to before the audio being played.
+			if self._end + size <= self._playingStart:
+				return self._end
+			limit = None
+		else:
+			capacity = len(self._data)
+			if self._end + size <= capacity:
+				return self._end
+			# Move the waiting audio to the start of the buffer.
+			limit = self._playingStart if self._playing else capacity
+		if limit is not None and waiting + size <= limit:
+			newStart = 0
+			self._view[newStart:waiting] = self._view[self._start:self._end]
+		else:
+			# The audio being played is kept alive by L{_playing} while it is still needed.
+			newSize = max(len(self._data) * 2, waiting + size)
+			data = bytearray(newSize)
+			data[0:waiting] = self._view[self._start:self._end]
+			self._data = data
+			self._view = memoryview(data)
+			# The audio being played is no longer in this buffer, so it doesn't limit where audio is written.
+			self._playingStart = newSize
+			self.reallocations += 1
+			if _isDebugForNvWave():
+				log.debug(f"Audio buffer grown to {newSize} bytes")
+		self._start = 0
+		self._end = waiting
+		return waiting
+
+	def take(self) -> memoryview:
+		"""Takes the audio waiting to be played, to feed it to the device.
+		The returned slice remains valid until audio is written after the next call to L{take}.
+		"""
+		with self._lock:
+			audio = self._view[self._start:self._end]
+			self._playing = audio
+			self._playingStart = self._start
+			self._start = self._end
+		return audio
+
+	def clear(self):
+		"""Discards the audio waiting to be played."""
+		with self._lock:
+			self._start = self._end
+
+
 class AudioPurpose(Enum):
 	"""The purpose of a particular stream of audio.
 	"""
@@ -171,6 +274,8 @@ class WinmmWavePlayer(garbageHandler.TrackedObject):
 	audioDeviceError_static: bool = False
 	#: Minimum length of buffer (in ms) before audio is played.
 	MIN_BUFFER_MS = 300
+	#: The initial size of the buffer of audio, as a multiple of the minimum length of buffer.
+	RING_BUFFER_CHUNKS = 4
 	#: Flag used to signal that L{stop} has been called.
 	STOPPING = "stopping"
 	#: A lock to prevent WaveOut* functions from being called simultaneously,
@@ -240,7 +345,10 @@ class WinmmWavePlayer(garbageHandler.TrackedObject):
 			BITS_PER_BYTE = 8
 			MS_PER_SEC = 1000
 			self._minBufferSize = samplesPerSec * channels * (bitsPerSample / BITS_PER_BYTE) / MS_PER_SEC * self.MIN_BUFFER_MS
-			self._buffer = b""
+			#: Holds audio until there is at least L{_minBufferSize} bytes of it.
+			#: Audio may wait in the buffer while the previous chunk is playing,
+			#: so start with room for several chunks.
+			self._buffer = _AudioRingBuffer(int(self._minBufferSize) * self.RING_BUFFER_CHUNKS)
 		else:
 			self._minBufferSize = None
 		#: Function to call when the previous chunk of audio has finished playing.
@@ -373,18 +481,18 @@ class WinmmWavePlayer(garbageHandler.TrackedObject):
 		@param onDone: Function to call when this chunk has finished playing.
 		@raise WindowsError: If there was an error playing the audio.
 		"""
-		if size is not None:
-			data = string_at(data, size)
 		if not self._minBufferSize:
+			if size is not None:
+				data = string_at(data, size)
 			self._feedUnbuffered_handleErrors(data, onDone=onDone)
 			return
-		self._buffer += data
+		# Copy the audio straight into the buffer, where it will be played from.
+		self._buffer.write(data, size)
 		# If onDone was specified, we must play audio regardless of the minimum buffer size
 		# so we can accurately call onDone at the end of this chunk.
+		# That is, each chunk played ends at the byte offset of its onDone callback.
 		if onDone or len(self._buffer) > self._minBufferSize:
-			data = self._buffer
-			self._buffer = b""
-			self._feedUnbuffered_handleErrors(data, onDone=onDone)
+			self._feedUnbuffered_handleErrors(self._buffer.take(), onDone=onDone)
 
 	def _feedUnbuffered_handleErrors(self, data, onDone=None) -> bool:
 		"""Tries to feed the device, on error resets the device and tries again.
@@ -404,14 +512,20 @@ class WinmmWavePlayer(garbageHandler.TrackedObject):
 				log.debugWarning("Unable to send data to audio device on second attempt.", exc_info=True)
 				return False
 
-	def _feedUnbuffered(self, data, onDone=None):
+	def _feedUnbuffered(self, data: typing.Union[bytes, memoryview], onDone=None):
 		"""
+		@param data: The audio, either as bytes or as a slice of the L{_AudioRingBuffer} to play it from.
 		@note: Raises WindowsError on invalid device (see winmm functions
 		"""
 		if self._audioDucker and not self._audioDucker.enable():
 			return
 		whdr = WAVEHDR()
-		whdr.lpData = data
+		if isinstance(data, memoryview):
+			# Play the audio in place.
+			# The header keeps the slice alive until it has been unprepared.
+			whdr.lpData = cast((c_char * len(data)).from_buffer(data), LPSTR)
+		else:
+			whdr.lpData = data
 		whdr.dwBufferLength = len(data)
 		with self._lock:
 			with self._waveout_lock:
@@ -499,9 +613,7 @@ class WinmmWavePlayer(garbageHandler.TrackedObject):
 		if not self._minBufferSize:
 			return self._idleUnbuffered()
 		if self._buffer:
-			buffer = self._buffer
-			self._buffer = b""
-			self._feedUnbuffered_handleErrors(buffer)
+			self._feedUnbuffered_handleErrors(self._buffer.take())
 
 		return self._idleUnbuffered()
 
@@ -530,7 +642,7 @@ class WinmmWavePlayer(garbageHandler.TrackedObject):
 		"""
 		if self._audioDucker: self._audioDucker.disable()
 		if self._minBufferSize:
-			self._buffer = b""
+			self._buffer.clear()
 		with self._waveout_lock:
 			if not self._waveout:
 				return
@@ -4,19 +4,87 @@
 #This file is covered by the GNU General Public License.
 #See the file COPYING for more details.
 
+import threading
 import types
-from queue import SimpleQueue
+from queue import Empty, SimpleQueue
+from typing import Dict, Hashable, Optional
 import globalVars
 from logHandler import log
 import watchdog
 import core
 
+
+class CoalescingQueue:
+	"""A queue for calls that should be made on NVDA's main thread,
+	which can be used in place of a L{SimpleQueue}.
+	Items are fetched in the order they were put.
+	An item may be put with a coalescing key,
+	in which case only the latest pending item with that key is fetched;
+	earlier pending items with the same key are dropped.
+	"""
+
+	def __init__(self):
+		# #11369: We use SimpleQueue rather than Queue
+		# as SimpleQueue is very light-weight, does not use locks
+		# and ensures that garbage collection won't unexpectedly happen in the middle of queuing something
+		# Which may cause a deadlock.
+		self._queue = SimpleQueue()
+		#: The latest pending entry for each coalescing key.
+		self._latestEntries: Dict[Hashable, tuple] = {}
+		# Only items with a coalescing key take this lock, so that queuing other items stays lock free.
+		# It is reentrant, as garbage collection may queue something while the lock is held.
+		self._coalescingLock = threading.RLock()
+		#: The number of items which replaced a pending item with the same coalescing key.
+		self.coalescedCount = 0
+		#: The number of items which were dropped when fetched, as they had been replaced.
+		self.droppedCount = 0
+		#: The largest number of items that have been in the queue at once.
+		self.maxDepth = 0
+
+	def put_nowait(self, item, coalescingKey: Optional[Hashable] = None) -> bool:
+		"""Puts an item in the queue.
+		@param coalescingKey: If given, any pending item put with the same key is dropped in favour of this one.
+		@return: C{True} if a pending item with the same coalescing key was replaced.
+		"""
+		entry = (coalescingKey, item)
+		replaced = False
+		if coalescingKey is not None:
+			with self._coalescingLock:
+				replaced = coalescingKey in self._latestEntries
+				self._latestEntries[coalescingKey] = entry
+				if replaced:
+					self.coalescedCount += 1
+		self._queue.put_nowait(entry)
+		depth = self.qsize()
+		if depth > self.maxDepth:
+			self.maxDepth = depth
+		return replaced
+
+	def get_nowait(self):
+		"""Fetches the next item, skipping items which have been replaced.
+		@raise Empty: If there are no items left to fetch.
+		"""
+		while True:
+			entry = self._queue.get_nowait()
+			coalescingKey, item = entry
+			if coalescingKey is None:
+				return item
+			with self._coalescingLock:
+				if self._latestEntries.get(coalescingKey) is entry:
+					del self._latestEntries[coalescingKey]
+					return item
+			self.droppedCount += 1
+
+	def empty(self) -> bool:
+		return self._queue.empty()
+
+	def qsize(self) -> int:
+		"""The number of entries in the queue, including replaced items which have not yet been dropped."""
+		return self._queue.qsize()
+
+
 # A queue for calls that should be made on NVDA's main thread
-# #11369: We use SimpleQueue rather than Queue here
-# as SimpleQueue is very light-weight, does not use locks
-# and ensures that garbage collection won't unexpectedly happen in the middle of queuing something
-# Which may cause a deadlock.
-eventQueue = SimpleQueue()
+eventQueue = CoalescingQueue()
 
 generators={}
 lastGeneratorObjID=0
@@ -39,7 +107,14 @@ def cancelGeneratorObject(generatorObjID):
 		pass
 
 
-def queueFunction(queue, func, *args, _immediate: bool = False, **kwargs):
+def queueFunction(
+		queue,
+		func,
+		*args,
+		_immediate: bool = False,
+		_coalescingKey: Optional[Hashable] = None,
+		**kwargs
+) -> bool:
 	"""Queue a function to be executed in a specific queue.
 	@param queue: The queue to use. Currently, this can only be
 		L{queueHandler.eventQueue}.
@@ -47,9 +122,17 @@ def queueFunction(queue, func, *args, _immediate: bool = False, **kwargs):
 	@param _immediate: Whether to run this as soon as possible (e.g. input) or
 		to delay it slightly (e.g. events). See the immediate argument to
 		L{core.requestPump}.
+	@param _coalescingKey: If given, a function still pending in the queue with the same key
+		is not run, only this one is.
+	@return: C{True} if a pending function with the same coalescing key was replaced.
 	"""
-	queue.put_nowait((func,args,kwargs))
+	if isinstance(queue, CoalescingQueue):
+		replaced = queue.put_nowait((func, args, kwargs), coalescingKey=_coalescingKey)
+	else:
+		queue.put_nowait((func, args, kwargs))
+		replaced = False
 	core.requestPump(immediate=_immediate)
+	return replaced
 
 def isRunningGenerators():
 	res=len(generators)>0
@@ -58,7 +141,11 @@ def isRunningGenerators():
 def flushQueue(queue):
 	for count in range(queue.qsize()+1):
 		if not queue.empty():
-			(func,args,kwargs)=queue.get_nowait()
+			try:
+				(func, args, kwargs) = queue.get_nowait()
+			except Empty:
+				# Only replaced items were left in the queue.
+				break
 			watchdog.alive()
 			try:
 				func(*args,**kwargs)
@@ -18,6 +18,7 @@ from .speech import (
 	BLANK_CHUNK_CHARS,
 	cancelSpeech,
 	CHUNK_SEPARATOR,
+	clearTextInfoSpeechCache,
 	clearTypedWordBuffer,
 	FIRST_NONCONTROL_CHAR,
 	getCharDescListFromText,
@@ -96,6 +97,7 @@ __all__ = [
 	"BLANK_CHUNK_CHARS",
 	"cancelSpeech",
 	"CHUNK_SEPARATOR",
+	"clearTextInfoSpeechCache",
 	"clearTypedWordBuffer",
 	"FIRST_NONCONTROL_CHAR",
 	"getCharDescListFromText",
@@ -3,6 +3,8 @@
 # This file is covered by the GNU General Public License.
 # See the file COPYING for more details.
 # Copyright (C) 2006-2021 NV Access Limited
+from collections import deque
+from itertools import islice
 import typing
 from languageHandler import normalizeLanguage
 
@@ -25,6 +27,7 @@ from .priorities import Spri, SPEECH_PRIORITIES
 from logHandler import log
 from synthDriverHandler import getSynth
 from typing import (
+	Deque,
 	Dict,
 	Any,
 	List,
@@ -40,14 +43,24 @@ def _shouldCancelExpiredFocusEvents():
 
 
 def _shouldDoSpeechManagerLogging():
-	return config.conf["debugLog"]["speechManager"]
+	return config.conf.getSnapshot()[("debugLog", "speechManager")]
+
+
+def _isSpeechManagerDebugEnabled() -> bool:
+	"""Whether speech manager debug messages are logged.
+	Messages are built lazily by passing arguments to L{_speechManagerDebug},
+	so call sites only need to check this before doing other work just to log a message.
+	"""
+	return log.isEnabledFor(log.DEBUG) and _shouldDoSpeechManagerLogging()
 
 
 def _speechManagerDebug(msg, *args, **kwargs) -> None:
 	"""Log 'msg % args' with severity 'DEBUG' if speech manager logging is enabled.
 		'SpeechManager-' is prefixed to all messages to make searching the log easier.
+		Pass values to include in the message as args rather than formatting them into msg,
+		so that they are only converted to strings if the message is logged.
 	"""
-	if not log.isEnabledFor(log.DEBUG) or not _shouldDoSpeechManagerLogging():
+	if not _isSpeechManagerDebugEnabled():
 		return
 	log._log(log.DEBUG, f"SpeechManager- " + msg, args, **kwargs)
 
@@ -67,10 +80,11 @@ def _speechManagerUnitTest(msg, *args, **kwargs) -> None:
 		# SpeechManager debug logging appears to come from _speechManagerUnitTest instead of the frame
 		# one stack higher. The codepath argument for _log could also be used to resolve this, but duplication
 		# simpler.
-		if log.isEnabledFor(log.DEBUG) and _shouldDoSpeechManagerLogging():
+		if _isSpeechManagerDebugEnabled():
 			log._log(log.DEBUG, f"SpeechManager- " + msg, args, **kwargs)
 		return
-	log._log(log.INFO, f"SpeechManUnitTest- " + msg, args, **kwargs)
+	if log.isEnabledFor(log.INFO):
+		log._log(log.INFO, "SpeechManUnitTest- " + msg, args, **kwargs)
 
 # Install the custom log handlers.
 #: For extra debug level logging, this is a category that must be enabled in the advanced settings panel.
@@ -127,12 +141,60 @@ class _ManagerPriorityQueue(object):
 		#: The pending speech sequences to be spoken.
 		#: These are split at indexes,
 		#: so a single utterance might be split over multiple sequences.
-		self.pendingSequences: List[SpeechSequence] = []
+		#: Sequences must only be added with L{extend} and removed with L{popFirst},
+		#: so that the sequences can be found by index with L{findIndex}.
+		self.pendingSequences: Deque[SpeechSequence] = deque()
+		#: The number of sequences which have been removed from the start of L{pendingSequences}.
+		self._removedCount = 0
+		#: Maps the index ending each pending sequence to the number of that sequence,
+		#: counting from the first sequence ever added to this queue.
+		self._sequenceNumbersByIndex: Dict[_IndexT, int] = {}
 		#: The configuration profile triggers that have been entered during speech.
 		self.enteredProfileTriggers: List[config.ProfileTrigger] = []
 		#: Keeps track of parameters that have been changed during an utterance.
 		self.paramTracker: ParamChangeTracker = ParamChangeTracker()
 
+	@staticmethod
+	def _getEndIndex(seq: SpeechSequence) -> Optional[_IndexT]:
+		lastCommand = seq[-1] if seq else None
+		return lastCommand.index if isinstance(lastCommand, IndexCommand) else None
+
+	def extend(self, sequences: List[SpeechSequence]):
+		"""Adds sequences to the end of L{pendingSequences}."""
+		sequenceNumber = self._removedCount + len(self.pendingSequences)
+		for seq in sequences:
+			index = self._getEndIndex(seq)
+			if index is not None:
+				# If an index is reused while still pending, the first sequence ending with it is found.
+				self._sequenceNumbersByIndex.setdefault(index, sequenceNumber)
+			sequenceNumber += 1
+		self.pendingSequences.extend(sequences)
+
+	def popFirst(self, count: int = 1) -> List[SpeechSequence]:
+		"""Removes sequences from the start of L{pendingSequences}.
+		@param count: The number of sequences to remove.
+		@return: The removed sequences.
+		"""
+		removed = []
+		for _ in range(count):
+			seq = self.pendingSequences.popleft()
+			index = self._getEndIndex(seq)
+			if index is not None and self._sequenceNumbersByIndex.get(index) == self._removedCount:
+				del self._sequenceNumbersByIndex[index]
+			self._removedCount += 1
+			removed.append(seq)
+		return removed
+
+	def findIndex(self, index: _IndexT) -> Optional[int]:
+		"""Finds the pending sequence ending with the given index.
+		@return: The position of the sequence in L{pendingSequences},
+			or C{None} if no pending sequence ends with this index.
+		"""
+		sequenceNumber = self._sequenceNumbersByIndex.get(index)
+		if sequenceNumber is None:
+			return None
+		return sequenceNumber - self._removedCount
+
 
 class SpeechManager(object):
 	"""Manages queuing of speech utterances, calling callbacks at desired points in the speech, profile switching, prioritization, etc.
@@ -247,12 +309,18 @@ class SpeechManager(object):
 		# If speech isn't already in progress, we need to push the first speech.
 		push = self._hasNoMoreSpeech() or not self._synthStillSpeaking()
 		log._speechManagerDebug(
-			f"Will interrupt: {interrupt}"
-			f" Will push: {push}"
-			f" | _indexesSpeaking: {self._indexesSpeaking!r}"
-			f" | _curPriQueue valid: {not self._hasNoMoreSpeech()}"
-			f" | _shouldPushWhenDoneSpeaking: {self._shouldPushWhenDoneSpeaking}"
-			f" | _cancelledLastSpeechWithSynth {self._cancelledLastSpeechWithSynth}"
+			"Will interrupt: %s"
+			" Will push: %s"
+			" | _indexesSpeaking: %r"
+			" | _curPriQueue valid: %s"
+			" | _shouldPushWhenDoneSpeaking: %s"
+			" | _cancelledLastSpeechWithSynth %s",
+			interrupt,
+			push,
+			self._indexesSpeaking,
+			self._curPriQueue is not None,
+			self._shouldPushWhenDoneSpeaking,
+			self._cancelledLastSpeechWithSynth,
 		)
 		if interrupt:
 			log._speechManagerDebug("Interrupting speech")
@@ -273,10 +341,12 @@ class SpeechManager(object):
 		outSeq = self._processSpeechSequence(inSeq)
 		log._speechManagerDebug("Out Seq: %r", outSeq)  # expensive string to build - defer
 		queue = self._priQueues.get(priority)
-		log._speechManagerDebug(
-			f"Current priority: {priority},"
-			f" queLen: {0 if queue is None else len(queue.pendingSequences)}"
-		)
+		if _isSpeechManagerDebugEnabled():
+			log._speechManagerDebug(
+				"Current priority: %s, queLen: %d",
+				priority,
+				0 if queue is None else len(queue.pendingSequences)
+			)
 		if not queue:
 			queue = self._priQueues[priority] = _ManagerPriorityQueue(priority)
 		else:
@@ -285,7 +355,7 @@ class SpeechManager(object):
 				queue.pendingSequences
 			)
 		first = len(queue.pendingSequences) == 0
-		queue.pendingSequences.extend(outSeq)
+		queue.extend(outSeq)
 		if priority is Spri.NOW and first:
 			# If this is the first sequence at Spri.NOW, interrupt speech.
 			return True
@@ -346,10 +416,10 @@ class SpeechManager(object):
 					# Ignore triggers that have no associated profile.
 					continue
 				if command.enter and command.trigger in enteredTriggers:
-					log.debugWarning("Request to enter trigger which has already been entered: %r" % command.trigger.spec)
+					log.debugWarning("Request to enter trigger which has already been entered: %r", command.trigger.spec)
 					continue
 				if not command.enter and command.trigger not in enteredTriggers:
-					log.debugWarning("Request to exit trigger which wasn't entered: %r" % command.trigger.spec)
+					log.debugWarning("Request to exit trigger which wasn't entered: %r", command.trigger.spec)
 					continue
 				self._ensureEndUtterance(outSeq, outSeqs, paramsToReplay, paramTracker)
 				outSeqs.append([command])
@@ -373,7 +443,7 @@ class SpeechManager(object):
 		return outSeqs
 
 	def _pushNextSpeech(self, doneSpeaking: bool):
-		log._speechManagerDebug(f"pushNextSpeech - doneSpeaking: {doneSpeaking}")
+		log._speechManagerDebug("pushNextSpeech - doneSpeaking: %s", doneSpeaking)
 		queue = self._getNextPriority()
 		if not queue:
 			# No more speech.
@@ -421,7 +491,7 @@ class SpeechManager(object):
 				if isinstance(item, IndexCommand):
 					self._indexesSpeaking.append(item.index)
 			self._cancelledLastSpeechWithSynth = False
-			log._speechManagerUnitTest(f"Synth Gets: {seq}")
+			log._speechManagerUnitTest("Synth Gets: %s", seq)
 			getSynth().speak(seq)
 
 	def _getNextPriority(self):
@@ -460,7 +530,7 @@ class SpeechManager(object):
 				exc_info=True
 			)
 			# Avoid infinite recursion by removing the problematic sequences:
-			del self._curPriQueue.pendingSequences[:lastSequenceIndexAddedToUtterance + 1]
+			self._curPriQueue.popFirst(lastSequenceIndexAddedToUtterance + 1)
 			utteranceValid = False
 
 		if utteranceValid:
@@ -489,14 +559,12 @@ class SpeechManager(object):
 		for item in cancellableItems:
 			utterance.remove(item)  # CancellableSpeechCommands should not be sent to the synthesizer.
 			if item.isCancelled:
-				log._speechManagerDebug(f"item already cancelled, canceling up to: {utteranceIndex}")
+				log._speechManagerDebug("item already cancelled, canceling up to: %s", utteranceIndex)
 				self._removeCompletedFromQueue(utteranceIndex)
 				return False
 			else:
 				item._utteranceIndex = utteranceIndex
-				log._speechManagerDebug(
-					f"Speaking utterance with cancellable item, index: {utteranceIndex}"
-				)
+				log._speechManagerDebug("Speaking utterance with cancellable item, index: %s", utteranceIndex)
 				self._cancelCommandsForUtteranceBeingSpokenBySynth[item] = utteranceIndex
 		return True
 
@@ -530,12 +598,12 @@ class SpeechManager(object):
 	def _getMostRecentlyCancelledUtterance(self) -> Optional[_IndexT]:
 		# Index of the most recently cancelled utterance.
 		latestCancelledUtteranceIndex: Optional[_IndexT] = None
-		log._speechManagerDebug(
-			f"Length of _cancelCommandsForUtteranceBeingSpokenBySynth: "
-			f"{len(self._cancelCommandsForUtteranceBeingSpokenBySynth)} "
-			f"Length of _indexesSpeaking: "
-			f"{len(self._indexesSpeaking)} "
-		)
+		if _isSpeechManagerDebugEnabled():
+			log._speechManagerDebug(
+				"Length of _cancelCommandsForUtteranceBeingSpokenBySynth: %d Length of _indexesSpeaking: %d ",
+				len(self._cancelCommandsForUtteranceBeingSpokenBySynth),
+				len(self._indexesSpeaking),
+			)
 		cancelledIndexes = (
 			index for command, index
 			in self._cancelCommandsForUtteranceBeingSpokenBySynth.items()
@@ -558,9 +626,9 @@ class SpeechManager(object):
 			return
 		# Don't delete commands while iterating over _cancelCommandsForUtteranceBeingSpokenBySynth.
 		latestCancelledUtteranceIndex = self._getMostRecentlyCancelledUtterance()
-		log._speechManagerDebug(f"Last index: {latestCancelledUtteranceIndex}")
+		log._speechManagerDebug("Last index: %s", latestCancelledUtteranceIndex)
 		if latestCancelledUtteranceIndex is not None:
-			log._speechManagerDebug(f"Cancel and push speech")
+			log._speechManagerDebug("Cancel and push speech")
 			# Minimise the number of calls to _removeCompletedFromQueue by using the most recently cancelled
 			# utterance index. This will remove all older queued speech also.
 			self._removeCompletedFromQueue(latestCancelledUtteranceIndex)
@@ -579,7 +647,7 @@ class SpeechManager(object):
 		return indexItem.index
 
 	def _onSynthIndexReached(self, synth=None, index=None):
-		log._speechManagerUnitTest(f"synthReachedIndex: {index}, synth: {synth}")
+		log._speechManagerUnitTest("synthReachedIndex: %s, synth: %s", index, synth)
 		if synth != getSynth():
 			return
 		# This needs to be handled in the main thread.
@@ -599,22 +667,21 @@ class SpeechManager(object):
 		if not self._curPriQueue:
 			# No speech in progress. Probably from a previous utterance which was cancelled.
 			return False, False
-		for seqIndex, seq in enumerate(self._curPriQueue.pendingSequences):
-			lastCommand = seq[-1] if isinstance(seq, list) else None
-			if isinstance(lastCommand, IndexCommand):
-				if self._isIndexAAfterIndexB(index, lastCommand.index):
-					log.debugWarning(f"Reached speech index {index :d}, but index {lastCommand.index :d} never handled")
-				elif index == lastCommand.index:
-					endOfUtterance = isinstance(self._curPriQueue.pendingSequences[seqIndex + 1][0], EndUtteranceCommand)
-					if endOfUtterance:
-						# Remove the EndUtteranceCommand as well.
-						seqIndex += 1
-					break # Found it!
-		else:
+		pendingSequences = self._curPriQueue.pendingSequences
+		seqIndex = self._curPriQueue.findIndex(index)
+		if seqIndex is None:
 			log._speechManagerDebug(
 				"Unknown index. Probably from a previous utterance which was cancelled."
 			)
 			return False, False
+		for seq in islice(pendingSequences, seqIndex):
+			lastCommand = seq[-1] if seq else None
+			if isinstance(lastCommand, IndexCommand) and self._isIndexAAfterIndexB(index, lastCommand.index):
+				log.debugWarning("Reached speech index %d, but index %d never handled", index, lastCommand.index)
+		endOfUtterance = isinstance(pendingSequences[seqIndex + 1][0], EndUtteranceCommand)
+		if endOfUtterance:
+			# Remove the EndUtteranceCommand as well.
+			seqIndex += 1
 		if endOfUtterance:
 			# These params may not apply to the next utterance if it was queued separately,
 			# so reset the tracker.
@@ -623,14 +690,13 @@ class SpeechManager(object):
 		else:
 			# Keep track of parameters changed so far.
 			# This is necessary in case this utterance is preempted by higher priority speech.
-			for seqIndex in range(seqIndex + 1):
-				seq = self._curPriQueue.pendingSequences[seqIndex]
+			for seq in islice(pendingSequences, seqIndex + 1):
 				for command in seq:
 					if isinstance(command, SynthParamCommand):
 						self._curPriQueue.paramTracker.update(command)
 		# This sequence is done, so we don't need to track it any more.
-		toRemove = self._curPriQueue.pendingSequences[:seqIndex + 1]
-		log._speechManagerDebug("Removing: %r", seq)
+		toRemove = self._curPriQueue.popFirst(seqIndex + 1)
+		log._speechManagerDebug("Removing: %r", toRemove[-1])
 		if _shouldCancelExpiredFocusEvents():
 			cancellables = (
 				item
@@ -641,26 +707,25 @@ class SpeechManager(object):
 				)
 			)
 			for item in cancellables:
-				if log.isEnabledFor(log.DEBUG) and _shouldDoSpeechManagerLogging():
+				if _isSpeechManagerDebugEnabled():
 					# Debug logging for cancelling expired focus events.
 					log._speechManagerDebug(
-						f"Item is in _cancelCommandsForUtteranceBeingSpokenBySynth: "
-						f"{item in self._cancelCommandsForUtteranceBeingSpokenBySynth.keys()}"
+						"Item is in _cancelCommandsForUtteranceBeingSpokenBySynth: %s",
+						item in self._cancelCommandsForUtteranceBeingSpokenBySynth
 					)
 				self._cancelCommandsForUtteranceBeingSpokenBySynth.pop(item, None)
-		del self._curPriQueue.pendingSequences[:seqIndex + 1]
 
 		return True, endOfUtterance
 
 	def _handleIndex(self, index: int):
-		log._speechManagerDebug(f"Handle index: {index}")
+		log._speechManagerDebug("Handle index: %s", index)
 		# A synth (such as OneCore) may skip indexes
 		# If before another index, with no text content in between.
 		# Therefore, detect this and ensure we handle all skipped indexes.
 		handleIndexes = []
 		for oldIndex in list(self._indexesSpeaking):
 			if self._isIndexABeforeIndexB(oldIndex, index):
-				log.debugWarning("Handling skipped index %s" % oldIndex)
+				log.debugWarning("Handling skipped index %s", oldIndex)
 				handleIndexes.append(oldIndex)
 		handleIndexes.append(index)
 		valid, endOfUtterance = False, False
@@ -668,10 +733,10 @@ class SpeechManager(object):
 			try:
 				self._indexesSpeaking.remove(i)
 			except ValueError:
-				log.debug("Unknown index %s, speech probably cancelled from main thread." % i)
+				log.debug("Unknown index %s, speech probably cancelled from main thread.", i)
 				break  # try the rest, this is a very unexpected path.
 			if i != index:
-				log.debugWarning("Handling skipped index %s" % i)
+				log.debugWarning("Handling skipped index %s", i)
 			# we must do the following for each index, any/all of them may be end of utterance, which must
 			# trigger _pushNextSpeech
 			_valid, _endOfUtterance = self._removeCompletedFromQueue(i)
@@ -681,7 +746,7 @@ class SpeechManager(object):
 				callbackCommand = self._indexesToCallbacks.pop(i, None)
 				if callbackCommand:
 					try:
-						log._speechManagerUnitTest(f"CallbackCommand Start: {callbackCommand!r}")
+						log._speechManagerUnitTest("CallbackCommand Start: %r", callbackCommand)
 						callbackCommand.run()
 						log._speechManagerUnitTest("CallbackCommand End")
 					except Exception:
@@ -694,29 +759,28 @@ class SpeechManager(object):
 		if shouldPush:
 			if self._indexesSpeaking:
 				log._speechManagerDebug(
-					f"Indexes speaking: {self._indexesSpeaking!r},"
-					f" queue: {self._curPriQueue.pendingSequences}"
+					"Indexes speaking: %r, queue: %s",
+					self._indexesSpeaking,
+					self._curPriQueue.pendingSequences
 				)
 			# Even if we have many indexes, we should only push next speech once.
 			self._pushNextSpeech(False)
 
 	def _onSynthDoneSpeaking(self, synth: Optional[synthDriverHandler.SynthDriver] = None):
-		log._speechManagerUnitTest(f"synthDoneSpeaking synth:{synth}")
+		log._speechManagerUnitTest("synthDoneSpeaking synth:%s", synth)
 		if synth != getSynth():
 			return
 		# This needs to be handled in the main thread.
 		queueHandler.queueFunction(queueHandler.eventQueue, self._handleDoneSpeaking)
 
 	def _handleDoneSpeaking(self):
-		log._speechManagerDebug(
-			f"Synth done speaking, should push: {self._shouldPushWhenDoneSpeaking}"
-		)
+		log._speechManagerDebug("Synth done speaking, should push: %s", self._shouldPushWhenDoneSpeaking)
 		if self._shouldPushWhenDoneSpeaking:
 			self._shouldPushWhenDoneSpeaking = False
 			self._pushNextSpeech(True)
 
 	def _switchProfile(self):
-		command = self._curPriQueue.pendingSequences.pop(0)[0]
+		command = self._curPriQueue.popFirst()[0][0]
 		assert isinstance(command, ConfigProfileTriggerCommand), "First pending command should be a ConfigProfileTriggerCommand"
 		if command.enter:
 			try:
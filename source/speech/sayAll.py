@@ -5,8 +5,9 @@
 # Julien Cochuyt
 
 from abc import ABCMeta, abstractmethod
+from collections import deque
 from enum import IntEnum
-from typing import Callable, TYPE_CHECKING, Optional
+from typing import Callable, Deque, Generator, List, TYPE_CHECKING, Optional
 import weakref
 import garbageHandler
 from logHandler import log
@@ -165,6 +166,22 @@ class _ObjectsReader(garbageHandler.TrackedObject):
 		self.walker = None
 
 
+class _ReadingChunk:
+	"""The speech prepared for a reading chunk by L{_TextReader}.
+	"""
+
+	__slots__ = ("speech", "endSequences", "isLast")
+
+	def __init__(self):
+		#: The speech for the chunk, starting with the callback which calls L{_TextReader.lineReached}.
+		#: C{None} if there was no more text to read.
+		self.speech: Optional[SpeechSequence] = None
+		#: Sequences to speak after L{speech}, such as the commands which finish say all.
+		self.endSequences: List[Optional[SpeechSequence]] = []
+		#: Whether say all doesn't read any further chunks after this one.
+		self.isLast = False
+
+
 class _TextReader(garbageHandler.TrackedObject, metaclass=ABCMeta):
 	"""Manages continuous reading of text.
 	This is intended for internal use only.
@@ -184,12 +201,28 @@ class _TextReader(garbageHandler.TrackedObject, metaclass=ABCMeta):
 	9. L{turnPage} tries to turn the page.
 	10. If there are no more pages, we're finished.
 	11. If there is another page, L{turnPage} calls L{nextLine}.
+
+	The speech for the chunks after the one being spoken is prepared ahead of time by L{_prefetch},
+	so that L{nextLine} doesn't have to wait for slow documents to retrieve text.
+	The number of chunks prepared ahead is set by the speech.sayAllReadAheadChunks setting.
 	"""
 	MAX_BUFFERED_LINES = 10
 
 	def __init__(self, handler: _SayAllHandler):
 		self.reader = None
 		self.handler = handler
+		#: Chunks which have been prepared ahead of time, in reading order.
+		self._prefetchedChunks: Deque[_ReadingChunk] = deque()
+		#: The chunk being prepared, which keeps the speech queued by L{_speak} meanwhile.
+		self._preparingChunk: Optional[_ReadingChunk] = None
+		#: The ID of the running L{_prefetch} generator, C{None} if it isn't running.
+		self._prefetchGeneratorID: Optional[int] = None
+		#: The number of chunks which were prepared ahead of time when they were needed.
+		self.prefetchHits = 0
+		#: The number of chunks which weren't prepared ahead of time when they were needed.
+		self.prefetchMisses = 0
+		#: The largest number of chunks which have been prepared ahead of time at once.
+		self.maxPrefetchDepth = 0
 		self.trigger = SayAllProfileTrigger()
 		self.reader = self.getInitialTextInfo()
 		# #10899: SayAll profile can't be activated earlier because they may not be anything to read
@@ -226,7 +259,7 @@ class _TextReader(garbageHandler.TrackedObject, metaclass=ABCMeta):
 			if isinstance(self.reader.obj, textInfos.DocumentWithPageTurns):
 				# Once the last line finishes reading, try turning the page.
 				cb = CallbackCommand(self.turnPage, name="say-all:turnPage")
-				self.handler.speechWithoutPausesInstance.speakWithoutPauses([cb, EndUtteranceCommand()])
+				self._speak([cb, EndUtteranceCommand()])
 			else:
 				self.finish()
 			return False
@@ -247,6 +280,106 @@ class _TextReader(garbageHandler.TrackedObject, metaclass=ABCMeta):
 			self.finish()
 			return False
 
+	def _speak(self, sequence: Optional[SpeechSequence]) -> bool:
+		"""Speaks a sequence using speechWithoutPauses.
+		While a chunk is being prepared, the sequence is kept with the chunk instead,
+		so that it is spoken in reading order after the chunk.
+		@return: C{True} if something was actually spoken, C{False} otherwise.
+		"""
+		if self._preparingChunk is not None:
+			self._preparingChunk.endSequences.append(sequence)
+			return False
+		return self.handler.speechWithoutPausesInstance.speakWithoutPauses(sequence)
+
+	def _prepareChunk(self) -> _ReadingChunk:
+		"""Moves the reader to the next reading chunk and generates the speech for it.
+		"""
+		chunk = self._preparingChunk = _ReadingChunk()
+		# Keep the reader's position so the chunk can be prepared again if its speech can't be generated.
+		reader = self.reader.copy()
+		initialIteration = self.initialIteration
+		try:
+			if not self.initialIteration or not self.shouldReadInitialPosition():
+				if not self.nextLineImpl():
+					chunk.isLast = True
+					return chunk
+			self.initialIteration = False
+			bookmark = self.reader.bookmark
+			# Copy the speakTextInfoState so that speak callbackCommand
+			# and its associated callback are using a copy isolated to this specific line.
+			state = self.speakTextInfoState.copy()
+			# Call lineReached when we start speaking this line.
+			# lineReached will move the cursor and trigger reading of the next line.
+
+			def _onLineReached(obj=self.reader.obj, state=state):
+				self.lineReached(obj, bookmark, state)
+
+			cb = CallbackCommand(
+				_onLineReached,
+				name="say-all:lineReached"
+			)
+
+			# Generate the speech sequence for the reader textInfo
+			# and insert the lineReached callback at the very beginning of the sequence.
+			# _linePrefix on speakTextInfo cannot be used here
+			# As it would be inserted in the sequence after all initial control starts which is too late.
+			speechGen = SayAllHandler._getTextInfoSpeech(
+				self.reader,
+				unit=textInfos.UNIT_READINGCHUNK,
+				reason=controlTypes.OutputReason.SAYALL,
+				useCache=state
+			)
+			seq = list(_flattenNestedSequences(speechGen))
+			seq.insert(0, cb)
+			chunk.speech = seq
+			# Update the textInfo state ready for when speaking the next line.
+			self.speakTextInfoState = state.copy()
+
+			if not self.collapseLineImpl():
+				chunk.isLast = True
+			return chunk
+		except Exception:
+			if self.reader:
+				self.reader = reader
+				self.initialIteration = initialIteration
+			raise
+		finally:
+			self._preparingChunk = None
+
+	def _shouldPrefetch(self) -> bool:
+		"""Whether another chunk should be prepared ahead of time.
+		"""
+		if (
+			not self.reader
+			or not self.reader.obj
+			or objectBelowLockScreenAndWindowsIsLocked(self.reader.obj)
+		):
+			return False
+		if self._prefetchedChunks and self._prefetchedChunks[-1].isLast:
+			return False
+		return len(self._prefetchedChunks) < config.conf["speech"]["sayAllReadAheadChunks"]
+
+	def _prefetch(self) -> Generator[None, None, None]:
+		"""Prepares the next chunks ahead of time, one chunk per core cycle,
+		until the read-ahead window is full or there is no more text.
+		"""
+		try:
+			while self._shouldPrefetch():
+				self._prefetchedChunks.append(self._prepareChunk())
+				self.maxPrefetchDepth = max(self.maxPrefetchDepth, len(self._prefetchedChunks))
+				yield
+		except Exception:
+			# Chunks will be prepared again once the next chunk is spoken.
+			log.error("Error preparing say all speech ahead of time", exc_info=True)
+		finally:
+			self._prefetchGeneratorID = None
+
+	def _startPrefetching(self) -> None:
+		"""Starts preparing the next chunks ahead of time if they aren't being prepared already.
+		"""
+		if self._prefetchGeneratorID is None and self._shouldPrefetch():
+			self._prefetchGeneratorID = queueHandler.registerGeneratorObject(self._prefetch())
+
 	def nextLine(self):
 		if not self.reader:
 			log.debug("no self.reader")
@@ -265,44 +398,22 @@ class _TextReader(garbageHandler.TrackedObject, metaclass=ABCMeta):
 			self.finish()
 			return
 
-		if not self.initialIteration or not self.shouldReadInitialPosition():
-			if not self.nextLineImpl():
-				return
-		self.initialIteration = False
-		bookmark = self.reader.bookmark
-		# Copy the speakTextInfoState so that speak callbackCommand
-		# and its associated callback are using a copy isolated to this specific line.
-		state = self.speakTextInfoState.copy()
-		# Call lineReached when we start speaking this line.
-		# lineReached will move the cursor and trigger reading of the next line.
-
-		def _onLineReached(obj=self.reader.obj, state=state):
-			self.lineReached(obj, bookmark, state)
-
-		cb = CallbackCommand(
-			_onLineReached,
-			name="say-all:lineReached"
-		)
-
-		# Generate the speech sequence for the reader textInfo
-		# and insert the lineReached callback at the very beginning of the sequence.
-		# _linePrefix on speakTextInfo cannot be used here
-		# As it would be inserted in the sequence after all initial control starts which is too late.
-		speechGen = SayAllHandler._getTextInfoSpeech(
-			self.reader,
-			unit=textInfos.UNIT_READINGCHUNK,
-			reason=controlTypes.OutputReason.SAYALL,
-			useCache=state
-		)
-		seq = list(_flattenNestedSequences(speechGen))
-		seq.insert(0, cb)
-		# Speak the speech sequence.
-		spoke = self.handler.speechWithoutPausesInstance.speakWithoutPauses(seq)
-		# Update the textInfo state ready for when speaking the next line.
-		self.speakTextInfoState = state.copy()
-
-		if not self.collapseLineImpl():
+		if self._prefetchedChunks:
+			chunk = self._prefetchedChunks.popleft()
+			self.prefetchHits += 1
+		else:
+			chunk = self._prepareChunk()
+			self.prefetchMisses += 1
+		spoke = False
+		if chunk.speech is not None:
+			# Speak the speech sequence.
+			spoke = self.handler.speechWithoutPausesInstance.speakWithoutPauses(chunk.speech)
+		for sequence in chunk.endSequences:
+			self.handler.speechWithoutPausesInstance.speakWithoutPauses(sequence)
+		if chunk.isLast:
 			return
+		# Prepare the following chunks while this one is being spoken.
+		self._startPrefetching()
 
 		if not spoke:
 			# This line didn't include a natural pause, so nothing was spoken.
@@ -348,7 +459,7 @@ class _TextReader(garbageHandler.TrackedObject, metaclass=ABCMeta):
 		# we might switch synths too early and truncate the final speech.
 		# We do this by putting a CallbackCommand at the start of a new utterance.
 		cb = CallbackCommand(self.stop, name="say-all:stop")
-		self.handler.speechWithoutPausesInstance.speakWithoutPauses([
+		self._speak([
 			EndUtteranceCommand(),
 			cb,
 			EndUtteranceCommand()
@@ -358,6 +469,16 @@ class _TextReader(garbageHandler.TrackedObject, metaclass=ABCMeta):
 		if not self.reader:
 			return
 		self.reader = None
+		if self._prefetchGeneratorID is not None:
+			queueHandler.cancelGeneratorObject(self._prefetchGeneratorID)
+			self._prefetchGeneratorID = None
+		self._prefetchedChunks.clear()
+		log.debug(
+			"Say all read ahead: %d chunks prefetched, %d chunks not prefetched, maximum prefetch depth %d",
+			self.prefetchHits,
+			self.prefetchMisses,
+			self.maxPrefetchDepth,
+		)
 		self.trigger.exit()
 		self.trigger = None
 
@@ -7,7 +7,9 @@
 """High-level functions to speak information.
 """ 
 
+import collections
 import itertools
+import threading
 import typing
 import weakref
 import unicodedata
@@ -49,6 +51,7 @@ from typing import (
 	Iterable,
 	Optional,
 	Dict,
+	Hashable,
 	List,
 	Any,
 	Generator,
@@ -65,7 +68,7 @@ from config.configFlags import (
 import aria
 from .priorities import Spri
 from enum import IntEnum
-from dataclasses import dataclass
+from dataclasses import astuple, dataclass, is_dataclass
 from copy import copy
 from utils.security import objectBelowLockScreenAndWindowsIsLocked
 
@@ -1197,6 +1200,181 @@ class SpeakTextInfoState(object):
 		return self.__class__(self)
 
 
+#: A copy of the control field stack, format field attributes and indentation of a L{SpeakTextInfoState}.
+_SpeakTextInfoStateSnapshotT = Tuple[List[textInfos.ControlField], textInfos.Field, str]
+
+
+def _getSpeakTextInfoStateSnapshot(
+		speakTextInfoState: Optional[SpeakTextInfoState]
+) -> Optional[_SpeakTextInfoStateSnapshotT]:
+	if speakTextInfoState is None:
+		return None
+	return (
+		list(speakTextInfoState.controlFieldStackCache),
+		dict(speakTextInfoState.formatFieldAttributesCache),
+		speakTextInfoState.indentationCache,
+	)
+
+
+class _TextInfoSpeechCacheEntry:
+	"""The speech generated by L{getTextInfoSpeech} for a range of text,
+	the state of speakTextInfo it was generated with and the state it left behind.
+	"""
+
+	__slots__ = ("objRef", "inputState", "outputState", "sequences", "returnValue")
+
+	def __init__(
+			self,
+			obj: Any,
+			inputState: Optional[_SpeakTextInfoStateSnapshotT],
+			outputState: Optional[_SpeakTextInfoStateSnapshotT],
+			sequences: List[SpeechSequence],
+			returnValue: Optional[bool],
+	):
+		self.objRef = weakref.ref(obj)
+		self.inputState = inputState
+		self.outputState = outputState
+		self.sequences = sequences
+		self.returnValue = returnValue
+
+
+class _TextInfoSpeechCache:
+	"""Caches the speech generated by L{getTextInfoSpeech},
+	so that re-reading unchanged text doesn't fetch and process its fields again.
+	Entries are keyed on the document, the bookmark of the range, the unit and the configuration generation.
+	Speech is only reused if it was generated with the same speakTextInfo state.
+	The cache must be cleared whenever the content of a document changes; see L{clearTextInfoSpeechCache}.
+	As bookmarks don't change when text is edited,
+	only documents which reliably clear the cache when their content changes use it,
+	by setting their C{_cachesTextInfoSpeech} attribute to C{True}.
+	Once the cache holds more ranges than the speech.textInfoSpeechCacheSize setting,
+	the least recently used ranges are discarded.
+	A setting of 0 disables the cache.
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._entries: collections.OrderedDict[Hashable, _TextInfoSpeechCacheEntry] = collections.OrderedDict()
+		#: Incremented whenever the cache is cleared,
+		#: so that speech generated before the cache was cleared is not cached.
+		self.generation = 0
+		#: The number of lookups which found cached speech.
+		self.hits = 0
+		#: The number of lookups which did not find cached speech.
+		self.misses = 0
+		#: The number of ranges discarded to keep the cache within its maximum size.
+		self.evictions = 0
+		#: The number of times the cache has been cleared.
+		self.invalidations = 0
+
+	@property
+	def maxSize(self) -> int:
+		return config.conf["speech"]["textInfoSpeechCacheSize"]
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def getKey(
+			self,
+			info: textInfos.TextInfo,
+			unit: Optional[str],
+			reason: OutputReason,
+			onlyInitialFields: bool,
+			suppressBlanks: bool,
+			inputState: Optional[_SpeakTextInfoStateSnapshotT],
+	) -> Optional[Hashable]:
+		"""Gets the key of the speech for a range.
+		@param inputState: The state of speakTextInfo the speech is needed for.
+		@return: The key, or C{None} if the speech for the range can't be cached.
+		"""
+		stateKey = None
+		if inputState is not None:
+			# Speech generated with different states is cached separately,
+			# so that moving back and forth between ranges can reuse it.
+			# The states themselves are compared when the speech is fetched.
+			controlFieldStack, formatFieldAttributes, indentation = inputState
+			stateKey = (
+				tuple(field.get("role") for field in controlFieldStack),
+				len(formatFieldAttributes),
+				indentation,
+			)
+		try:
+			bookmark = info.bookmark
+			if is_dataclass(bookmark):
+				# Bookmarks such as Offsets are mutable dataclasses, which aren't hashable.
+				bookmark = (type(bookmark), astuple(bookmark))
+			key = (
+				id(info.obj),
+				type(info),
+				bookmark,
+				unit,
+				reason,
+				onlyInitialFields,
+				suppressBlanks,
+				stateKey,
+				config.conf.generation,
+			)
+			hash(key)
+		except (NotImplementedError, RuntimeError, TypeError):
+			return None
+		return key
+
+	def get(
+			self,
+			key: Hashable,
+			obj: Any,
+			inputState: Optional[_SpeakTextInfoStateSnapshotT],
+	) -> Optional[_TextInfoSpeechCacheEntry]:
+		"""Gets the cached speech for a range of the document C{obj}.
+		@param inputState: The state of speakTextInfo the speech is needed for.
+		@return: The cached speech, or C{None} if there isn't any for this range and state.
+		"""
+		with self._lock:
+			entry = self._entries.get(key)
+			if entry is None or entry.objRef() is not obj or entry.inputState != inputState:
+				self.misses += 1
+				return None
+			self._entries.move_to_end(key)
+			self.hits += 1
+		return entry
+
+	def set(self, key: Hashable, entry: _TextInfoSpeechCacheEntry, generation: int):
+		"""Caches the speech for a range.
+		@param generation: The L{generation} of the cache before the speech was generated.
+			The speech isn't cached if the cache has been cleared since.
+		"""
+		maxSize = self.maxSize
+		with self._lock:
+			if generation != self.generation:
+				return
+			self._entries[key] = entry
+			self._entries.move_to_end(key)
+			while len(self._entries) > maxSize:
+				self._entries.popitem(last=False)
+				self.evictions += 1
+
+	def clear(self):
+		"""Discards all cached speech, e.g. because the content of a document has changed.
+		This may be called from any thread.
+		"""
+		with self._lock:
+			self._entries.clear()
+			self.generation += 1
+			self.invalidations += 1
+
+
+_textInfoSpeechCache = _TextInfoSpeechCache()
+
+
+def clearTextInfoSpeechCache():
+	"""Discards the speech cached by L{getTextInfoSpeech}.
+	This must be called whenever the content of a document changes independently of the caret,
+	e.g. when an object reports that its text or value changed.
+	This may be called from any thread.
+	"""
+	_textInfoSpeechCache.clear()
+
+
 def _extendSpeechSequence_addMathForTextInfo(
 		speechSequence: SpeechSequence, info: textInfos.TextInfo, field: textInfos.Field
 ) -> None:
@@ -1237,10 +1415,98 @@ def speakTextInfo(
 	return speechGen.returnValue
 
 
-# C901 'getTextInfoSpeech' is too complex
-# Note: when working on getTextInfoSpeech, look for opportunities to simplify
+def getTextInfoSpeech(
+		info: textInfos.TextInfo,
+		useCache: Union[bool, SpeakTextInfoState] = True,
+		formatConfig: Dict[str, bool] = None,
+		unit: Optional[str] = None,
+		reason: OutputReason = OutputReason.QUERY,
+		_prefixSpeechCommand: Optional[SpeechCommand] = None,
+		onlyInitialFields: bool = False,
+		suppressBlanks: bool = False
+) -> Generator[SpeechSequence, None, bool]:
+	"""Gets the speech for the text and fields of a TextInfo.
+	If the speech.textInfoSpeechCacheSize setting is not 0,
+	speech generated with the configured document formatting and no prefix command is cached,
+	so that re-reading an unchanged range reuses it; see L{_TextInfoSpeechCache}.
+	This is only done for documents which clear the cache whenever their content changes,
+	i.e. whose C{_cachesTextInfoSpeech} attribute is C{True}.
+	"""
+	cacheKey = None
+	if (
+		not formatConfig
+		and _prefixSpeechCommand is None
+		and _textInfoSpeechCache.maxSize > 0
+		and getattr(info.obj, "_cachesTextInfoSpeech", False)
+	):
+		if isinstance(useCache, SpeakTextInfoState):
+			speakTextInfoState = useCache
+		elif useCache:
+			speakTextInfoState = SpeakTextInfoState(info.obj)
+		else:
+			speakTextInfoState = None
+		inputState = _getSpeakTextInfoStateSnapshot(speakTextInfoState)
+		cacheKey = _textInfoSpeechCache.getKey(info, unit, reason, onlyInitialFields, suppressBlanks, inputState)
+	if cacheKey is None:
+		return (yield from _getTextInfoSpeech(
+			info,
+			useCache,
+			formatConfig,
+			unit,
+			reason,
+			_prefixSpeechCommand,
+			onlyInitialFields,
+			suppressBlanks
+		))
+	entry = _textInfoSpeechCache.get(cacheKey, info.obj, inputState)
+	if entry is not None:
+		if speakTextInfoState is not None:
+			# Leave the state as generating the speech would have left it.
+			controlFieldStackCache, formatFieldAttributesCache, indentationCache = entry.outputState
+			speakTextInfoState.controlFieldStackCache = list(controlFieldStackCache)
+			# The format field attributes cache is shared with copies of the state, so update it in place.
+			speakTextInfoState.formatFieldAttributesCache.clear()
+			speakTextInfoState.formatFieldAttributesCache.update(formatFieldAttributesCache)
+			speakTextInfoState.indentationCache = indentationCache
+		sequences = [list(seq) for seq in entry.sequences]
+		returnValue = entry.returnValue
+	else:
+		generation = _textInfoSpeechCache.generation
+		# Pass the state itself, so that it can be stored once the speech has been generated.
+		speechGen = GeneratorWithReturn(_getTextInfoSpeech(
+			info,
+			speakTextInfoState or False,
+			formatConfig,
+			unit,
+			reason,
+			_prefixSpeechCommand,
+			onlyInitialFields,
+			suppressBlanks
+		))
+		sequences = list(speechGen)
+		returnValue = speechGen.returnValue
+		# Consumers may change the sequences they are given, so cache copies.
+		_textInfoSpeechCache.set(
+			cacheKey,
+			_TextInfoSpeechCacheEntry(
+				info.obj,
+				inputState,
+				_getSpeakTextInfoStateSnapshot(speakTextInfoState),
+				[list(seq) for seq in sequences],
+				returnValue,
+			),
+			generation
+		)
+	if speakTextInfoState is not None and not isinstance(useCache, SpeakTextInfoState):
+		speakTextInfoState.updateObj()
+	yield from sequences
+	return returnValue
+
+
+# C901 '_getTextInfoSpeech' is too complex
+# Note: when working on _getTextInfoSpeech, look for opportunities to simplify
 # and move logic out into smaller helper functions.
-def getTextInfoSpeech(  # noqa: C901
+def _getTextInfoSpeech(  # noqa: C901
 		info: textInfos.TextInfo,
 		useCache: Union[bool, SpeakTextInfoState] = True,
 		formatConfig: Dict[str, bool] = None,
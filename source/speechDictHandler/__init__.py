@@ -3,8 +3,15 @@
 # This file is covered by the GNU General Public License.
 # See the file COPYING for more details.
 
+import functools
 import re
-from typing import Any
+from typing import (
+	Any,
+	List,
+	Optional,
+	Tuple,
+	Union,
+)
 import globalVars
 from logHandler import log
 import os
@@ -63,9 +70,109 @@ class SpeechDictEntry:
 			replacement = self.replacement.replace('\\', '\\\\')
 		return self.compiled.sub(replacement, text)
 
+
+def _buildGuardPattern(strings: List[str]) -> str:
+	"""Builds a regular expression which matches wherever any of the given strings occurs.
+	The strings are arranged in a trie, so that the expression is scanned in a single pass
+	no matter how many strings there are.
+	As the expression only has to tell whether any of the strings occurs,
+	a string which has another string as its prefix is covered by the shorter one.
+	"""
+	trie = {}
+	for string in strings:
+		node = trie
+		for char in string:
+			node = node.setdefault(char, {})
+		node[""] = {}
+
+	def render(node) -> str:
+		if "" in node:
+			return ""
+		alternatives = [re.escape(char) + render(child) for char, child in node.items()]
+		if len(alternatives) == 1:
+			return alternatives[0]
+		return f"(?:{'|'.join(alternatives)})"
+
+	return render(trie)
+
+
+class _EntryRun:
+	"""A run of consecutive anywhere and whole word entries guarded by one combined matcher.
+	The matcher looks for the patterns of all entries in the run at once,
+	ignoring case and word boundaries, so it matches at least wherever any of the entries would.
+	If it does not match the text, the whole run is skipped in a single scan.
+	Otherwise the entries are applied in order, exactly as they would be without the guard.
+	"""
+
+	__slots__ = ("entries", "matcher")
+
+	def __init__(self, entries: List[Tuple[int, SpeechDictEntry]]):
+		self.entries = entries
+		self.matcher = re.compile(
+			_buildGuardPattern([entry.pattern for index, entry in entries]),
+			re.IGNORECASE
+		)
+
+
+#: The maximum number of entries guarded by a single combined matcher.
+#: When the matcher of a run matches, every entry of that run is applied,
+#: so smaller runs waste less work on a hit, whereas larger runs need fewer scans on a miss.
+_MAX_ENTRY_RUN_LENGTH = 64
+
+_CompiledStep = Union[_EntryRun, Tuple[int, SpeechDictEntry]]
+
+
+def _compileEntries(entries: List[SpeechDictEntry]) -> List[_CompiledStep]:
+	"""Compiles a list of entries into processing steps.
+	Consecutive anywhere and whole word entries are grouped into L{_EntryRun}s,
+	regular expression entries are kept as separate steps in their original position.
+	"""
+	steps: List[_CompiledStep] = []
+	run: List[Tuple[int, SpeechDictEntry]] = []
+	for index, entry in enumerate(entries):
+		if entry.type == ENTRY_TYPE_REGEXP:
+			if run:
+				steps.append(_EntryRun(run))
+				run = []
+			steps.append((index, entry))
+			continue
+		run.append((index, entry))
+		if len(run) == _MAX_ENTRY_RUN_LENGTH:
+			steps.append(_EntryRun(run))
+			run = []
+	if run:
+		steps.append(_EntryRun(run))
+	return steps
+
+
+def _invalidatesCompiled(method):
+	"""Decorates a list method so that calling it drops the compiled steps of the L{SpeechDict}."""
+	@functools.wraps(method)
+	def wrapper(self, *args, **kwargs):
+		self._compiled = None
+		return method(self, *args, **kwargs)
+	return wrapper
+
+
 class SpeechDict(list):
 
 	fileName = None
+	#: The compiled processing steps for the entries of this dictionary,
+	#: or C{None} if they have to be rebuilt because the dictionary has been loaded or edited.
+	_compiled: Optional[List[_CompiledStep]] = None
+
+	append = _invalidatesCompiled(list.append)
+	extend = _invalidatesCompiled(list.extend)
+	insert = _invalidatesCompiled(list.insert)
+	remove = _invalidatesCompiled(list.remove)
+	pop = _invalidatesCompiled(list.pop)
+	clear = _invalidatesCompiled(list.clear)
+	sort = _invalidatesCompiled(list.sort)
+	reverse = _invalidatesCompiled(list.reverse)
+	__setitem__ = _invalidatesCompiled(list.__setitem__)
+	__delitem__ = _invalidatesCompiled(list.__delitem__)
+	__iadd__ = _invalidatesCompiled(list.__iadd__)
+	__imul__ = _invalidatesCompiled(list.__imul__)
 
 	def load(self, fileName):
 		self.fileName=fileName
@@ -117,17 +224,30 @@ class SpeechDict(list):
 			file.write("%s\t%s\t%s\t%s\r\n"%(entry.pattern.replace('#',r'\#'),entry.replacement.replace('#',r'\#'),int(entry.caseSensitive),entry.type))
 		file.close()
 
-	def sub(self, text):
+	def sub(self, text: str) -> str:
+		"""Applies all entries of this dictionary to the given text, in order.
+		The output is identical to calling L{SpeechDictEntry.sub} for every entry in turn,
+		but runs of entries which can't match the text are skipped using their combined matcher.
+		"""
+		if self._compiled is None:
+			self._compiled = _compileEntries(self)
 		invalidEntries = []
-		for index, entry in enumerate(self):
-			try:
-				text = entry.sub(text)
-			except re.error as exc:
-				dictName = self.fileName or "temporary dictionary"
-				log.error(f"Invalid dictionary entry {index+1} in {dictName}: \"{entry.pattern}\", {exc}")
-				invalidEntries.append(index)
-			for index in reversed(invalidEntries):
-				del self[index]
+		for step in self._compiled:
+			if isinstance(step, _EntryRun):
+				if not step.matcher.search(text):
+					continue
+				entries = step.entries
+			else:
+				entries = (step,)
+			for index, entry in entries:
+				try:
+					text = entry.sub(text)
+				except re.error as exc:
+					dictName = self.fileName or "temporary dictionary"
+					log.error(f"Invalid dictionary entry {index+1} in {dictName}: \"{entry.pattern}\", {exc}")
+					invalidEntries.append(index)
+		for index in reversed(invalidEntries):
+			del self[index]
 		return text
 
 def processText(text):
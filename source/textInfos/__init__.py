@@ -502,7 +502,7 @@ class TextInfo(baseObject.AutoPropertyObject):
 		"""
 		raise NotImplementedError
 
-	def find(self,text,caseSensitive=False,reverse=False):
+	def find(self, text, caseSensitive=False, reverse=False, useRegex=False, wholeWord=False):
 		"""Locates the given text and positions this TextInfo object at the start.
 		@param text: the text to search for
 		@type text: string
@@ -510,8 +510,14 @@ class TextInfo(baseObject.AutoPropertyObject):
 		@type caseSensitive: bool
 		@param reverse: true then the search will go from current position towards the start of the text, if false then  towards the end.
 		@type reverse: bool
+		@param useRegex: true if the text is a regular expression
+		@type useRegex: bool
+		@param wholeWord: true to only find matches which don't start or end within a word
+		@type wholeWord: bool
 		@returns: True if text is found, false otherwise
 		@rtype: bool
+		@raise NotImplementedError: if searching, or searching with useRegex or wholeWord, isn't supported.
+			Implementations which predate useRegex and wholeWord may not accept them at all.
 		""" 
 		raise NotImplementedError
 
@@ -5,6 +5,9 @@
 #Copyright (C) 2006-2019 NV Access Limited, Babbage B.V.
 
 from abc import abstractmethod
+from array import array
+from bisect import bisect_left, bisect_right
+from functools import lru_cache
 import re
 import ctypes
 import unicodedata
@@ -21,6 +24,7 @@ from typing import (
 	Tuple,
 	Dict,
 	List,
+	Union,
 )
 from logHandler import log
 
@@ -85,6 +89,268 @@ def findEndOfLine(text,offset,lineLength=None):
 		end=len(text)-1
 	return end+1
 
+
+class _LineIndex:
+	"""An index of the line breaks in a story text, built in a single pass over the text.
+	Lines are found exactly as L{findStartOfLine} and L{findEndOfLine} find them,
+	but by bisecting the index rather than searching the text.
+	"""
+
+	def __init__(self, text: str, isWide: bool):
+		"""
+		@param text: The story text.
+		@param isWide: Whether offsets into the text are wide character (UTF-16) offsets.
+		"""
+		self.text = text
+		self.isWide = isWide
+		self.offsetConverter: Optional[textUtils.WideStringOffsetConverter] = (
+			textUtils.WideStringOffsetConverter(text) if isWide else None
+		)
+		self._newLines = array("q")
+		self._carriageReturns = array("q")
+		for match in re.finditer("[\r\n]", text):
+			if match.group() == "\n":
+				self._newLines.append(match.start())
+			else:
+				self._carriageReturns.append(match.start())
+		self._lineStarts: Optional[array] = None
+		self._canMoveByLineStarts: Optional[bool] = None
+
+	def _normalizeOffset(self, offset: int) -> int:
+		"""Normalizes an offset for searching as L{str.find} and L{str.rfind} do."""
+		if offset < 0:
+			return max(len(self.text) + offset, 0)
+		return offset
+
+	@staticmethod
+	def _findBefore(positions: array, end: int) -> int:
+		index = bisect_left(positions, end) - 1
+		return positions[index] if index >= 0 else -1
+
+	@staticmethod
+	def _findFrom(positions: array, start: int) -> int:
+		index = bisect_left(positions, start)
+		return positions[index] if index < len(positions) else -1
+
+	def findStartOfLine(self, offset: int) -> int:
+		"""@see: L{findStartOfLine}"""
+		text = self.text
+		if not text:
+			return 0
+		if offset >= len(text):
+			offset = len(text) - 1
+		if text[offset] == '\n' and offset >= 0 and text[offset - 1] == '\r':
+			offset -= 1
+		end = self._normalizeOffset(offset)
+		start = self._findBefore(self._newLines, end)
+		if start < 0:
+			start = self._findBefore(self._carriageReturns, end)
+		return start + 1
+
+	def findEndOfLine(self, offset: int) -> int:
+		"""@see: L{findEndOfLine}"""
+		text = self.text
+		if not text:
+			return 0
+		if offset >= len(text):
+			offset = len(text) - 1
+		end = offset
+		if text[end] != '\n':
+			end = self._findFrom(self._newLines, self._normalizeOffset(offset))
+		if end < 0:
+			if text[offset] != '\r':
+				end = self._findFrom(self._carriageReturns, self._normalizeOffset(offset))
+		if end < 0:
+			end = len(text) - 1
+		return end + 1
+
+	def getLineOffsets(self, offset: int) -> Union[Tuple[int, int], List[int]]:
+		"""Gets the offsets of the line containing the given offset.
+		Offsets are wide character offsets if L{isWide}.
+		"""
+		if self.isWide:
+			strOffset = self.offsetConverter.wideToStrOffsets(offset, offset)[0]
+			return self.offsetConverter.strToWideOffsets(
+				self.findStartOfLine(strOffset),
+				self.findEndOfLine(strOffset)
+			)
+		return [self.findStartOfLine(offset), self.findEndOfLine(offset)]
+
+	@property
+	def lineStarts(self) -> array:
+		"""The str offsets at which each line starts, following lines from the start of the text."""
+		if self._lineStarts is None:
+			lineStarts = array("q", [0])
+			textLength = len(self.text)
+			offset = 0
+			while True:
+				offset = self.findEndOfLine(offset)
+				if offset >= textLength:
+					break
+				lineStarts.append(offset)
+			self._lineStarts = lineStarts
+		return self._lineStarts
+
+	@property
+	def canMoveByLineStarts(self) -> bool:
+		"""Whether moving by line from any line start reaches the next or previous line start,
+		so that lines can be moved over by looking up L{lineStarts}.
+		This isn't the case for some texts with carriage returns which aren't followed by new lines.
+		"""
+		if self._canMoveByLineStarts is None:
+			lineStarts = self.lineStarts
+			self._canMoveByLineStarts = all(
+				self.findStartOfLine(lineStart) == lineStart
+				and (index == 0 or self.findStartOfLine(lineStart - 1) == lineStarts[index - 1])
+				for index, lineStart in enumerate(lineStarts)
+			)
+		return self._canMoveByLineStarts
+
+	def moveLines(self, offset: int, count: int) -> Optional[Tuple[int, int]]:
+		"""Moves over lines exactly as L{OffsetsTextInfo.move} does by getting the offsets of every line,
+		but only getting the offsets of the first line and looking up the rest in L{lineStarts}.
+		Offsets are wide character offsets if L{isWide}.
+		@param count: The number of lines to move, negative to move backward.
+		@return: The offset moved to and the number of lines moved,
+			or C{None} if lines must be moved one at a time.
+		"""
+		if not self.canMoveByLineStarts:
+			return None
+		storyLength = self.offsetConverter.wideStringLength if self.isWide else len(self.text)
+		if count > 0:
+			if offset >= storyLength:
+				return (offset, 0)
+			newOffset = self.getLineOffsets(offset)[1]
+			if newOffset <= offset or newOffset >= storyLength:
+				return (newOffset, 1)
+		else:
+			if offset <= 0:
+				return (offset, 0)
+			newOffset = self.getLineOffsets(offset - 1)[0]
+			if newOffset >= offset or newOffset <= 0:
+				return (newOffset, -1)
+		strOffset = self.offsetConverter.wideToStrOffsets(newOffset, newOffset)[0] if self.isWide else newOffset
+		lineStarts = self.lineStarts
+		index = bisect_left(lineStarts, strOffset)
+		if index == len(lineStarts) or lineStarts[index] != strOffset:
+			return None
+		if count > 0:
+			targetIndex = index + count - 1
+			if targetIndex < len(lineStarts):
+				strOffset = lineStarts[targetIndex]
+			else:
+				# Moving from the last line start reaches the end of the text.
+				count = len(lineStarts) - index + 1
+				strOffset = len(self.text)
+		else:
+			targetIndex = index + count + 1
+			if targetIndex >= 0:
+				strOffset = lineStarts[targetIndex]
+			else:
+				count = -index - 1
+				strOffset = 0
+		if self.isWide:
+			strOffset = self.offsetConverter.strToWideOffsets(strOffset, strOffset)[0]
+		return (strOffset, count)
+
+	def getLineNumFromOffset(self, offset: int) -> int:
+		"""Gets the 0-based number of the line containing the given offset."""
+		if self.isWide:
+			offset = self.offsetConverter.wideToStrOffsets(offset, offset)[0]
+		return max(bisect_right(self.lineStarts, offset) - 1, 0)
+
+
+#: The line index for the story text most recently searched for lines.
+#: It is replaced as soon as a different story text is searched.
+_lastLineIndex: Optional[_LineIndex] = None
+
+
+class _SearchPattern:
+	"""A compiled pattern to search text for, which is reused for repeated searches for the same text.
+	Text is searched in place, between offsets, rather than searching copies of parts of it.
+	"""
+
+	#: The number of characters before the end of a backwards search which are searched first.
+	#: If there is no match, the number of characters searched is doubled, and so on.
+	BACKWARD_SEARCH_WINDOW = 4096
+
+	def __init__(self, text: str, caseSensitive: bool, useRegex: bool, wholeWord: bool):
+		"""
+		@param text: The text to search for, or a regular expression if C{useRegex} is C{True}.
+		@param wholeWord: Whether only matches which don't start or end within a word are found.
+		@raise re.error: If C{useRegex} is C{True} and the text isn't a valid regular expression.
+		"""
+		pattern = text if useRegex else re.escape(text)
+		if wholeWord:
+			pattern = rf"(?<!\w)(?:{pattern})(?!\w)"
+		self.wholeWord = wholeWord
+		self.regex = re.compile(pattern, (0 if caseSensitive else re.IGNORECASE) | re.UNICODE)
+
+	def _isMatchValid(self, match: "re.Match", text: str, end: int) -> bool:
+		"""Checks that a match isn't empty, as finding it wouldn't move anywhere,
+		and checks a match which ends at the end of a search, where the pattern can't see past the end.
+		"""
+		if match.end() == match.start():
+			return False
+		return not (
+			self.wholeWord
+			and match.end() == end < len(text)
+			and re.match(r"\w", text[end])
+		)
+
+	def search(self, text: str, start: int = 0, end: Optional[int] = None) -> Optional[Tuple[int, int]]:
+		"""Finds the first match which lies between the given offsets of the text.
+		@return: The start and end offsets of the match, or C{None} if there is no match.
+		"""
+		if end is None:
+			end = len(text)
+		while start <= end:
+			match = self.regex.search(text, start, end)
+			if not match:
+				return None
+			if self._isMatchValid(match, text, end):
+				return match.span()
+			start = match.start() + 1
+		return None
+
+	def searchBackward(self, text: str, start: int = 0, end: Optional[int] = None) -> Optional[Tuple[int, int]]:
+		"""Finds the match which starts last, of those which lie between the given offsets of the text.
+		The text just before the end is searched first,
+		so that the whole text needn't be searched to find a match near the end.
+		@return: The start and end offsets of the match, or C{None} if there is no match.
+		"""
+		if end is None:
+			end = len(text)
+		windowSize = self.BACKWARD_SEARCH_WINDOW
+		# Matches which start at or after this offset have already been searched for.
+		searchedFrom = end + 1
+		while True:
+			windowStart = max(start, end - windowSize)
+			lastSpan = None
+			offset = windowStart
+			while offset < searchedFrom:
+				match = self.regex.search(text, offset, end)
+				if not match or match.start() >= searchedFrom:
+					break
+				if self._isMatchValid(match, text, end):
+					lastSpan = match.span()
+				offset = match.start() + 1
+			if lastSpan:
+				return lastSpan
+			if windowStart == start:
+				return None
+			searchedFrom = windowStart
+			windowSize *= 2
+
+
+@lru_cache(maxsize=8)
+def _getSearchPattern(text: str, caseSensitive: bool, useRegex: bool, wholeWord: bool) -> _SearchPattern:
+	"""Gets the compiled pattern for a search,
+	so that the pattern is compiled only once when the same text is searched for repeatedly (e.g. find next).
+	"""
+	return _SearchPattern(text, caseSensitive, useRegex, wholeWord)
+
+
 def findStartOfWord(text,offset,lineLength=None):
 	"""Searches backwards through the given text from the given offset, until it finds the offset that is the start of the word. It checks to see if a character is alphanumeric, or is another symbol , or is white space.
 	@param text: the text to search
@@ -129,6 +395,70 @@ def findEndOfWord(text,offset,lineLength=None):
 		offset+=1
 	return offset
 
+
+#: Matches characters which aren't letters, numbers or white space according to L{re},
+#: i.e. the only characters which might still be marks (unicode category M).
+_NON_WORD_CHAR_RE = re.compile(r"[^\w\s]|_")
+#: Matches the words and other characters of text with marks replaced as done by L{_WordBoundaries}.
+_WORD_SEGMENT_RE = re.compile(r"[^\W_]+|\S")
+
+
+def _replaceNonWordChar(match: re.Match) -> str:
+	return "a" if unicodedata.category(match.group())[0] == "M" else "."
+
+
+class _WordBoundaries:
+	"""The word boundaries in a line of text, found in a single pass over the text.
+	Words are found exactly as L{findStartOfWord} and L{findEndOfWord} find them,
+	but by bisecting the boundaries rather than checking the category of characters around an offset.
+	"""
+
+	def __init__(self, text: str):
+		"""
+		@param text: The line text.
+		"""
+		self.text = text
+		# Letters, numbers and marks (unicode categories L, N and M) make up words.
+		# Regular expressions match letters and numbers, so only other characters are checked for marks.
+		segmentText = _NON_WORD_CHAR_RE.sub(_replaceNonWordChar, text)
+		#: The start offsets of every word and every other character which isn't white space.
+		#: Each of these ends where the next starts, as any white space after it belongs to it.
+		self._starts = array("q", (match.start() for match in _WORD_SEGMENT_RE.finditer(segmentText)))
+
+	def findStartOfWord(self, offset: int) -> int:
+		"""@see: L{findStartOfWord}"""
+		if offset < 0:
+			return findStartOfWord(self.text, offset)
+		if offset >= len(self.text):
+			return offset
+		index = bisect_right(self._starts, offset) - 1
+		# White space at the start of the text starts at 0.
+		return self._starts[index] if index >= 0 else 0
+
+	def findEndOfWord(self, offset: int) -> int:
+		"""@see: L{findEndOfWord}"""
+		if offset < 0:
+			return findEndOfWord(self.text, offset)
+		if offset >= len(self.text):
+			return offset + 1
+		index = bisect_right(self._starts, offset)
+		return self._starts[index] if index < len(self._starts) else len(self.text)
+
+
+#: The word boundaries for the line text most recently searched for words.
+#: It is replaced as soon as words in a different line text are searched for.
+_lastWordBoundaries: Optional[_WordBoundaries] = None
+
+
+def _getWordBoundaries(text: str) -> _WordBoundaries:
+	"""Gets the word boundaries for a line text, building them if the line text has changed."""
+	global _lastWordBoundaries
+	wordBoundaries = _lastWordBoundaries
+	if wordBoundaries is None or wordBoundaries.text != text:
+		wordBoundaries = _lastWordBoundaries = _WordBoundaries(text)
+	return wordBoundaries
+
+
 class OffsetsTextInfo(textInfos.TextInfo):
 	"""An abstract TextInfo for text implementations which represent ranges using numeric offsets relative to the start of the text.
 	In such implementations, the start of the text is represented by 0 and the end is the length of the entire text.
@@ -153,6 +483,10 @@ class OffsetsTextInfo(textInfos.TextInfo):
 	useUniscribe: bool = True
 	#: The encoding internal to the underlying text info implementation.
 	encoding: Optional[str] = textUtils.WCHAR_ENCODING
+	#: Whether the base implementation of L{_getLineOffsets} should index the line breaks in the story text,
+	#: rather than searching the story text for every line.
+	#: The index is kept for as long as the story text is unchanged.
+	useLineIndex: bool = True
 
 	def __eq__(self,other):
 		if self is other or (isinstance(other,OffsetsTextInfo) and self._startOffset==other._startOffset and self._endOffset==other._endOffset):
@@ -395,21 +729,62 @@ class OffsetsTextInfo(textInfos.TextInfo):
 			if offsets is not None:
 				return (offsets[0] + lineStart, offsets[1] + lineStart)
 		#Fall back to the older word offsets detection that only breaks on non alphanumeric
+		wordBoundaries = _getWordBoundaries(lineText)
 		if self.encoding == textUtils.WCHAR_ENCODING:
 			offsetConverter = textUtils.WideStringOffsetConverter(lineText)
 			relStrOffset = offsetConverter.wideToStrOffsets(relOffset, relOffset)[0]
-			relStrStart = findStartOfWord(lineText, relStrOffset)
-			relStrEnd = findEndOfWord(lineText, relStrOffset)
+			relStrStart = wordBoundaries.findStartOfWord(relStrOffset)
+			relStrEnd = wordBoundaries.findEndOfWord(relStrOffset)
 			relWideStringStart, relWideStringEnd = offsetConverter.strToWideOffsets(relStrStart, relStrEnd)
 			return (relWideStringStart + lineStart, relWideStringEnd + lineStart)
-		start=findStartOfWord(lineText,offset-lineStart)+lineStart
-		end=findEndOfWord(lineText,offset-lineStart)+lineStart
+		start = wordBoundaries.findStartOfWord(offset - lineStart) + lineStart
+		end = wordBoundaries.findEndOfWord(offset - lineStart) + lineStart
 		return [start,end]
 
 	def _getLineNumFromOffset(self,offset):
 		return None
 
+	def _getLineCount(self):
+		"""Retrieve the number of lines in the story.
+		The base implementation uses the line index of the story text, see L{useLineIndex}.
+		@raise NotImplementedError: If the number of lines can't be determined.
+		"""
+		if not self._canUseLineIndex():
+			raise NotImplementedError
+		return len(self._getLineIndex().lineStarts)
+
+	def _canUseLineIndex(self) -> bool:
+		"""Whether lines are found in the story text using its line index.
+		This is only the case if L{useLineIndex} is set,
+		lines are found by searching the story text (i.e. L{_getLineOffsets} isn't overridden)
+		and the story text can be searched for this encoding.
+		"""
+		return self.useLineIndex and type(self)._getLineOffsets is OffsetsTextInfo._getLineOffsets and (
+			self.encoding == textUtils.WCHAR_ENCODING
+			or self.encoding is None
+			or self.encoding == "utf_32_le"
+			or self.encoding == textUtils.USER_ANSI_CODE_PAGE
+		)
+
+	def _getLineIndex(self) -> _LineIndex:
+		"""Get the line index for the current story text, building it if the story text has changed.
+		@raise NotImplementedError: If the story text can't be retrieved.
+		"""
+		global _lastLineIndex
+		text = self._getStoryText()
+		isWide = self.encoding == textUtils.WCHAR_ENCODING
+		lineIndex = _lastLineIndex
+		if (
+			lineIndex is None
+			or lineIndex.isWide != isWide
+			or (lineIndex.text is not text and lineIndex.text != text)
+		):
+			lineIndex = _lastLineIndex = _LineIndex(text, isWide)
+		return lineIndex
+
 	def _getLineOffsets(self,offset):
+		if self._canUseLineIndex():
+			return self._getLineIndex().getLineOffsets(offset)
 		text=self._getStoryText()
 		if self.encoding == textUtils.WCHAR_ENCODING:
 			offsetConverter = textUtils.WideStringOffsetConverter(text)
@@ -508,6 +883,56 @@ class OffsetsTextInfo(textInfos.TextInfo):
 			raise ValueError("unknown unit: %s"%unit)
 		return offsetsFunc(offset)
 
+	def _getMoveLimits(self, unit: str) -> Tuple[int, int]:
+		"""Gets the lowest and highest offsets which L{move} can move to by the given unit."""
+		highLimit = self._getStoryLength()
+		if self.allowMoveToOffsetPastEnd and unit == textInfos.UNIT_CHARACTER:
+			# #2096: There is often an uncounted character at the end of the text
+			# where the caret is placed to append text.
+			highLimit += 1
+		return (0, highLimit)
+
+	def _getUnitOffsetsBatch(self, unit: str, offset: int, count: int) -> Optional[Tuple[int, int]]:
+		"""Moves over several units at once, rather than getting the offsets of each unit one at a time.
+		Moving must have exactly the same result as L{move} getting the offsets of each unit
+		with L{_getUnitOffsets}, including stopping at the limits given by L{_getMoveLimits}.
+		Subclasses which can move over many units at once natively (e.g. with one cross-process call)
+		should override this.
+		This base implementation moves by character in text where every character takes one offset,
+		and by line using the line index (see L{useLineIndex}).
+		@param unit: The unit to move by.
+		@param offset: The offset to move from.
+		@param count: The number of units to move, negative to move backward.
+		@return: The offset moved to and the number of units moved,
+			or C{None} if units must be moved one at a time.
+		"""
+		if unit == textInfos.UNIT_LINE and self._canUseLineIndex():
+			return self._getLineIndex().moveLines(offset, count)
+		if (
+			unit != textInfos.UNIT_CHARACTER
+			or self.useUniscribe
+			or type(self)._getCharacterOffsets is not OffsetsTextInfo._getCharacterOffsets
+		):
+			return None
+		lowLimit, highLimit = self._getMoveLimits(unit)
+		if self.encoding == textUtils.WCHAR_ENCODING:
+			# Characters take two offsets if they are outside the basic multilingual plane,
+			# and the offsets of the position after the end of the text are collapsed.
+			try:
+				text = self._getStoryText()
+			except NotImplementedError:
+				return None
+			storyLength = textUtils.WideStringOffsetConverter(text).wideStringLength
+			if storyLength != len(text) or offset > storyLength or (count > 0 and offset + count >= storyLength):
+				return None
+		elif self.encoding not in (None, "utf_32_le", textUtils.USER_ANSI_CODE_PAGE):
+			return None
+		if count > 0:
+			count = max(0, min(count, highLimit - offset))
+		else:
+			count = -max(0, min(-count, offset - lowLimit))
+		return (offset + count, count)
+
 	def _get_pointAtStart(self):
 		try:
 			return self._getBoundingRectFromOffset(self._startOffset).topLeft
@@ -593,8 +1018,14 @@ class OffsetsTextInfo(textInfos.TextInfo):
 		return self._getTextRange(self._startOffset,self._endOffset)
 
 	def unitIndex(self,unit):
-		if unit==textInfos.UNIT_LINE:  
-			return self._lineNumFromOffset(self._startOffset)
+		if unit == textInfos.UNIT_LINE:
+			lineNum = self._getLineNumFromOffset(self._startOffset)
+			if lineNum is None:
+				# Fall back to the line index of the story text, see L{useLineIndex}.
+				if not self._canUseLineIndex():
+					raise NotImplementedError
+				lineNum = self._getLineIndex().getLineNumFromOffset(self._startOffset)
+			return lineNum + 1
 		else:
 			raise NotImplementedError
 
@@ -616,24 +1047,12 @@ class OffsetsTextInfo(textInfos.TextInfo):
 		else:
 			self.collapse()
 			offset=self._startOffset
-		lastOffset=None
-		count=0
-		lowLimit=0
-		highLimit=self._getStoryLength()
-		if self.allowMoveToOffsetPastEnd and unit==textInfos.UNIT_CHARACTER:
-			# #2096: There is often an uncounted character at the end of the text
-			# where the caret is placed to append text.
-			highLimit+=1
-		while count!=direction and (lastOffset is None or (direction>0 and offset>lastOffset) or (direction<0 and offset<lastOffset)) and (offset<highLimit or direction<0) and (offset>lowLimit or direction>0):
-			lastOffset=offset
-			if direction<0 and offset>lowLimit:
-				offset-=1
-			newStart,newEnd=self._getUnitOffsets(unit,offset)
-			if direction<0:
-				offset=newStart
-			elif direction>0:
-				offset=newEnd
-			count=count+1 if direction>0 else count-1
+		lowLimit, highLimit = self._getMoveLimits(unit)
+		batch = self._getUnitOffsetsBatch(unit, offset, direction)
+		if batch is not None:
+			offset, count = batch
+		else:
+			offset, count = self._moveByStepping(unit, direction, offset, lowLimit, highLimit)
 		if endPoint=="start":
 			if (direction>0 and offset<=self._startOffset) or (direction<0 and offset>=self._startOffset) or offset<lowLimit or offset>=highLimit:
 				return 0
@@ -652,23 +1071,86 @@ class OffsetsTextInfo(textInfos.TextInfo):
 			self._endOffset=tempOffset
 		return count
 
-	def find(self,text,caseSensitive=False,reverse=False):
-		if reverse:
-			# When searching in reverse, we reverse both strings and do a forwards search.
-			text = text[::-1]
-			# Start searching one before the start to avoid finding the current match.
-			inText=self._getTextRange(0,self._startOffset)[::-1]
+	def _moveByStepping(
+			self,
+			unit: str,
+			direction: int,
+			offset: int,
+			lowLimit: int,
+			highLimit: int
+	) -> Tuple[int, int]:
+		"""Moves from the given offset by the given number of units, one unit at a time.
+		@return: The offset moved to, and the number of units moved.
+		"""
+		lastOffset = None
+		count = 0
+		if unit == textInfos.UNIT_LINE and self._canUseLineIndex():
+			# Fetch the story text and its line index once for all lines moved over,
+			# rather than once for every line.
+			lineIndex = self._getLineIndex()
+
+			def getUnitOffsets(unit: str, offset: int) -> Tuple[int, int]:
+				return lineIndex.getLineOffsets(offset)
 		else:
-			# Start searching one past the start to avoid finding the current match.
-			inText=self._getTextRange(self._startOffset+1,self._getStoryLength())
-		m=re.search(re.escape(text),inText,(0 if caseSensitive else re.IGNORECASE)|re.UNICODE)
-		if not m:
-			return False
+			getUnitOffsets = self._getUnitOffsets
+		while (
+			count != direction
+			and (
+				lastOffset is None
+				or (direction > 0 and offset > lastOffset)
+				or (direction < 0 and offset < lastOffset)
+			)
+			and (offset < highLimit or direction < 0)
+			and (offset > lowLimit or direction > 0)
+		):
+			lastOffset = offset
+			if direction < 0 and offset > lowLimit:
+				offset -= 1
+			newStart, newEnd = getUnitOffsets(unit, offset)
+			if direction < 0:
+				offset = newStart
+			elif direction > 0:
+				offset = newEnd
+			count = count + 1 if direction > 0 else count - 1
+		return offset, count
+
+	def find(self, text, caseSensitive=False, reverse=False, useRegex=False, wholeWord=False):
+		"""
+		@param useRegex: Whether the text is a regular expression.
+		@param wholeWord: Whether to only find matches which don't start or end within a word.
+		@raise re.error: If C{useRegex} is C{True} and the text isn't a valid regular expression.
+		@see: L{textInfos.TextInfo.find}
+		"""
+		pattern = _getSearchPattern(text, caseSensitive, useRegex, wholeWord)
+		isWide = self.encoding == textUtils.WCHAR_ENCODING
 		if reverse:
-			offset=self._startOffset-m.end()
+			# Search before the start to avoid finding the current match.
+			rangeEnd = self._startOffset
+			if wholeWord:
+				# Whether a match ends a word depends on the character after it.
+				rangeEnd = min(rangeEnd + 1, self._getStoryLength())
+			inText = self._getTextRange(0, rangeEnd)
+			end = len(inText) - (rangeEnd - self._startOffset)
+			span = pattern.searchBackward(inText, end=end)
+			if not span:
+				return False
+			offset = span[0]
+			if isWide:
+				# Only the text after the match need be encoded.
+				offset = self._startOffset - textUtils.WideStringOffsetConverter(inText[offset:end]).wideStringLength
 		else:
-			offset=self._startOffset+1+m.start()
-		self._startOffset=self._endOffset=offset
+			# The current character is only fetched so that whether a match starts a word can be determined.
+			# Start searching one past it to avoid finding the current match.
+			inText = self._getTextRange(self._startOffset, self._getStoryLength())
+			span = pattern.search(inText, start=1)
+			if not span:
+				return False
+			offset = span[0]
+			if isWide:
+				# Only the text before the match need be encoded.
+				offset = textUtils.WideStringOffsetConverter(inText[:offset]).wideStringLength
+			offset += self._startOffset
+		self._startOffset = self._endOffset = offset
 		return True
 
 	def updateCaret(self):
@@ -11,14 +11,21 @@ Classes and utilities to deal with offsets variable width encodings, particularl
 import encodings
 import sys
 import ctypes
+import re
+from bisect import bisect_left, bisect_right
 from collections.abc import ByteString
-from typing import Tuple, Optional
+from typing import List, Tuple, Optional
 import locale
 from logHandler import log
 
 WCHAR_ENCODING = "utf_16_le"
 USER_ANSI_CODE_PAGE = locale.getpreferredencoding()
 
+#: Matches characters which take two offsets in a wide character (UTF-16) string.
+_ASTRAL_CHAR_RE = re.compile("[\U00010000-\U0010ffff]")
+#: Matches surrogate characters in a str, which combine when they are encoded and decoded again.
+_SURROGATE_CHAR_RE = re.compile("[\ud800-\udfff]")
+
 
 class WideStringOffsetConverter:
 	R"""
@@ -48,6 +55,9 @@ class WideStringOffsetConverter:
 			raise TypeError("Value must be of type str")
 		self.decoded: str = text
 		self.encoded: bytes = text.encode(self._encoding, errors="surrogatepass")
+		self._isIndexed = False
+		self._astralStrOffsets: Optional[List[int]] = None
+		self._astralWideOffsets: Optional[List[int]] = None
 
 	def __repr__(self):
 		return "{}({})".format(self.__class__.__name__, repr(self.decoded))
@@ -62,6 +72,28 @@ class WideStringOffsetConverter:
 		"""Returns the length of the string in its pythonic string representation."""
 		return len(self.decoded)
 
+	def _index(self) -> bool:
+		"""Indexes the offsets of the characters which take two offsets in the wide character string,
+		so that offsets can be converted without encoding or decoding the string.
+		The index is only built the first time offsets are converted.
+		@return: C{False} if the string contains surrogate characters,
+			in which case offsets have to be converted by encoding or decoding the string.
+		"""
+		if not self._isIndexed:
+			if self.wideStringLength == self.strLength:
+				# There are no characters outside the basic multilingual plane.
+				self._astralStrOffsets = self._astralWideOffsets = []
+			else:
+				self._astralStrOffsets = [m.start() for m in _ASTRAL_CHAR_RE.finditer(self.decoded)]
+				self._astralWideOffsets = [
+					strOffset + index
+					for index, strOffset in enumerate(self._astralStrOffsets)
+				]
+			if _SURROGATE_CHAR_RE.search(self.decoded):
+				self._astralStrOffsets = self._astralWideOffsets = None
+			self._isIndexed = True
+		return self._astralStrOffsets is not None
+
 	def strToWideOffsets(
 		self,
 		strStart: int,
@@ -95,6 +127,18 @@ class WideStringOffsetConverter:
 			if raiseOnError:
 				raise IndexError("str end index out of range")
 			strEnd = max(0, min(strEnd, self.strLength))
+		if not self._index():
+			return self._strToWideOffsetsByEncoding(strStart, strEnd)
+		if not self._astralStrOffsets:
+			return (strStart, strEnd)
+		# Every character outside the basic multilingual plane before an offset moves it on by one.
+		return (
+			strStart + bisect_left(self._astralStrOffsets, strStart),
+			strEnd + bisect_left(self._astralStrOffsets, strEnd)
+		)
+
+	def _strToWideOffsetsByEncoding(self, strStart: int, strEnd: int) -> Tuple[int, int]:
+		"""Implements L{strToWideOffsets} for offsets within range by encoding the string."""
 		# If the original string contains surrogate characters, we want to preserve them
 		if strStart == 0:
 			wideStringStart: int = 0
@@ -149,6 +193,37 @@ class WideStringOffsetConverter:
 			if raiseOnError:
 				raise IndexError("Wide string end index out of range")
 			wideStringEnd = max(0, min(wideStringEnd, self.wideStringLength))
+		if not self._index():
+			return self._wideToStrOffsetsByDecoding(wideStringStart, wideStringEnd)
+		if not self._astralWideOffsets:
+			return (wideStringStart, wideStringEnd)
+		astralWideOffsets = self._astralWideOffsets
+		# As with decoding, a single offset which lands in the middle of a surrogate pair is stretched
+		# to cover the low surrogate, so that it maps onto the character.
+		if wideStringStart == wideStringEnd and wideStringEnd < self.wideStringLength:
+			correctedWideStringEnd = wideStringEnd + 1
+		else:
+			correctedWideStringEnd = wideStringEnd
+		# Every complete surrogate pair before an offset moves it back by one.
+		# A lone half of a surrogate pair counts as a character of its own.
+		strStart = wideStringStart - bisect_right(astralWideOffsets, wideStringStart - 2)
+		strEnd = correctedWideStringEnd - bisect_right(astralWideOffsets, correctedWideStringEnd - 2)
+		startIndex = bisect_left(astralWideOffsets, wideStringStart - 1)
+		if (
+			correctedWideStringEnd > wideStringStart
+			and startIndex < len(astralWideOffsets)
+			and astralWideOffsets[startIndex] == wideStringStart - 1
+		):
+			# wideStringStart is in the middle of a surrogate pair,
+			# so the range starts with the character of that pair.
+			strStart -= 1
+		if correctedWideStringEnd > wideStringEnd:
+			# Compensate for the case where we stretched our offsets earlier
+			strEnd -= correctedWideStringEnd - wideStringEnd
+		return (strStart, strEnd)
+
+	def _wideToStrOffsetsByDecoding(self, wideStringStart: int, wideStringEnd: int) -> Tuple[int, int]:
+		"""Implements L{wideToStrOffsets} for offsets within range by decoding the string."""
 		bytesStart: int = wideStringStart * self._bytesPerIndex
 		bytesEnd: int = wideStringEnd * self._bytesPerIndex
 		precedingStr= self.encoded[:bytesStart].decode(self._encoding, errors="surrogatepass")
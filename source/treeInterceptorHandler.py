@@ -203,8 +203,15 @@ class RootProxyTextInfo(textInfos.TextInfo):
 	def copyToClipboard(self, notify=False):
 		return self.innerTextInfo.copyToClipboard(notify)
 
-	def find(self,text,caseSensitive=False,reverse=False):
-		return self.innerTextInfo.find(text,caseSensitive,reverse)
+	def find(self, text, caseSensitive=False, reverse=False, useRegex=False, wholeWord=False):
+		# Only pass the extra search options when used,
+		# as inner TextInfos which don't support them may not accept them.
+		kwargs = {}
+		if useRegex:
+			kwargs["useRegex"] = True
+		if wholeWord:
+			kwargs["wholeWord"] = True
+		return self.innerTextInfo.find(text, caseSensitive, reverse, **kwargs)
 
 	def activate(self):
 		return self.innerTextInfo.activate()
@@ -0,0 +1,69 @@
+# A part of NonVisual Desktop Access (NVDA)
+# Copyright (C) 2023 NV Access Limited
+# This file may be used under the terms of the GNU General Public License, version 2 or later.
+# For more details see: https://www.gnu.org/licenses/gpl-2.0.html
+
+from collections import OrderedDict
+from typing import (
+	Generic,
+	Hashable,
+	Optional,
+	TypeVar,
+)
+
+
+_KeyT = TypeVar("_KeyT", bound=Hashable)
+_ValueT = TypeVar("_ValueT")
+
+
+class LRUCache(Generic[_KeyT, _ValueT]):
+	"""A bounded cache which discards the least recently used value when it is full.
+	Unlike L{functools.lru_cache}, the cache can be cleared by whoever owns the cached data,
+	and it counts hits and misses so its effectiveness can be measured.
+	"""
+
+	def __init__(self, maxSize: int):
+		"""
+		@param maxSize: The maximum number of values to keep.
+		"""
+		self.maxSize = maxSize
+		self._values: OrderedDict[_KeyT, _ValueT] = OrderedDict()
+		self.hits = 0
+		"""The number of lookups which found a cached value."""
+		self.misses = 0
+		"""The number of lookups which did not find a cached value."""
+
+	def __len__(self) -> int:
+		return len(self._values)
+
+	def get(self, key: _KeyT) -> Optional[_ValueT]:
+		"""Fetches the cached value for the given key, marking it as most recently used.
+		@return: The value, or C{None} if it isn't cached.
+		"""
+		try:
+			value = self._values[key]
+		except KeyError:
+			self.misses += 1
+			return None
+		self._values.move_to_end(key)
+		self.hits += 1
+		return value
+
+	def set(self, key: _KeyT, value: _ValueT) -> None:
+		"""Caches a value, discarding the least recently used value if the cache is full."""
+		self._values[key] = value
+		self._values.move_to_end(key)
+		if len(self._values) > self.maxSize:
+			self._values.popitem(last=False)
+
+	def clear(self) -> None:
+		"""Discards all cached values.
+		Hit and miss counts are kept.
+		"""
+		self._values.clear()
+
+	@property
+	def hitRate(self) -> float:
+		"""The fraction of lookups which found a cached value."""
+		lookups = self.hits + self.misses
+		return self.hits / lookups if lookups else 0.0
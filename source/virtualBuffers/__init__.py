@@ -12,6 +12,7 @@ import itertools
 from typing import (
 	Optional,
 	Dict,
+	Tuple,
 )
 import weakref
 import wx
@@ -97,6 +98,109 @@ def _prepareForFindByAttributes(attribs):
 		regexp.append("".join(optRegexp))
 	return u" ".join(reqAttrs), u"|".join(regexp)
 
+
+def _copyCommands(commands: textInfos.TextInfo.TextWithFieldsT) -> textInfos.TextInfo.TextWithFieldsT:
+	"""Copies a list of commands and their fields, so that changes to the copy don't affect the original."""
+	return [
+		textInfos.FieldCommand(
+			command.command,
+			type(command.field)(command.field) if command.field is not None else None
+		) if isinstance(command, textInfos.FieldCommand) else command
+		for command in commands
+	]
+
+
+class FieldsCache:
+	"""Caches the parsed and normalized fields of ranges of a virtual buffer, keyed by the offsets of the range.
+	The cache must be cleared whenever the buffer changes.
+	The size of a range is the length of its XML text.
+	Once the total size of the cached ranges exceeds the maximum size
+	(the virtualBuffers.maxFieldsCacheSize setting),
+	the least recently used ranges are discarded.
+	"""
+
+	def __init__(self):
+		self._lock = threading.Lock()
+		self._entries: collections.OrderedDict[
+			Tuple[int, int],
+			Tuple[textInfos.TextInfo.TextWithFieldsT, int]
+		] = collections.OrderedDict()
+		#: The total size of the cached ranges.
+		self.size = 0
+		#: Incremented whenever the cache is cleared,
+		#: so that fields fetched before the cache was cleared are not cached.
+		self.generation = 0
+		#: The number of lookups which found cached fields.
+		self.hits = 0
+		#: The number of lookups which did not find cached fields.
+		self.misses = 0
+		#: The number of ranges discarded to keep the cache within its maximum size.
+		self.evictions = 0
+		#: The number of times the cache has been cleared.
+		self.invalidations = 0
+
+	@property
+	def maxSize(self) -> int:
+		return config.conf["virtualBuffers"]["maxFieldsCacheSize"]
+
+	def __len__(self) -> int:
+		return len(self._entries)
+
+	def get(self, start: int, end: int) -> Optional[textInfos.TextInfo.TextWithFieldsT]:
+		"""Gets a copy of the cached fields of a range.
+		@return: The fields, or C{None} if the range isn't cached.
+		"""
+		with self._lock:
+			try:
+				commands, size = self._entries[start, end]
+			except KeyError:
+				self.misses += 1
+				return None
+			self._entries.move_to_end((start, end))
+			self.hits += 1
+		return _copyCommands(commands)
+
+	def set(
+			self,
+			start: int,
+			end: int,
+			commands: textInfos.TextInfo.TextWithFieldsT,
+			size: int,
+			generation: int
+	):
+		"""Caches a copy of the fields of a range.
+		@param size: The length of the XML text of the range.
+		@param generation: The L{generation} of the cache before the fields were fetched.
+			The fields aren't cached if the cache has been cleared since.
+		"""
+		maxSize = self.maxSize
+		if size > maxSize:
+			return
+		commands = _copyCommands(commands)
+		with self._lock:
+			if generation != self.generation:
+				return
+			oldEntry = self._entries.pop((start, end), None)
+			if oldEntry:
+				self.size -= oldEntry[1]
+			self._entries[start, end] = (commands, size)
+			self.size += size
+			while self.size > maxSize:
+				discardedCommands, discardedSize = self._entries.popitem(last=False)[1]
+				self.size -= discardedSize
+				self.evictions += 1
+
+	def clear(self):
+		"""Discards all cached fields, e.g. because the buffer has changed.
+		This may be called from any thread.
+		"""
+		with self._lock:
+			self._entries.clear()
+			self.size = 0
+			self.generation += 1
+			self.invalidations += 1
+
+
 class VirtualBufferQuickNavItem(browseMode.TextInfoQuickNavItem):
 
 	def __init__(self,itemType,document,vbufNode,startOffset,endOffset):
@@ -274,8 +378,7 @@ class VirtualBufferTextInfo(browseMode.BrowseModeDocumentTextInfo,textInfos.offs
 			command.field = self._normalizeFormatField(field)
 		return command
 
-	def _getFieldsInRange(self, start: int, end: int) -> textInfos.TextInfo.TextWithFieldsT:
-		text=NVDAHelper.VBuf_getTextInRange(self.obj.VBufHandle,start,end,True)
+	def _getFieldsInText(self, text: Optional[str]) -> textInfos.TextInfo.TextWithFieldsT:
 		if not text:
 			return [""]
 		commandList = XMLFormatting.XMLTextParser().parse(text)
@@ -287,6 +390,25 @@ class VirtualBufferTextInfo(browseMode.BrowseModeDocumentTextInfo,textInfos.offs
 		]
 		return commandList
 
+	def _getFieldsInRange(self, start: int, end: int) -> textInfos.TextInfo.TextWithFieldsT:
+		"""Gets the commands and text of the range,
+		using the fields cache of the buffer (see L{VirtualBuffer.fieldsCache}) if possible.
+		"""
+		fieldsCache: FieldsCache = self.obj.fieldsCache
+		if fieldsCache.maxSize <= 0:
+			text = NVDAHelper.VBuf_getTextInRange(self.obj.VBufHandle, start, end, True)
+			return self._getFieldsInText(text)
+		# Note the generation before fetching the text,
+		# as the buffer may change and the cache be cleared while the text is fetched and parsed.
+		generation = fieldsCache.generation
+		commands = fieldsCache.get(start, end)
+		if commands is not None:
+			return commands
+		text = NVDAHelper.VBuf_getTextInRange(self.obj.VBufHandle, start, end, True)
+		commands = self._getFieldsInText(text)
+		fieldsCache.set(start, end, commands, len(text) if text else 0, generation)
+		return commands
+
 	def getTextWithFields(self, formatConfig: Optional[Dict] = None) -> textInfos.TextInfo.TextWithFieldsT:
 		start=self._startOffset
 		end=self._endOffset
@@ -416,6 +538,10 @@ class VirtualBuffer(browseMode.BrowseModeDocumentTreeInterceptor):
 	#: Maps root identifiers (docHandle and ID) to buffers.
 	rootIdentifiers = weakref.WeakValueDictionary()
 
+	#: Speech generated for ranges of this buffer can be cached by L{speech.getTextInfoSpeech},
+	#: as the cache is cleared whenever the buffer changes, see L{changeNotify}.
+	_cachesTextInfoSpeech = True
+
 	def __init__(self,rootNVDAObject,backendName=None):
 		super(VirtualBuffer,self).__init__(rootNVDAObject)
 		self.backendName=backendName
@@ -423,6 +549,9 @@ class VirtualBuffer(browseMode.BrowseModeDocumentTreeInterceptor):
 		self.isLoading=False
 		self.rootDocHandle,self.rootID=self.getIdentifierFromNVDAObject(self.rootNVDAObject)
 		self.rootIdentifiers[self.rootDocHandle, self.rootID] = self
+		#: The parsed fields of recently fetched ranges of this buffer.
+		#: It is cleared whenever the buffer changes.
+		self.fieldsCache = FieldsCache()
 
 	def prepare(self):
 		if not self.rootNVDAObject.appModule.helperLocalBindingHandle:
@@ -448,6 +577,7 @@ class VirtualBuffer(browseMode.BrowseModeDocumentTreeInterceptor):
 
 	def loadBuffer(self):
 		self.isLoading = True
+		self.fieldsCache.clear()
 		self._loadProgressCallLater = wx.CallLater(1000, self._loadProgress)
 		threading.Thread(
 			name=f"{self.__class__.__module__}.{self.loadBuffer.__qualname__}",
@@ -516,6 +646,7 @@ class VirtualBuffer(browseMode.BrowseModeDocumentTreeInterceptor):
 			except WindowsError:
 				pass
 			self.VBufHandle=None
+		self.fieldsCache.clear()
 
 	def isNVDAObjectPartOfLayoutTable(self,obj):
 		docHandle,ID=self.getIdentifierFromNVDAObject(obj)
@@ -730,9 +861,15 @@ class VirtualBuffer(browseMode.BrowseModeDocumentTreeInterceptor):
 	@classmethod
 	def changeNotify(cls, rootDocHandle, rootID):
 		try:
-			queueHandler.queueFunction(queueHandler.eventQueue, cls.rootIdentifiers[rootDocHandle, rootID]._handleUpdate)
+			buffer = cls.rootIdentifiers[rootDocHandle, rootID]
 		except KeyError:
-			pass
+			return
+		# Clear the fields cache immediately rather than in _handleUpdate,
+		# so that fields from before the change aren't used while _handleUpdate is queued.
+		buffer.fieldsCache.clear()
+		# Likewise for speech generated from those fields.
+		speech.clearTextInfoSpeechCache()
+		queueHandler.queueFunction(queueHandler.eventQueue, buffer._handleUpdate)
 
 	def _handleUpdate(self):
 		"""Handle an update to this buffer.
@@ -740,6 +877,7 @@ class VirtualBuffer(browseMode.BrowseModeDocumentTreeInterceptor):
 		if not self.VBufHandle:
 			# #4859: The buffer was unloaded after this method was queued.
 			return
+		self.fieldsCache.clear()
 		braille.handler.handleUpdate(self)
 
 	def getControlFieldForNVDAObject(self, obj):
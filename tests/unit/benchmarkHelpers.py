@@ -0,0 +1,47 @@
+# A part of NonVisual Desktop Access (NVDA)
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2023 NV Access Limited
+
+"""Helpers for benchmarks in the unit tests.
+Benchmarks only report how long code takes to run.
+They never fail because code is slow, since timings vary too much between machines.
+They are skipped unless the C{NVDA_UNIT_TEST_BENCHMARKS} environment variable is set; e.g.
+C{set NVDA_UNIT_TEST_BENCHMARKS=1 && rununittests.bat}
+"""
+
+import os
+import sys
+import timeit
+import unittest
+from typing import (
+	Callable,
+	Dict,
+)
+
+
+#: Whether benchmarks should be run.
+RUN_BENCHMARKS = bool(os.environ.get("NVDA_UNIT_TEST_BENCHMARKS"))
+
+#: Decorates a benchmark test method or class so that it is only run when benchmarks are requested.
+benchmark = unittest.skipUnless(RUN_BENCHMARKS, "Set NVDA_UNIT_TEST_BENCHMARKS to run benchmarks")
+
+
+def reportTimes(
+		testCase: unittest.TestCase,
+		number: int,
+		**funcs: Callable[[], object]
+) -> Dict[str, float]:
+	"""Times several functions and writes the results to stderr.
+	@param testCase: The benchmark being run, used to label the results.
+	@param number: How many times to call each function per timing.
+	@param funcs: The functions to time, keyed by the name to report them with.
+	@return: The best time of three timings for each function in seconds, keyed by name.
+	"""
+	times = {
+		name: min(timeit.repeat(func, number=number, repeat=3))
+		for name, func in funcs.items()
+	}
+	results = ", ".join(f"{name} {seconds:.4f}s" for name, seconds in times.items())
+	sys.stderr.write(f"\n{testCase.id()} ({number} calls): {results}\n")
+	return times
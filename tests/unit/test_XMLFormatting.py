@@ -0,0 +1,113 @@
+# A part of NonVisual Desktop Access (NVDA)
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2023 NV Access Limited
+
+"""Unit tests for the XMLFormatting module.
+"""
+
+import random
+import unittest
+
+import textInfos
+import textUtils
+from XMLFormatting import XMLTextParser
+
+FACE_PALM = "\U0001f926"  # 🤦
+
+
+def _unich(char: str) -> str:
+	"""Gets the unich elements for a character, one for every UTF-16 code unit."""
+	data = char.encode("utf_16_le")
+	return "".join(
+		f'<unich value="{int.from_bytes(data[i:i + 2], "little")}"/>'
+		for i in range(0, len(data), 2)
+	)
+
+
+def _xmlEscape(text: str) -> str:
+	return text.replace("&", "&amp;").replace("<", "&lt;").replace(">", "&gt;")
+
+
+class TestXMLTextParser(unittest.TestCase):
+
+	def test_textRunsAreJoined(self):
+		commands = XMLTextParser().parse('<control role="1">a &amp; b<text bold="1">c</text>d<control/>e</control>')
+		self.assertEqual(len(commands), 8)
+		self.assertEqual(commands[0].command, "controlStart")
+		self.assertEqual(commands[0].field["role"], "1")
+		self.assertEqual(commands[1], "a & b")
+		self.assertEqual(commands[2].command, "formatChange")
+		self.assertEqual(commands[3], "cd")
+		self.assertEqual(commands[4].command, "controlStart")
+		self.assertEqual(commands[5].command, "controlEnd")
+		self.assertEqual(commands[6], "e")
+		self.assertEqual(commands[7].command, "controlEnd")
+
+	def test_nodeAttributes(self):
+		commands = XMLTextParser().parse('<control _startOfNode="1" _endOfNode="0">a</control>')
+		self.assertIs(commands[0].field["_startOfNode"], True)
+		self.assertIs(commands[0].field["_endOfNode"], False)
+
+	def test_surrogatePairs(self):
+		xml = f'<text>a{_unich(FACE_PALM)}b{_unich(FACE_PALM)}{_unich(FACE_PALM)}</text>'
+		commands = XMLTextParser().parse(xml)
+		self.assertEqual(commands[1], f"a{FACE_PALM}b{FACE_PALM}{FACE_PALM}")
+
+	def test_loneSurrogates(self):
+		highSurrogate, lowSurrogate = '<unich value="55358"/>', '<unich value="56614"/>'
+		commands = XMLTextParser().parse(
+			f"<control>{lowSurrogate}a{lowSurrogate}{highSurrogate}b{highSurrogate}<text/>{lowSurrogate}</control>"
+		)
+		self.assertEqual(commands[1], "\udd26a\udd26\ud83eb\ud83e")
+		self.assertEqual(commands[3], "\udd26")
+
+	def test_invalidUnich(self):
+		commands = XMLTextParser().parse('<text>a<unich value="x"/>b</text>')
+		self.assertEqual(commands[1], f"a{textUtils.REPLACEMENT_CHAR}b")
+
+	def test_iterparseSameAsParse(self):
+		rand = random.Random(0)
+		parts = (
+			lambda: '<control role="5">',
+			lambda: '</control>',
+			lambda: '<text bold="1"/>',
+			lambda: _xmlEscape(rand.choice(("hello ", "<&>", "ü", "\n"))),
+			lambda: _unich(rand.choice((FACE_PALM, "a"))),
+		)
+		for trial in range(200):
+			depth = 1
+			xml = ["<control>"]
+			for i in range(rand.randint(0, 30)):
+				part = rand.choice(parts)()
+				if part == "</control>":
+					if depth == 1:
+						continue
+					depth -= 1
+				elif part.startswith("<control"):
+					depth += 1
+				xml.append(part)
+			xml.append("</control>" * depth)
+			xml = "".join(xml)
+			expected = XMLTextParser().parse(xml)
+			for chunkSize in (1, 7, 1000):
+				commands = list(XMLTextParser().iterparse(xml, chunkSize=chunkSize))
+				self.assertEqual(len(commands), len(expected))
+				for command, expectedCommand in zip(commands, expected):
+					if isinstance(expectedCommand, textInfos.FieldCommand):
+						self.assertEqual(command.command, expectedCommand.command)
+						self.assertEqual(command.field, expectedCommand.field)
+					else:
+						self.assertEqual(command, expectedCommand)
+
+	def test_iterparseYieldsBeforeEnd(self):
+		xml = f"<control>{'<control>a</control>' * 100}</control>"
+		commands = XMLTextParser().iterparse(xml, chunkSize=20)
+		self.assertEqual(next(commands).command, "controlStart")
+		self.assertEqual(next(commands).command, "controlStart")
+		self.assertEqual(next(commands), "a")
+
+	def test_largeTextRun(self):
+		xml = f"<text>{'abc' * 100000}{_unich(FACE_PALM) * 1000}</text>"
+		commands = XMLTextParser().parse(xml)
+		self.assertEqual(commands[1], "abc" * 100000 + FACE_PALM * 1000)
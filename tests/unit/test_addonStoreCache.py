@@ -0,0 +1,111 @@
+# A part of NonVisual Desktop Access (NVDA)
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2023 NV Access Limited
+
+"""Unit tests for the add-on store cache files written by _addonStore.dataManager."""
+
+import os
+import tempfile
+import unittest
+
+from _addonStore.dataManager import (
+	_readAddonCacheFile,
+	_writeAddonCacheFile,
+)
+from _addonStore.models.addon import (
+	AddonStoreModel,
+	_UnloadedAddonStoreModel,
+)
+from _addonStore.models.channel import Channel
+
+
+def _createAddonData(addonId: str, channel: Channel) -> dict:
+	version = {"major": 1, "minor": 2, "patch": 0}
+	return {
+		"addonId": addonId,
+		"displayName": f"{addonId} ü",
+		"description": "An add-on",
+		"publisher": "NV Access",
+		"channel": channel.value,
+		"addonVersionName": "1.2",
+		"addonVersionNumber": version,
+		"license": "GPL v2",
+		"sourceURL": "https://example.com/source",
+		"URL": f"https://example.com/{addonId}.nvda-addon",
+		"sha256": "0" * 64,
+		"minNVDAVersion": {"major": 2023, "minor": 1, "patch": 0},
+		"lastTestedVersion": {"major": 2023, "minor": 2, "patch": 0},
+	}
+
+
+class Test_addonCacheFile(unittest.TestCase):
+
+	def setUp(self):
+		cacheDir = tempfile.TemporaryDirectory()
+		self.addCleanup(cacheDir.cleanup)
+		self.cacheFilePath = os.path.join(cacheDir.name, "cache.dat")
+		self.addons = [
+			_createAddonData(f"addon{i}", Channel.STABLE if i % 2 else Channel.BETA)
+			for i in range(100)
+		]
+		_writeAddonCacheFile(
+			self.cacheFilePath,
+			self.addons,
+			cacheHash="hash",
+			cachedLanguage="en",
+			nvdaAPIVersion=(2023, 2, 0),
+		)
+
+	def test_roundTrip(self):
+		cache = _readAddonCacheFile(self.cacheFilePath)
+		self.assertEqual(cache.cacheHash, "hash")
+		self.assertEqual(cache.cachedLanguage, "en")
+		self.assertEqual(cache.nvdaAPIVersion, (2023, 2, 0))
+		self.assertEqual(len(cache.cachedAddonData[Channel.STABLE]), 50)
+		self.assertEqual(len(cache.cachedAddonData[Channel.BETA]), 50)
+		model = cache.cachedAddonData[Channel.STABLE]["addon1"]
+		self.assertIsInstance(model, AddonStoreModel)
+		self.assertEqual(model.displayName, "addon1 ü")
+		self.assertEqual(model.channel, Channel.STABLE)
+
+	def test_modelsCreatedWhenFetched(self):
+		cache = _readAddonCacheFile(self.cacheFilePath)
+		models = cache.cachedAddonData[Channel.BETA]
+		self.assertTrue(all(isinstance(model, _UnloadedAddonStoreModel) for _id, model in models._store.values()))
+		# Add-on IDs are case insensitive.
+		model = models["ADDON0"]
+		self.assertIs(models["addon0"], model)
+		self.assertIn("addon2", models)
+		loadedModels = [model for _id, model in models._store.values() if isinstance(model, AddonStoreModel)]
+		self.assertEqual(loadedModels, [model, models["addon2"]])
+		self.assertEqual(list(models)[0], "addon0")
+		self.assertTrue(all(isinstance(model, AddonStoreModel) for model in models.values()))
+
+	def test_invalidRecordDropped(self):
+		del self.addons[2]["license"]
+		self.addons[4]["addonVersionNumber"] = {"major": 1}
+		_writeAddonCacheFile(
+			self.cacheFilePath,
+			self.addons,
+			cacheHash="hash",
+			cachedLanguage="en",
+			nvdaAPIVersion=(2023, 2, 0),
+		)
+		models = _readAddonCacheFile(self.cacheFilePath).cachedAddonData[Channel.BETA]
+		with self.assertRaises(KeyError):
+			models["addon2"]
+		self.assertNotIn("addon2", models)
+		self.assertEqual(models["addon6"].addonId, "addon6")
+		# Add-ons are only listed if their models can be created.
+		self.assertEqual(len(models), 48)
+		self.assertEqual(list(models)[:3], ["addon0", "addon6", "addon8"])
+
+	def test_invalidFile(self):
+		with open(self.cacheFilePath, "rb") as cacheFile:
+			data = cacheFile.read()
+		for invalidData in (b"", b'{"data": []}', data[:len(data) // 2]):
+			with open(self.cacheFilePath, "wb") as cacheFile:
+				cacheFile.write(invalidData)
+			with self.assertRaises(ValueError):
+				_readAddonCacheFile(self.cacheFilePath)
@@ -0,0 +1,163 @@
+# A part of NonVisual Desktop Access (NVDA)
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2023 NV Access Limited
+
+"""Unit tests for the positions calculated by braille.BrailleBuffer.
+"""
+
+import unittest
+
+import braille
+
+
+class TestBufferPositions(unittest.TestCase):
+
+	def setUp(self):
+		self.buffer = braille.BrailleBuffer(braille.handler)
+		self.regions = []
+		for text in ("dialog", "", "list", "item"):
+			region = braille.TextRegion(text)
+			region.update()
+			self.regions.append(region)
+		self.buffer.regions.extend(self.regions)
+		self.buffer.update()
+
+	def test_regionsWithPositions(self):
+		start = 0
+		regionsWithPositions = self.buffer.regionsWithPositions
+		for region, (testRegion, testStart, testEnd) in zip(self.regions, regionsWithPositions):
+			self.assertIs(testRegion, region)
+			self.assertEqual(testStart, start)
+			start += len(region.brailleCells)
+			self.assertEqual(testEnd, start)
+		self.assertEqual(start, len(self.buffer.brailleCells))
+
+	def test_positionMaps(self):
+		rawToBraillePos = []
+		brailleToRawPos = []
+		brailleStart = rawStart = 0
+		for region in self.regions:
+			rawToBraillePos.extend(p + brailleStart for p in region.rawToBraillePos)
+			brailleToRawPos.extend(p + rawStart for p in region.brailleToRawPos)
+			brailleStart += len(region.brailleCells)
+			rawStart += len(region.rawText)
+		self.assertEqual(self.buffer.rawToBraillePos, rawToBraillePos)
+		self.assertEqual(self.buffer.brailleToRawPos, brailleToRawPos)
+
+	def test_bufferPosToRegionPos(self):
+		for bufferPos in range(len(self.buffer.brailleCells)):
+			region, pos = self.buffer.bufferPosToRegionPos(bufferPos)
+			self.assertEqual(self.buffer.regionPosToBufferPos(region, pos), bufferPos)
+		with self.assertRaises(LookupError):
+			self.buffer.bufferPosToRegionPos(len(self.buffer.brailleCells))
+
+	def test_regionPosToBufferPos(self):
+		listRegion = self.regions[2]
+		listStart = self.buffer.regionsWithPositions[2].start
+		self.assertEqual(self.buffer.regionPosToBufferPos(listRegion, 1), listStart + 1)
+		with self.assertRaises(LookupError):
+			self.buffer.regionPosToBufferPos(listRegion, len(listRegion.brailleCells))
+		self.assertEqual(
+			self.buffer.regionPosToBufferPos(listRegion, len(listRegion.brailleCells), allowNearest=True),
+			listStart
+		)
+		unknown = braille.TextRegion("unknown")
+		with self.assertRaises(LookupError):
+			self.buffer.regionPosToBufferPos(unknown, 0)
+		itemStart = self.buffer.regionsWithPositions[3].start
+		self.assertEqual(self.buffer.regionPosToBufferPos(unknown, 0, allowNearest=True), itemStart)
+
+	def test_clear(self):
+		self.buffer.clear()
+		self.assertEqual(self.buffer.regionsWithPositions, [])
+		self.assertEqual(self.buffer.rawToBraillePos, [])
+		with self.assertRaises(LookupError):
+			self.buffer.bufferPosToRegionPos(0)
+
+
+class _LetterRegion(braille.Region):
+	"""A region which sets its cells itself without calling the base L{braille.Region.update},
+	as some regions in add-ons do.
+	Each letter is shown as a single cell.
+	"""
+
+	def __init__(self, text: str, inPlace: bool = False):
+		super().__init__()
+		self.rawText = text
+		#: Whether to replace the items of the existing lists rather than assigning new lists.
+		self.inPlace = inPlace
+
+	def update(self):
+		cells = [ord(char) - ord("a") + 1 for char in self.rawText]
+		positions = list(range(len(self.rawText)))
+		if self.inPlace:
+			self.brailleCells[:] = cells
+			self.rawToBraillePos[:] = positions
+			self.brailleToRawPos[:] = positions
+		else:
+			self.brailleCells = cells
+			self.rawToBraillePos = positions
+			self.brailleToRawPos = list(positions)
+
+
+class TestDirtyRegions(unittest.TestCase):
+
+	def setUp(self):
+		self.buffer = braille.BrailleBuffer(braille.handler)
+		self.regions = [braille.TextRegion(text) for text in ("dialog", "list", "item")]
+		for region in self.regions:
+			region.update()
+		self.buffer.regions.extend(self.regions)
+		self.buffer.update()
+
+	def _assertSameAsFreshBuffer(self):
+		fresh = braille.BrailleBuffer(braille.handler)
+		fresh.regions.extend(self.regions)
+		fresh._collectRegions(list(fresh.visibleRegions))
+		self.assertEqual(self.buffer.rawText, fresh.rawText)
+		self.assertEqual(self.buffer.brailleCells, fresh.brailleCells)
+		self.assertEqual(self.buffer.rawToBraillePos, fresh.rawToBraillePos)
+		self.assertEqual(self.buffer.brailleToRawPos, fresh.brailleToRawPos)
+		self.assertEqual(list(self.buffer.regionsWithPositions), list(fresh.regionsWithPositions))
+
+	def test_unchangedRegionIsNotTranslated(self):
+		region = self.regions[1]
+		cells = region.brailleCells
+		region.update()
+		self.assertIs(region.brailleCells, cells)
+
+	def test_changedRegionIsSpliced(self):
+		for index, text in ((1, "list box"), (0, "dlg"), (2, "")):
+			region = self.regions[index]
+			region.rawText = text
+			region.update()
+			self.buffer.update()
+			self._assertSameAsFreshBuffer()
+
+	def test_cursorMove(self):
+		region = self.regions[2]
+		region.cursorPos = 1
+		region.update()
+		self.buffer.update()
+		self._assertSameAsFreshBuffer()
+		self.assertEqual(
+			self.buffer.cursorPos,
+			self.buffer.regionsWithPositions[2].start + region.brailleCursorPos
+		)
+
+	def test_regionWithoutBaseUpdate(self):
+		for inPlace in (False, True):
+			region = _LetterRegion("abc", inPlace=inPlace)
+			region.update()
+			self.regions.insert(1, region)
+			self.buffer.regions.insert(1, region)
+			self.buffer.update()
+			self._assertSameAsFreshBuffer()
+			for text in ("abcd", "xy", "xz"):
+				region.rawText = text
+				region.update()
+				self.buffer.update()
+				self._assertSameAsFreshBuffer()
+				start, end = self.buffer.regionsWithPositions[1][1:]
+				self.assertEqual(self.buffer.brailleCells[start:end], region.brailleCells)
@@ -0,0 +1,186 @@
+# A part of NonVisual Desktop Access (NVDA)
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2023 NV Access Limited
+
+"""Unit tests for the browseMode module.
+"""
+
+import random
+import unittest
+from typing import (
+	Iterator,
+	List,
+)
+
+from browseMode import (
+	_ElementsListFilter,
+	mergeQuickNavItemIterators,
+)
+
+from .benchmarkHelpers import (
+	benchmark,
+	reportTimes,
+)
+
+
+class _FakeQuickNavItem:
+	"""An item at a position in a document, which counts how often it is compared."""
+
+	comparisons = 0
+
+	def __init__(self, position: int, name: str):
+		self.position = position
+		self.name = name
+
+	def __lt__(self, other: "_FakeQuickNavItem") -> bool:
+		_FakeQuickNavItem.comparisons += 1
+		return self.position < other.position
+
+	def __repr__(self):
+		return f"{self.name}@{self.position}"
+
+
+def _mergeByFindingFirst(iterators: List[Iterator], direction: str = "next") -> Iterator:
+	"""Merges the iterators by finding the first of their current values for every value,
+	as L{mergeQuickNavItemIterators} did before it used a heap.
+	"""
+	finder = min if direction == "next" else max
+	curValues = []
+	for it in iterators:
+		try:
+			curValues.append((it, next(it)))
+		except StopIteration:
+			continue
+	while curValues:
+		first = finder(curValues, key=lambda x: x[1])
+		curValues.remove(first)
+		it, val = first
+		yield val
+		try:
+			curValues.append((it, next(it)))
+		except StopIteration:
+			continue
+
+
+class TestMergeQuickNavItemIterators(unittest.TestCase):
+
+	def _makeItemLists(self, rand: random.Random, iteratorCount: int, direction: str) -> List[List]:
+		itemLists = []
+		for i in range(iteratorCount):
+			positions = sorted(rand.randint(0, 20) for j in range(rand.randint(0, 10)))
+			if direction != "next":
+				positions.reverse()
+			itemLists.append([_FakeQuickNavItem(position, f"type{i}") for position in positions])
+		return itemLists
+
+	def test_sameAsFindingFirst(self):
+		rand = random.Random(0)
+		for trial in range(500):
+			direction = rand.choice(("next", "previous"))
+			itemLists = self._makeItemLists(rand, rand.randint(0, 6), direction)
+			merged = list(mergeQuickNavItemIterators([iter(items) for items in itemLists], direction))
+			expected = list(_mergeByFindingFirst([iter(items) for items in itemLists], direction))
+			# Equal items must also be yielded in the same order, so compare the items themselves.
+			self.assertEqual([id(item) for item in merged], [id(item) for item in expected], msg=repr(expected))
+
+	def test_fewerComparisons(self):
+		rand = random.Random(0)
+		itemLists = [
+			[_FakeQuickNavItem(rand.randint(0, 10000), f"type{i}") for j in range(100)]
+			for i in range(30)
+		]
+		for items in itemLists:
+			items.sort(key=lambda item: item.position)
+		_FakeQuickNavItem.comparisons = 0
+		list(_mergeByFindingFirst([iter(items) for items in itemLists]))
+		findingFirstComparisons = _FakeQuickNavItem.comparisons
+		_FakeQuickNavItem.comparisons = 0
+		list(mergeQuickNavItemIterators([iter(items) for items in itemLists]))
+		self.assertLess(_FakeQuickNavItem.comparisons * 2, findingFirstComparisons)
+
+
+class TestElementsListFilter(unittest.TestCase):
+
+	#: Filter texts as they are typed into the Elements List.
+	TYPED_FILTER_TEXTS = ("l", "li", "lin", "link", "link ", "link 9", "link 99", "link 999")
+
+	def _getMatchesByLowering(self, labels: List[str], filterText: str) -> List[int]:
+		"""Finds the matching elements by lowering every label, as the Elements List did before."""
+		filterText = filterText.lower()
+		return [index for index, label in enumerate(labels) if filterText in label.lower()]
+
+	def test_sameAsLowering(self):
+		rand = random.Random(0)
+		labels = ["".join(rand.choice("abAB ß") for i in range(rand.randint(0, 8))) for j in range(300)]
+		elementsFilter = _ElementsListFilter(labels)
+		filterText = ""
+		for keystroke in range(500):
+			if filterText and rand.random() < 0.3:
+				filterText = filterText[:-1]
+			elif rand.random() < 0.1:
+				filterText = rand.choice("abAB ß")
+			else:
+				filterText += rand.choice("abAB ß")
+			self.assertEqual(
+				elementsFilter.getMatches(filterText),
+				self._getMatchesByLowering(labels, filterText),
+				msg=repr(filterText)
+			)
+
+	def test_setLabel(self):
+		elementsFilter = _ElementsListFilter(["first", "second"])
+		self.assertEqual(elementsFilter.getMatches("s"), [0, 1])
+		self.assertEqual(elementsFilter.getMatches("sec"), [1])
+		elementsFilter.setLabel(0, "Secret")
+		self.assertEqual(elementsFilter.labels, ["Secret", "second"])
+		self.assertEqual(elementsFilter.getMatches("sec"), [0, 1])
+
+	def test_addLabels(self):
+		elementsFilter = _ElementsListFilter(["Home", "About"])
+		self.assertEqual(elementsFilter.getMatches("o"), [0, 1])
+		self.assertEqual(elementsFilter.getMatches("ho"), [0])
+		self.assertEqual(elementsFilter.addLabels(["Contact", "Shop", "Photos"]), [3, 4])
+		self.assertEqual(elementsFilter.labels, ["Home", "About", "Contact", "Shop", "Photos"])
+		self.assertEqual(elementsFilter.getMatches("hop"), [3])
+		self.assertEqual(elementsFilter.getMatches("o"), [0, 1, 2, 3, 4])
+
+	def _makeLargeLabels(self) -> List[str]:
+		"""Makes the labels of a very large Elements List."""
+		return [f"Link {i} to page number {i * 7}" for i in range(100000)]
+
+	def test_largeElementList(self):
+		labels = self._makeLargeLabels()
+		elementsFilter = _ElementsListFilter(labels)
+		for filterText in self.TYPED_FILTER_TEXTS:
+			self.assertEqual(
+				elementsFilter.getMatches(filterText),
+				self._getMatchesByLowering(labels, filterText),
+				msg=repr(filterText)
+			)
+
+	@benchmark
+	def test_largeElementListBenchmark(self):
+		"""Reports how long filtering a very large list takes as a filter is typed,
+		incrementally and by lowering every label,
+		as well as how long narrowing a filter takes once all labels have been lowered.
+		"""
+		labels = self._makeLargeLabels()
+
+		def filterByLowering():
+			for filterText in self.TYPED_FILTER_TEXTS:
+				self._getMatchesByLowering(labels, filterText)
+
+		def filterIncrementally():
+			elementsFilter = _ElementsListFilter(labels)
+			for filterText in self.TYPED_FILTER_TEXTS:
+				elementsFilter.getMatches(filterText)
+
+		reportTimes(self, 1, lowering=filterByLowering, incremental=filterIncrementally)
+		elementsFilter = _ElementsListFilter(labels)
+
+		def narrowFilter():
+			elementsFilter.getMatches("link 9")
+			elementsFilter.getMatches("link 99")
+
+		reportTimes(self, 1, narrowing=narrowFilter)
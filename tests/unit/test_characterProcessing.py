@@ -8,11 +8,18 @@
 
 import unittest
 import re
+from unittest import mock
+import characterProcessing
 from characterProcessing import SpeechSymbolProcessor
 from characterProcessing import SymbolLevel
 from characterProcessing import processSpeechSymbols as process
 from characterProcessing import processSpeechSymbol
 
+from .benchmarkHelpers import (
+	benchmark,
+	reportTimes,
+)
+
 
 class TestComplex(unittest.TestCase):
 	"""Test the complex symbols rules.
@@ -131,6 +138,115 @@ class TestComplex(unittest.TestCase):
 		self.assertEqual(replaced, "Le  03 barre oblique 04 barre oblique 05  point.")
 
 
+class TestProcessedSymbolsCache(unittest.TestCase):
+	"""Tests for the cache of text processed by processSpeechSymbols.
+	"""
+
+	def setUp(self):
+		characterProcessing._processedSymbolsCache.clear()
+
+	def test_repeatedTextIsCached(self):
+		cache = characterProcessing._processedSymbolsCache
+		misses = cache.misses
+		hits = cache.hits
+		first = process("en", "Hello, world!", SymbolLevel.ALL)
+		self.assertEqual(cache.misses, misses + 1)
+		second = process("en", "Hello, world!", SymbolLevel.ALL)
+		self.assertEqual(cache.hits, hits + 1)
+		self.assertEqual(first, second)
+
+	def test_levelIsPartOfKey(self):
+		self.assertNotEqual(
+			process("en", "Hello, world!", SymbolLevel.ALL),
+			process("en", "Hello, world!", SymbolLevel.NONE),
+		)
+
+	def test_clearSpeechSymbolsInvalidates(self):
+		cache = characterProcessing._processedSymbolsCache
+		process("en", "Hello, world!", SymbolLevel.ALL)
+		characterProcessing.clearSpeechSymbols()
+		misses = cache.misses
+		process("en", "Hello, world!", SymbolLevel.ALL)
+		self.assertEqual(cache.misses, misses + 1)
+
+
+#: Mixed real-world text, mostly plain words with some punctuation, numbers and symbols.
+MIXED_TEXT = (
+	"Inbox",
+	"Reply all",
+	"The quick brown fox jumps over the lazy dog",
+	"Click the Submit button to continue",
+	"Search results for NVDA screen reader",
+	"Meeting moved to 3.30 pm on 12/05/2023",
+	"It's -5 degrees outside; wear a coat!",
+	"Price: $19.99 (was $25)",
+	"user@example.com wrote:",
+	"Heading level 2 Getting started",
+	"link visited Home page",
+	"   indented line with trailing spaces   ",
+	"=====",
+	"Edit multi line",
+	"Downloads folder contains 42 items",
+)
+
+
+class TestPrescan(unittest.TestCase):
+	"""Tests that the pre-scan used by SpeechSymbolProcessor.processText doesn't change its output.
+	"""
+
+	def _processInFull(self, processor: SpeechSymbolProcessor, text: str, level: SymbolLevel) -> str:
+		processor._level = level
+		return processor._regexp.sub(processor._regexpRepl, text)
+
+	def test_sameAsFullProcessing(self):
+		for locale in ("en", "fr", "de"):
+			processor = SpeechSymbolProcessor(locale)
+			for level in characterProcessing.SPEECH_SYMBOL_LEVELS:
+				for text in MIXED_TEXT:
+					self.assertEqual(
+						processor.processText(text, level),
+						self._processInFull(processor, text, level),
+						msg=f"locale={locale}, level={level!r}, text={text!r}"
+					)
+
+	def test_plainTextIsPrescanned(self):
+		processor = SpeechSymbolProcessor("en")
+		prescan = processor._getPrescanRegexp(SymbolLevel.SOME)
+		self.assertIsNotNone(prescan)
+		self.assertIsNone(prescan.search("Click the Submit button to continue"))
+		self.assertIsNotNone(prescan.search("Price: $19.99"))
+		# Repeated spaces are collapsed, so they can't be skipped.
+		self.assertIsNotNone(prescan.search("a    b"))
+		self.assertIsNotNone(prescan.search("trailing spaces  "))
+
+	def test_fullExpressionSkipped(self):
+		processor = SpeechSymbolProcessor("en")
+		with mock.patch.object(processor, "_regexp", wraps=processor._regexp) as regexp:
+			text = "Click the Submit button to continue"
+			self.assertEqual(processor.processText(text, SymbolLevel.SOME), text)
+			regexp.sub.assert_not_called()
+			processor.processText("Price: $19.99", SymbolLevel.SOME)
+			regexp.sub.assert_called_once()
+
+	@benchmark
+	def test_benchmark(self):
+		"""Reports the throughput of processText on mixed real-world text,
+		with and without the pre-scan.
+		"""
+		processor = SpeechSymbolProcessor("en")
+		level = SymbolLevel.SOME
+
+		def processAll():
+			for text in MIXED_TEXT:
+				processor.processText(text, level)
+
+		def processAllInFull():
+			for text in MIXED_TEXT:
+				self._processInFull(processor, text, level)
+
+		reportTimes(self, 200, prescan=processAll, full=processAllInFull)
+
+
 # A character in CLDR file but not in symbol file
 CHAR_IN_CLDR_FILE = '☺'
 CHAR_IN_CLDR_FILE_DESC = 'smiling face'
@@ -41,6 +41,11 @@ from utils.displayString import (
 	DisplayStringEnum
 )
 
+from .benchmarkHelpers import (
+	benchmark,
+	reportTimes,
+)
+
 
 class Config_FeatureFlagEnums_getAvailableEnums(unittest.TestCase):
 
@@ -832,3 +837,60 @@ class Config_AggregatedSection_setitem(unittest.TestCase):
 		self.assertIs(self.testSection["foo"], defaultFlag)
 		self.testSection["foo"] = valueOfDefaultFlag
 		self.assertIs(self.testSection["foo"], valueOfDefaultFlag)
+
+
+class Config_ConfigManager_getSnapshot(unittest.TestCase):
+	def setUp(self):
+		self.manager = ConfigManager()
+
+	def test_snapshotMatchesSections(self):
+		snapshot = self.manager.getSnapshot()
+		self.assertEqual(snapshot[("braille", "translationTable")], self.manager["braille"]["translationTable"])
+		self.assertEqual(snapshot[("speech", "symbolLevel")], self.manager["speech"]["symbolLevel"])
+		self.assertNotIn(("general", "language"), snapshot)
+		with self.assertRaises(TypeError):
+			snapshot[("braille", "translationTable")] = "foo"
+
+	def test_snapshotReused(self):
+		self.assertIs(self.manager.getSnapshot(), self.manager.getSnapshot())
+
+	def test_writeUpdatesSnapshot(self):
+		oldSnapshot = self.manager.getSnapshot()
+		generation = self.manager.generation
+		newValue = not self.manager["braille"]["expandAtCursor"]
+		self.manager["braille"]["expandAtCursor"] = newValue
+		self.assertGreater(self.manager.generation, generation)
+		self.assertEqual(self.manager.getSnapshot()[("braille", "expandAtCursor")], newValue)
+		self.assertEqual(oldSnapshot[("braille", "expandAtCursor")], not newValue)
+
+	def test_profileSwitchUpdatesSnapshot(self):
+		self.manager.getSnapshot()
+		generation = self.manager.generation
+		profile = configobj.ConfigObj()
+		profile.name = "test"
+		profile.manual = True
+		profile["braille"] = {"expandAtCursor": str(not self.manager["braille"]["expandAtCursor"])}
+		self.manager.profiles.append(profile)
+		self.manager._handleProfileSwitch(shouldNotify=False)
+		self.assertGreater(self.manager.generation, generation)
+		self.assertEqual(
+			self.manager.getSnapshot()[("braille", "expandAtCursor")],
+			self.manager["braille"]["expandAtCursor"]
+		)
+
+	@benchmark
+	def test_readBenchmark(self):
+		"""Reports how long reading settings through the snapshot and descending through sections take."""
+		manager = self.manager
+		keyPaths = [("braille", "translationTable"), ("speech", "symbolLevel"), ("debugLog", "speechManager")]
+
+		def readSections():
+			for section, key in keyPaths:
+				manager[section][key]
+
+		def readSnapshot():
+			snapshot = manager.getSnapshot()
+			for keyPath in keyPaths:
+				snapshot[keyPath]
+
+		reportTimes(self, 10000, sections=readSections, snapshot=readSnapshot)
@@ -7,7 +7,10 @@
 """
 
 import unittest
-from .textProvider import CursorManager
+from unittest import mock
+
+import cursorManager
+from .textProvider import BasicTextInfo, CursorManager
 
 
 class TestMove(unittest.TestCase):
@@ -238,3 +241,19 @@ class TestSelectAll(unittest.TestCase):
 
 	def test_selectAllFromEnd(self):
 		self._selectAllTest(2) # Caret at "c"
+
+
+class TestFindText(unittest.TestCase):
+
+	def test_unsupportedOptions(self):
+		"""Searching with options which a TextInfo doesn't accept reports that they aren't supported."""
+		cm = CursorManager(text="abc")
+
+		def find(info, text, caseSensitive=False, reverse=False):
+			return False
+
+		with mock.patch.object(BasicTextInfo, "find", find):
+			with mock.patch.object(cursorManager.wx, "CallAfter") as callAfter:
+				cm.doFindText("b", wholeWord=True)
+		self.assertIn("not supported", callAfter.call_args[0][1])
+		self.assertEqual(cm.selectionOffsets, (0, 0))
@@ -0,0 +1,51 @@
+# A part of NonVisual Desktop Access (NVDA)
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2023 NV Access Limited
+
+"""Unit tests for the louisHelper module.
+"""
+
+import os
+import unittest
+
+import brailleTables
+import louis
+import louisHelper
+
+
+TABLE_LIST = [os.path.join(brailleTables.TABLES_DIR, "en-ueb-g1.ctb"), "braille-patterns.cti"]
+
+
+class TestTranslationCache(unittest.TestCase):
+
+	def setUp(self):
+		louisHelper.invalidateTranslationCache()
+
+	def test_repeatedTranslationIsCached(self):
+		cache = louisHelper._translationCache
+		hits = cache.hits
+		first = louisHelper.translate(TABLE_LIST, "Hello world", mode=louis.dotsIO)
+		second = louisHelper.translate(TABLE_LIST, "Hello world", mode=louis.dotsIO)
+		self.assertEqual(first, second)
+		self.assertEqual(cache.hits, hits + 1)
+
+	def test_resultsCanBeModified(self):
+		"""Callers such as Region.update mark the selection in the returned cells,
+		which must not affect later translations.
+		"""
+		cells = louisHelper.translate(TABLE_LIST, "abc", mode=louis.dotsIO)[0]
+		expected = list(cells)
+		cells[0] |= 0xC0
+		self.assertEqual(louisHelper.translate(TABLE_LIST, "abc", mode=louis.dotsIO)[0], expected)
+
+	def test_cursorPosIsPartOfKey(self):
+		withoutCursor = louisHelper.translate(TABLE_LIST, "abc", mode=louis.dotsIO)
+		withCursor = louisHelper.translate(TABLE_LIST, "abc", cursorPos=0, mode=louis.dotsIO)
+		self.assertIsNone(withoutCursor[3])
+		self.assertEqual(withCursor[3], 0)
+
+	def test_invalidate(self):
+		louisHelper.translate(TABLE_LIST, "abc", mode=louis.dotsIO)
+		louisHelper.invalidateTranslationCache()
+		self.assertEqual(len(louisHelper._translationCache), 0)
@@ -6,7 +6,14 @@
 """Unit tests for the nvwave module.
 """
 
+import random
 import unittest
+from ctypes import (
+	c_void_p,
+	cast,
+	create_string_buffer,
+)
+
 import nvwave
 from .extensionPointTestHelpers import deciderTester
 import os.path
@@ -29,3 +36,66 @@ class TestNVWaveExtensionPoints(unittest.TestCase):
 			**kwargs
 		):
 			nvwave.playWaveFile(**kwargs)
+
+
+class TestAudioRingBuffer(unittest.TestCase):
+
+	def test_writeAndTake(self):
+		buffer = nvwave._AudioRingBuffer(16)
+		self.assertEqual(len(buffer), 0)
+		self.assertEqual(bytes(buffer.take()), b"")
+		buffer.write(b"abc")
+		audio = create_string_buffer(b"defg", 4)
+		buffer.write(cast(audio, c_void_p), 4)
+		self.assertEqual(len(buffer), 7)
+		self.assertEqual(bytes(buffer.take()), b"abcdefg")
+		self.assertEqual(len(buffer), 0)
+
+	def test_clear(self):
+		buffer = nvwave._AudioRingBuffer(16)
+		buffer.write(b"abc")
+		buffer.clear()
+		self.assertFalse(buffer)
+		buffer.write(b"de")
+		self.assertEqual(bytes(buffer.take()), b"de")
+
+	def test_wrapAndGrow(self):
+		buffer = nvwave._AudioRingBuffer(8)
+		buffer.write(b"ab")
+		buffer.take()
+		buffer.write(b"cdefg")
+		playing = buffer.take()
+		# There is no room at the end, so the audio is written before the audio being played.
+		buffer.write(b"hi")
+		self.assertEqual(buffer.reallocations, 0)
+		self.assertEqual(bytes(playing), b"cdefg")
+		# There is no room left, so a larger buffer is allocated.
+		buffer.write(b"jk")
+		self.assertEqual(buffer.reallocations, 1)
+		self.assertEqual(bytes(playing), b"cdefg")
+		self.assertEqual(bytes(buffer.take()), b"hijk")
+
+	def test_takenAudioNotOverwritten(self):
+		rand = random.Random(0)
+		buffer = nvwave._AudioRingBuffer(64)
+		expected = b""
+		playing = buffer.take()
+		playingExpected = b""
+		for i in range(2000):
+			if rand.random() < 0.3:
+				playing = buffer.take()
+				self.assertEqual(bytes(playing), expected)
+				playingExpected = expected
+				expected = b""
+			elif rand.random() < 0.02:
+				buffer.clear()
+				expected = b""
+			else:
+				data = bytes(rand.randrange(256) for j in range(rand.randint(0, 40)))
+				buffer.write(data)
+				expected += data
+			# The device may still be playing the audio taken last.
+			self.assertEqual(bytes(playing), playingExpected)
+			self.assertEqual(len(buffer), len(expected))
+		# Audio is mostly moved rather than reallocated.
+		self.assertLess(buffer.reallocations, 5)
@@ -5,7 +5,10 @@
 
 """Unit tests for the orderedWinEventLimiter module.
 """
+import heapq
 import inspect
+import itertools
+import random
 import re
 import unittest
 from typing import List, Iterator, Callable
@@ -353,3 +356,85 @@ class TestOrderedWinEventLimiter(unittest.TestCase):
 		# Plus the last menu event.
 		#  All totalling 15.
 		self.assertEqual(len(windowIds), 15)
+
+
+class _ReferenceWinEventLimiter:
+	"""The limiting algorithm as it was before events were kept in order as they were added.
+	Events are sorted and merged with a heap on each flush.
+	"""
+
+	def __init__(self, maxFocusItems=4):
+		self.maxFocusItems = maxFocusItems
+		self._focusEventCache = {}
+		self._genericEventCache = {}
+		self._eventHeap = []
+		self._eventCounter = itertools.count()
+		self._lastMenuEvent = None
+
+	def addEvent(self, eventID, window, objectID, childID, threadID):
+		if eventID == winUser.EVENT_OBJECT_FOCUS:
+			if objectID in (winUser.OBJID_SYSMENU, winUser.OBJID_MENU) and childID == 0:
+				return False
+			self._focusEventCache[(eventID, window, objectID, childID, threadID)] = next(self._eventCounter)
+			return True
+		elif eventID == winUser.EVENT_SYSTEM_FOREGROUND:
+			self._focusEventCache.pop((winUser.EVENT_OBJECT_FOCUS, window, objectID, childID, threadID), None)
+			self._focusEventCache[(eventID, window, objectID, childID, threadID)] = next(self._eventCounter)
+		elif eventID == winUser.EVENT_OBJECT_SHOW:
+			self._genericEventCache.pop((winUser.EVENT_OBJECT_HIDE, window, objectID, childID, threadID), None)
+		elif eventID == winUser.EVENT_OBJECT_HIDE:
+			self._genericEventCache.pop((winUser.EVENT_OBJECT_SHOW, window, objectID, childID, threadID), None)
+		elif eventID in orderedWinEventLimiter.MENU_EVENTIDS:
+			self._lastMenuEvent = (next(self._eventCounter), eventID, window, objectID, childID, threadID)
+			return True
+		self._genericEventCache[(eventID, window, objectID, childID, threadID)] = next(self._eventCounter)
+		return True
+
+	def flushEvents(self, alwaysAllowedObjects=None):
+		threadCounters = {}
+		for k, v in sorted(self._genericEventCache.items(), key=lambda item: item[1], reverse=True):
+			threadCount = threadCounters.get(k[-1], 0)
+			threadCounters[k[-1]] = threadCount + 1
+			eventsForObjectAlwaysAllowed = alwaysAllowedObjects and k[1:-1] in alwaysAllowedObjects
+			if threadCount >= orderedWinEventLimiter.MAX_WINEVENTS_PER_THREAD and not eventsForObjectAlwaysAllowed:
+				continue
+			heapq.heappush(self._eventHeap, (v,) + k)
+		self._genericEventCache = {}
+		for k, v in sorted(self._focusEventCache.items(), key=lambda item: item[1])[0 - self.maxFocusItems:]:
+			heapq.heappush(self._eventHeap, (v,) + k)
+		self._focusEventCache = {}
+		if self._lastMenuEvent is not None:
+			heapq.heappush(self._eventHeap, self._lastMenuEvent)
+			self._lastMenuEvent = None
+		r = []
+		while self._eventHeap:
+			r.append(heapq.heappop(self._eventHeap)[1:-1])
+		return r
+
+
+class TestOrderedWinEventLimiterEquivalence(unittest.TestCase):
+	"""Compares the limiter with L{_ReferenceWinEventLimiter} on random sequences of events."""
+
+	def test_randomEvents(self):
+		rand = random.Random(0)
+		eventIDs = specialCaseEvents + nonSpecialCaseEvents[:4]
+		objectIDs = (winUser.OBJID_CLIENT, winUser.OBJID_MENU, winUser.OBJID_SYSMENU)
+		for trial in range(500):
+			maxFocusItems = rand.randint(0, 5)
+			limiter = OrderedWinEventLimiter(maxFocusItems=maxFocusItems)
+			reference = _ReferenceWinEventLimiter(maxFocusItems=maxFocusItems)
+			for flush in range(3):
+				for i in range(rand.randint(0, 60)):
+					event = (
+						rand.choice(eventIDs),
+						rand.randint(1, 4),  # window
+						rand.choice(objectIDs),
+						rand.randint(0, 3),  # childID
+						rand.randint(1, 3),  # threadID
+					)
+					self.assertEqual(limiter.addEvent(*event), reference.addEvent(*event))
+				alwaysAllowedObjects = [(1, winUser.OBJID_CLIENT, 0)] if rand.random() < 0.5 else None
+				self.assertEqual(
+					limiter.flushEvents(alwaysAllowedObjects),
+					reference.flushEvents(alwaysAllowedObjects)
+				)
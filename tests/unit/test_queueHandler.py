@@ -0,0 +1,67 @@
+# A part of NonVisual Desktop Access (NVDA)
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2023 NV Access Limited
+
+"""Unit tests for the queueHandler module.
+"""
+
+from queue import Empty
+import unittest
+from unittest import mock
+
+import queueHandler
+from queueHandler import CoalescingQueue
+
+
+class TestCoalescingQueue(unittest.TestCase):
+
+	def _getAll(self, queue: CoalescingQueue) -> list:
+		items = []
+		while True:
+			try:
+				items.append(queue.get_nowait())
+			except Empty:
+				return items
+
+	def test_fifo(self):
+		queue = CoalescingQueue()
+		for item in range(5):
+			queue.put_nowait(item)
+		self.assertEqual(queue.qsize(), 5)
+		self.assertEqual(self._getAll(queue), [0, 1, 2, 3, 4])
+		self.assertTrue(queue.empty())
+
+	def test_immediateFunctionsKeepOrder(self):
+		queue = CoalescingQueue()
+		with mock.patch.object(queueHandler.core, "requestPump") as requestPump:
+			queueHandler.queueFunction(queue, print, "event")
+			queueHandler.queueFunction(queue, print, "focus", _immediate=True)
+			queueHandler.queueFunction(queue, print, "script", _immediate=True)
+		self.assertEqual([item[1] for item in self._getAll(queue)], [("event",), ("focus",), ("script",)])
+		self.assertEqual(requestPump.call_args_list[1], mock.call(immediate=True))
+
+	def test_coalescing(self):
+		queue = CoalescingQueue()
+		self.assertFalse(queue.put_nowait("name1", coalescingKey="name"))
+		queue.put_nowait("other")
+		self.assertTrue(queue.put_nowait("name2", coalescingKey="name"))
+		self.assertTrue(queue.put_nowait("name3", coalescingKey="name"))
+		self.assertEqual(self._getAll(queue), ["other", "name3"])
+		self.assertEqual(queue.coalescedCount, 2)
+		self.assertEqual(queue.droppedCount, 2)
+		self.assertEqual(queue.maxDepth, 4)
+		# The key is no longer pending once its item has been fetched.
+		self.assertFalse(queue.put_nowait("name4", coalescingKey="name"))
+		self.assertEqual(self._getAll(queue), ["name4"])
+
+	def test_flushQueue(self):
+		queue = CoalescingQueue()
+		calls = []
+		queue.put_nowait((calls.append, ("a",), {}), coalescingKey="a")
+		queue.put_nowait((calls.append, ("b",), {}))
+		queue.put_nowait((calls.append, ("a2",), {}), coalescingKey="a")
+		queue.put_nowait((calls.append, ("c",), {}))
+		queueHandler.flushQueue(queue)
+		self.assertEqual(calls, ["b", "a2", "c"])
+		self.assertTrue(queue.empty())
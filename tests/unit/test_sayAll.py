@@ -0,0 +1,211 @@
+# A part of NonVisual Desktop Access (NVDA)
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2023 NV Access Limited
+
+"""Unit tests for the say all text readers in the speech.sayAll module.
+"""
+
+import unittest
+from typing import (
+	Dict,
+	Generator,
+	List,
+	Optional,
+	Tuple,
+)
+from unittest import mock
+
+import config
+import queueHandler
+import textInfos
+from speech import sayAll
+from speech.commands import CallbackCommand
+from speech.types import SpeechSequence
+from .textProvider import BasicTextProvider
+
+
+class _FakeSpeakTextInfoState:
+
+	def __init__(self, obj=None):
+		pass
+
+	def copy(self) -> "_FakeSpeakTextInfoState":
+		return _FakeSpeakTextInfoState()
+
+	def updateObj(self):
+		pass
+
+
+class _FakeSayAllHandler:
+	"""Replaces the say all handler, producing the text of every chunk as its speech."""
+
+	def __init__(self):
+		self.speechWithoutPausesInstance = self
+		self.sequences: List[Optional[SpeechSequence]] = []
+		self._makeSpeakTextInfoState = _FakeSpeakTextInfoState
+		#: The number of chunks whose speech has been generated.
+		self.generatedCount = 0
+
+	def _getTextInfoSpeech(self, info, unit, reason, useCache) -> Generator[SpeechSequence, None, None]:
+		self.generatedCount += 1
+		yield [info.text]
+
+	def speakWithoutPauses(self, sequence: Optional[SpeechSequence]) -> bool:
+		self.sequences.append(sequence)
+		return sequence is not None
+
+
+class _FakeTextReader(sayAll._TextReader):
+
+	def __init__(self, handler: _FakeSayAllHandler, obj: BasicTextProvider):
+		self._obj = obj
+		self.caretOffsets: List[Tuple[int, int]] = []
+		super().__init__(handler)
+
+	def getInitialTextInfo(self) -> textInfos.TextInfo:
+		return self._obj.makeTextInfo(textInfos.POSITION_FIRST)
+
+	def updateCaret(self, updater: textInfos.TextInfo) -> None:
+		self.caretOffsets.append(updater.offsets)
+
+
+class TestTextReaderReadAhead(unittest.TestCase):
+
+	def setUp(self):
+		self._oldReadAheadChunks = config.conf["speech"]["sayAllReadAheadChunks"]
+		self.handler = _FakeSayAllHandler()
+		self.generators: Dict[int, Generator] = {}
+		for patcher in (
+			mock.patch.object(sayAll, "SayAllHandler", self.handler),
+			mock.patch.object(queueHandler, "registerGeneratorObject", self._registerGenerator),
+			mock.patch.object(queueHandler, "cancelGeneratorObject", self.generators.pop),
+		):
+			patcher.start()
+			self.addCleanup(patcher.stop)
+
+	def tearDown(self):
+		config.conf["speech"]["sayAllReadAheadChunks"] = self._oldReadAheadChunks
+
+	def _registerGenerator(self, generator: Generator) -> int:
+		generatorID = len(self.generators) + 1
+		self.generators[generatorID] = generator
+		return generatorID
+
+	def _pump(self):
+		"""Runs every registered generator once, as a core cycle does."""
+		for generatorID, generator in list(self.generators.items()):
+			try:
+				next(generator)
+			except StopIteration:
+				del self.generators[generatorID]
+
+	def _readAll(self, text: str, readAheadChunks: int) -> Tuple[List[str], _FakeTextReader]:
+		"""Runs say all to the end of the text, pumping between every utterance.
+		@return: The text spoken and the reader.
+		"""
+		config.conf["speech"]["sayAllReadAheadChunks"] = readAheadChunks
+		self.handler.sequences.clear()
+		obj = BasicTextProvider(text=text)
+		reader = _FakeTextReader(self.handler, obj)
+		reader.nextLine()
+		spoken = []
+		spokenCount = 0
+		while spokenCount < len(self.handler.sequences):
+			self._pump()
+			sequence = self.handler.sequences[spokenCount]
+			spokenCount += 1
+			for item in sequence or ():
+				if isinstance(item, CallbackCommand):
+					item.run()
+				elif isinstance(item, str):
+					spoken.append(item)
+		return spoken, reader
+
+	def test_sameSpeechAsWithoutReadAhead(self):
+		text = "".join(f"line {i}\n" for i in range(20))
+		expectedSpoken, expectedReader = self._readAll(text, readAheadChunks=0)
+		self.assertEqual(expectedSpoken, [f"line {i}\n" for i in range(20)])
+		self.assertEqual((expectedReader.prefetchHits, expectedReader.maxPrefetchDepth), (0, 0))
+		for readAheadChunks in (1, 3, 10):
+			spoken, reader = self._readAll(text, readAheadChunks)
+			self.assertEqual(spoken, expectedSpoken)
+			self.assertEqual(reader.caretOffsets, expectedReader.caretOffsets)
+			# Say all was stopped once speech finished.
+			self.assertIsNone(reader.reader)
+			self.assertFalse(self.generators)
+			self.assertGreater(reader.prefetchHits, reader.prefetchMisses)
+			self.assertLessEqual(reader.maxPrefetchDepth, readAheadChunks)
+
+	def test_prefetchDepth(self):
+		config.conf["speech"]["sayAllReadAheadChunks"] = 3
+		obj = BasicTextProvider(text="".join(f"line {i}\n" for i in range(20)))
+		reader = _FakeTextReader(self.handler, obj)
+		reader.nextLine()
+		self.assertEqual(self.handler.generatedCount, 1)
+		self.assertEqual(len(self.generators), 1)
+		# One chunk is prepared for every core cycle until the read-ahead window is full.
+		for depth in range(1, 4):
+			self._pump()
+			self.assertEqual(len(reader._prefetchedChunks), depth)
+		self._pump()
+		self.assertFalse(self.generators)
+		self.assertEqual((self.handler.generatedCount, reader.maxPrefetchDepth), (4, 3))
+		# Only the first chunk has been spoken so far.
+		self.assertEqual(len(self.handler.sequences), 1)
+		reader.nextLine()
+		self.assertEqual((reader.prefetchHits, reader.prefetchMisses), (1, 1))
+		self.assertEqual(self.handler.sequences[1][1], "line 1\n")
+		self.assertEqual(len(self.generators), 1)
+		reader.stop()
+		self.assertFalse(self.generators)
+		self.assertFalse(reader._prefetchedChunks)
+
+	def test_prefetchRestartedAfterError(self):
+		config.conf["speech"]["sayAllReadAheadChunks"] = 3
+		obj = BasicTextProvider(text="".join(f"line {i}\n" for i in range(20)))
+		reader = _FakeTextReader(self.handler, obj)
+		reader.nextLine()
+		with mock.patch.object(self.handler, "_getTextInfoSpeech", side_effect=RuntimeError):
+			self._pump()
+		self.assertFalse(self.generators)
+		self.assertIsNone(reader._prefetchGeneratorID)
+		self.assertFalse(reader._prefetchedChunks)
+		reader.nextLine()
+		self.assertEqual(len(self.generators), 1)
+		self._pump()
+		self.assertEqual(len(reader._prefetchedChunks), 1)
+		reader.stop()
+
+	def test_sameSpeechAfterSpeechGenerationFails(self):
+		text = "".join(f"line {i}\n" for i in range(20))
+		getTextInfoSpeech = self.handler._getTextInfoSpeech
+		failedTexts = []
+
+		def failOnce(info, *args, **kwargs):
+			if info.text == "line 3\n" and not failedTexts:
+				failedTexts.append(info.text)
+				raise RuntimeError
+			return getTextInfoSpeech(info, *args, **kwargs)
+
+		with mock.patch.object(self.handler, "_getTextInfoSpeech", side_effect=failOnce):
+			spoken, reader = self._readAll(text, readAheadChunks=3)
+		self.assertEqual(failedTexts, ["line 3\n"])
+		# The chunk is read again once prefetching restarts.
+		self.assertEqual(spoken, [f"line {i}\n" for i in range(20)])
+		self.assertIsNone(reader.reader)
+
+	def test_endOfTextSpokenInOrder(self):
+		config.conf["speech"]["sayAllReadAheadChunks"] = 10
+		obj = BasicTextProvider(text="a\nb\n")
+		reader = _FakeTextReader(self.handler, obj)
+		reader.nextLine()
+		for i in range(5):
+			self._pump()
+		self.assertTrue(reader._prefetchedChunks[-1].isLast)
+		# The commands which finish say all are kept until the chunks before them are spoken.
+		self.assertEqual(len(self.handler.sequences), 1)
+		reader.nextLine()
+		reader.nextLine()
+		self.assertIsInstance(self.handler.sequences[-1][1], CallbackCommand)
+		self.assertEqual(len(self.handler.sequences), 3)
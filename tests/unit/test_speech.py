@@ -8,11 +8,22 @@
 import unittest
 import gettext
 import typing
+from typing import (
+	List,
+	Tuple,
+)
+from unittest import mock
 import config
+import controlTypes
+import textInfos
+from textInfos.offsets import Offsets
+import speech
 from speech import (
 	_getSpellingSpeechAddCharMode,
 	_getSpellingCharAddCapNotification,
 	_getSpellingSpeechWithoutCharMode,
+	GeneratorWithReturn,
+	getTextInfoSpeech,
 )
 from speech.commands import (
 	EndUtteranceCommand,
@@ -21,6 +32,10 @@ from speech.commands import (
 	BeepCommand,
 	LangChangeCommand
 )
+from .textProvider import (
+	BasicTextInfo,
+	BasicTextProvider,
+)
 
 
 class Test_getSpellingSpeechAddCharMode(unittest.TestCase):
@@ -347,3 +362,121 @@ class Test_getSpellingSpeechWithoutCharMode(unittest.TestCase):
 			beepForCapitals=False,
 		)
 		self.assertEqual(repr(list(output)), expected)
+
+
+class _CachingTextProvider(BasicTextProvider):
+	"""A text provider whose speech can be cached, as a virtual buffer's can."""
+	_cachesTextInfoSpeech = True
+
+
+class TestTextInfoSpeechCache(unittest.TestCase):
+
+	LINES = ((0, 6), (6, 13), (13, 19))
+
+	def setUp(self):
+		oldCacheSize = config.conf["speech"]["textInfoSpeechCacheSize"]
+		self.addCleanup(config.conf["speech"].__setitem__, "textInfoSpeechCacheSize", oldCacheSize)
+		self.addCleanup(speech.clearTextInfoSpeechCache)
+		speech.clearTextInfoSpeechCache()
+		self.fetchCount = 0
+		#: Called whenever text is fetched.
+		self.onFetch = None
+		patcher = mock.patch.object(
+			BasicTextInfo,
+			"getTextWithFields",
+			lambda info, formatConfig=None: self._getTextWithFields(info, formatConfig)
+		)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+
+	def _getTextWithFields(self, info: BasicTextInfo, formatConfig=None) -> textInfos.TextInfo.TextWithFieldsT:
+		"""Gets the text of a range, putting a link around lines which contain "link"."""
+		self.fetchCount += 1
+		if self.onFetch:
+			self.onFetch()
+		text = info.text
+		if "link" not in text:
+			return [text]
+		return [
+			textInfos.FieldCommand("controlStart", textInfos.ControlField(role=controlTypes.Role.LINK)),
+			text,
+			textInfos.FieldCommand("controlEnd", None),
+		]
+
+	def _read(self, obj: BasicTextProvider, offsets: Tuple[int, int], **kwargs) -> str:
+		speechGen = GeneratorWithReturn(getTextInfoSpeech(
+			obj.makeTextInfo(Offsets(*offsets)),
+			unit=textInfos.UNIT_LINE,
+			reason=controlTypes.OutputReason.CARET,
+			**kwargs
+		))
+		sequences = list(speechGen)
+		return repr((sequences, speechGen.returnValue))
+
+	def _readLines(self, cacheSize: int) -> List[str]:
+		"""Reads lines in an order which re-reads some lines with and without the same preceding line.
+		@return: The speech for every line, and the state of speakTextInfo after it.
+		"""
+		config.conf["speech"]["textInfoSpeechCacheSize"] = cacheSize
+		obj = _CachingTextProvider(text="plain\na link\nplain\n")
+		results = []
+		for line in (0, 1, 1, 0, 0, 2, 1, 1, 0, 1):
+			results.append(self._read(obj, self.LINES[line]))
+			state = obj._speakTextInfoState
+			results.append(repr((
+				state.controlFieldStackCache,
+				state.formatFieldAttributesCache,
+				state.indentationCache,
+			)))
+		return results
+
+	def test_sameSpeechAsWithoutCache(self):
+		expected = self._readLines(cacheSize=0)
+		uncachedFetchCount = self.fetchCount
+		self.fetchCount = 0
+		self.assertEqual(self._readLines(cacheSize=100), expected)
+		self.assertLess(self.fetchCount, uncachedFetchCount)
+		self.assertGreater(speech.speech._textInfoSpeechCache.hits, 0)
+
+	def test_clear(self):
+		config.conf["speech"]["textInfoSpeechCacheSize"] = 100
+		obj = _CachingTextProvider(text="plain\na link\nplain\n")
+		expected = self._read(obj, self.LINES[1], useCache=False)
+		self.assertEqual(self._read(obj, self.LINES[1], useCache=False), expected)
+		self.assertEqual(self.fetchCount, 1)
+		speech.clearTextInfoSpeechCache()
+		self.assertEqual(self._read(obj, self.LINES[1], useCache=False), expected)
+		self.assertEqual(self.fetchCount, 2)
+		# Speech generated while the cache is cleared isn't cached.
+		self.onFetch = speech.clearTextInfoSpeechCache
+		self._read(obj, self.LINES[0], useCache=False)
+		self.assertEqual(len(speech.speech._textInfoSpeechCache), 0)
+
+	def test_notCached(self):
+		config.conf["speech"]["textInfoSpeechCacheSize"] = 100
+		obj = _CachingTextProvider(text="plain\na link\nplain\n")
+		formatConfig = config.conf["documentFormatting"].copy()
+		for i in range(2):
+			self._read(obj, self.LINES[1], useCache=False, formatConfig=formatConfig)
+		self.assertEqual(self.fetchCount, 2)
+		config.conf["speech"]["textInfoSpeechCacheSize"] = 0
+		for i in range(2):
+			self._read(obj, self.LINES[1], useCache=False)
+		self.assertEqual(self.fetchCount, 4)
+
+	def test_onlyDocumentsWhichClearTheCache(self):
+		config.conf["speech"]["textInfoSpeechCacheSize"] = 100
+		# The cache isn't cleared when the text of this document changes.
+		obj = BasicTextProvider(text="plain\na link\nplain\n")
+		for i in range(2):
+			self._read(obj, self.LINES[1], useCache=False)
+		self.assertEqual(self.fetchCount, 2)
+		self.assertEqual(len(speech.speech._textInfoSpeechCache), 0)
+
+	def test_leastRecentlyUsedDiscarded(self):
+		config.conf["speech"]["textInfoSpeechCacheSize"] = 2
+		obj = _CachingTextProvider(text="plain\na link\nplain\n")
+		for line in (0, 1, 0, 2, 0, 1):
+			self._read(obj, self.LINES[line], useCache=False)
+		cache = speech.speech._textInfoSpeechCache
+		self.assertEqual((len(cache), cache.evictions, self.fetchCount), (2, 2, 4))
@@ -0,0 +1,162 @@
+# A part of NonVisual Desktop Access (NVDA)
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2023 NV Access Limited
+
+"""Unit tests for the speechDictHandler module.
+"""
+
+import random
+import unittest
+
+from speechDictHandler import (
+	ENTRY_TYPE_ANYWHERE,
+	ENTRY_TYPE_REGEXP,
+	ENTRY_TYPE_WORD,
+	SpeechDict,
+	SpeechDictEntry,
+)
+
+from .benchmarkHelpers import (
+	benchmark,
+	reportTimes,
+)
+
+
+def _subSequentially(speechDict: SpeechDict, text: str) -> str:
+	"""Applies every entry of the dictionary in turn, as the dictionary did before it was compiled."""
+	for entry in speechDict:
+		text = entry.sub(text)
+	return text
+
+
+class TestCompiledSpeechDict(unittest.TestCase):
+	"""Tests that the compiled dictionary gives the same output as applying the entries one after another.
+	"""
+
+	def _assertSameAsSequential(self, speechDict: SpeechDict, text: str):
+		self.assertEqual(speechDict.sub(text), _subSequentially(speechDict, text))
+
+	def test_chainedReplacements(self):
+		"""Replacements produced by an entry must be visible to later entries."""
+		speechDict = SpeechDict()
+		speechDict.append(SpeechDictEntry("a", "b", ""))
+		speechDict.append(SpeechDictEntry("b", "c", ""))
+		speechDict.append(SpeechDictEntry("cc", "dd", "", type=ENTRY_TYPE_WORD))
+		self.assertEqual(speechDict.sub("ab ba a"), "dd dd c")
+		self._assertSameAsSequential(speechDict, "ab ba a")
+
+	def test_overlappingPatterns(self):
+		speechDict = SpeechDict()
+		speechDict.append(SpeechDictEntry("Mr", "Mister", ""))
+		speechDict.append(SpeechDictEntry("Mrs", "Missus", ""))
+		speechDict.append(SpeechDictEntry("ster", "STER", "", caseSensitive=False))
+		for text in ("Mrs Smith", "Mr Smith", "mrs smith", "Mister"):
+			self._assertSameAsSequential(speechDict, text)
+
+	def test_wordBoundaries(self):
+		speechDict = SpeechDict()
+		speechDict.append(SpeechDictEntry("x", " ", ""))
+		speechDict.append(SpeechDictEntry("a", "word", "", type=ENTRY_TYPE_WORD))
+		self.assertEqual(speechDict.sub("xa"), " word")
+		self._assertSameAsSequential(speechDict, "xa ya a")
+
+	def test_regexpEntriesKeepTheirPosition(self):
+		speechDict = SpeechDict()
+		speechDict.append(SpeechDictEntry("cat", "dog", ""))
+		speechDict.append(SpeechDictEntry(r"(d)og", r"\1ig", "", type=ENTRY_TYPE_REGEXP))
+		speechDict.append(SpeechDictEntry("dig", "dug", "", type=ENTRY_TYPE_WORD))
+		self.assertEqual(speechDict.sub("cat"), "dug")
+
+	def test_backslashInLiteralReplacement(self):
+		speechDict = SpeechDict()
+		speechDict.append(SpeechDictEntry("slash", "\\1\\", ""))
+		self.assertEqual(speechDict.sub("a slash"), "a \\1\\")
+
+	def test_editingRebuildsCompiledEntries(self):
+		speechDict = SpeechDict()
+		speechDict.append(SpeechDictEntry("a", "b", ""))
+		self.assertEqual(speechDict.sub("a"), "b")
+		speechDict[0] = SpeechDictEntry("a", "c", "")
+		self.assertEqual(speechDict.sub("a"), "c")
+		speechDict.append(SpeechDictEntry("c", "d", ""))
+		self.assertEqual(speechDict.sub("a"), "d")
+		del speechDict[:]
+		self.assertEqual(speechDict.sub("a"), "a")
+		speechDict.extend([SpeechDictEntry("a", "e", "")])
+		self.assertEqual(speechDict.sub("a"), "e")
+
+	def test_invalidEntryIsRemoved(self):
+		speechDict = SpeechDict()
+		speechDict.append(SpeechDictEntry("a", "b", ""))
+		speechDict.append(SpeechDictEntry("(b)", r"\2", "", type=ENTRY_TYPE_REGEXP))
+		speechDict.append(SpeechDictEntry("b", "c", ""))
+		self.assertEqual(speechDict.sub("a"), "c")
+		self.assertEqual([entry.pattern for entry in speechDict], ["a", "b"])
+		self.assertEqual(speechDict.sub("a"), "c")
+
+	def test_randomDictionaries(self):
+		rand = random.Random(0)
+		alphabet = "abcAB .-1é"
+
+		def randomString(maxLength: int) -> str:
+			return "".join(rand.choice(alphabet) for i in range(rand.randint(1, maxLength)))
+
+		regexps = ("a+", r"(\w)b", "^a", "b$", r"\s+", "[A-Z]")
+		for trial in range(500):
+			speechDict = SpeechDict()
+			for i in range(rand.randint(0, 100)):
+				entryType = rand.choice((ENTRY_TYPE_ANYWHERE, ENTRY_TYPE_WORD, ENTRY_TYPE_REGEXP))
+				if entryType == ENTRY_TYPE_REGEXP:
+					pattern = rand.choice(regexps)
+					replacement = r"\1" if "(" in pattern else randomString(2)
+				else:
+					pattern = randomString(3)
+					replacement = randomString(3)
+				speechDict.append(SpeechDictEntry(
+					pattern,
+					replacement,
+					"",
+					caseSensitive=rand.random() < 0.5,
+					type=entryType
+				))
+			for i in range(5):
+				self._assertSameAsSequential(speechDict, randomString(30))
+
+
+class TestLargeCompiledSpeechDict(unittest.TestCase):
+	"""Compares the compiled dictionary with applying the entries one after another on a large dictionary.
+	"""
+
+	TEXT = (
+		"The quick brown fox jumps over the lazy dog, entry500 and then a few more words follow. "
+		"NVDA reads this sentence over and over again while the user navigates."
+	)
+
+	def _makeLargeDict(self, size: int) -> SpeechDict:
+		speechDict = SpeechDict()
+		for i in range(size):
+			speechDict.append(SpeechDictEntry(
+				f"entry{i}",
+				f"replacement {i}",
+				"",
+				caseSensitive=bool(i % 2),
+				type=ENTRY_TYPE_WORD if i % 3 else ENTRY_TYPE_ANYWHERE
+			))
+		return speechDict
+
+	def test_largeDictionary(self):
+		speechDict = self._makeLargeDict(1000)
+		expected = _subSequentially(speechDict, self.TEXT)
+		self.assertEqual(speechDict.sub(self.TEXT), expected)
+
+	@benchmark
+	def test_benchmark(self):
+		"""Reports how long the compiled dictionary and applying the entries one after another take."""
+		speechDict = self._makeLargeDict(1000)
+		reportTimes(
+			self,
+			20,
+			sequential=lambda: _subSequentially(speechDict, self.TEXT),
+			compiled=lambda: speechDict.sub(self.TEXT),
+		)
@@ -5,6 +5,7 @@
 
 """Unit tests for speech/manager module
 """
+import logging
 import unittest
 from typing import Optional, Callable
 
@@ -23,7 +24,9 @@ from speech.commands import (
 	_CancellableSpeechCommand,
 	CharacterModeCommand,
 	EndUtteranceCommand,
+	IndexCommand,
 )
+from speech.priorities import Spri
 from .speechManagerTestHarness import (
 	_IndexT,
 	ExpectedIndex,
@@ -1198,3 +1201,94 @@ class RegressionTests_withCancellableSpeechEnabled(RegressionTests):
 	def setUp(self):
 		super().setUp()
 		config.conf['featureFlag']['cancelExpiredFocusSpeech'] = 1  # yes
+
+
+class TestManagerPriorityQueue(unittest.TestCase):
+	"""Tests that pending sequences are found by index as they are added to and removed from the queue."""
+
+	def test_findIndex(self):
+		queue = speech.manager._ManagerPriorityQueue(Spri.NORMAL)
+		queue.extend([["a", IndexCommand(1)], [EndUtteranceCommand()], ["b", IndexCommand(2)]])
+		self.assertEqual(queue.findIndex(1), 0)
+		self.assertEqual(queue.findIndex(2), 2)
+		self.assertIsNone(queue.findIndex(3))
+		removed = queue.popFirst(2)
+		self.assertEqual(removed[0][0], "a")
+		self.assertIsInstance(removed[1][0], EndUtteranceCommand)
+		self.assertIsNone(queue.findIndex(1))
+		self.assertEqual(queue.findIndex(2), 0)
+		queue.extend([["c", IndexCommand(3)]])
+		self.assertEqual(queue.findIndex(3), 1)
+		queue.popFirst(2)
+		self.assertEqual(len(queue.pendingSequences), 0)
+		self.assertEqual(queue._sequenceNumbersByIndex, {})
+
+	def test_manySequences(self):
+		queue = speech.manager._ManagerPriorityQueue(Spri.NORMAL)
+		queue.extend([[str(index), IndexCommand(index)] for index in range(1, 5001)])
+		for index in range(1, 5001):
+			self.assertEqual(queue.findIndex(index), 0)
+			self.assertEqual(queue.popFirst()[0][0], str(index))
+
+
+class _ReprCountingText(str):
+	"""Text which counts how often it is converted to a string for a log message."""
+
+	reprCount = 0
+
+	def __repr__(self):
+		_ReprCountingText.reprCount += 1
+		return super().__repr__()
+
+	def __str__(self):
+		_ReprCountingText.reprCount += 1
+		return super().__str__()
+
+
+class TestLoggingOff(unittest.TestCase):
+	"""Tests that no log messages are built when speech manager logging is off."""
+
+	def setUp(self):
+		patcher = patch.object(speech.manager, "IS_UNIT_TEST_LOG_ENABLED", False)
+		patcher.start()
+		self.addCleanup(patcher.stop)
+		patcher = patch.object(speech.manager, "getSynth")
+		self.synth = patcher.start().return_value
+		self.addCleanup(patcher.stop)
+		self.manager = speech.manager.SpeechManager()
+		_ReprCountingText.reprCount = 0
+
+	def _speakAndReachIndexes(self, count: int):
+		for i in range(count):
+			self.manager.speak([_ReprCountingText("text"), PitchCommand(offset=10), "more"], Spri.NORMAL)
+			utterance = self.synth.speak.call_args[0][0]
+			self.manager._handleIndex(utterance[-1].index)
+
+	def test_noMessagesBuilt(self):
+		self._speakAndReachIndexes(10)
+		self.assertEqual(self.synth.speak.call_count, 10)
+		self.assertEqual(_ReprCountingText.reprCount, 0)
+
+	def _formatAllDebugRecords(self):
+		"""Log records are only formatted by handlers, so format every debug record that is logged."""
+		log = speech.manager.log
+		handler = logging.Handler()
+		handler.emit = handler.format
+		oldLevel = log.level
+		log.setLevel(logging.DEBUG)
+		log.addHandler(handler)
+		self.addCleanup(log.setLevel, oldLevel)
+		self.addCleanup(log.removeHandler, handler)
+
+	def test_argsNotFormattedWhenDebugDisabled(self):
+		self._formatAllDebugRecords()
+		arg = mock.Mock()
+		arg.__str__ = mock.Mock(return_value="arg")
+		arg.__repr__ = mock.Mock(return_value="arg")
+		with patch.object(speech.manager, "_isSpeechManagerDebugEnabled", return_value=False):
+			speech.manager._speechManagerDebug("%s %r", arg, arg)
+			speech.manager._speechManagerUnitTest("%s %r", arg, arg)
+			self._speakAndReachIndexes(10)
+		arg.__str__.assert_not_called()
+		arg.__repr__.assert_not_called()
+		self.assertEqual(_ReprCountingText.reprCount, 0)
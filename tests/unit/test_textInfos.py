@@ -7,10 +7,23 @@
 
 """Unit tests for the textInfos module, its submodules and classes."""
 
+import random
+import re
 import unittest
-from .textProvider import BasicTextProvider
+from unittest import mock
+from .textProvider import BasicTextInfo, BasicTextProvider
 import textInfos
-from textInfos.offsets import Offsets
+from textInfos.offsets import (
+	Offsets,
+	OffsetsTextInfo,
+	_LineIndex,
+	_SearchPattern,
+	_WordBoundaries,
+	findEndOfLine,
+	findEndOfWord,
+	findStartOfLine,
+	findStartOfWord,
+)
 
 class TestCharacterOffsets(unittest.TestCase):
 	"""
@@ -173,3 +186,287 @@ class TestEndpoints(unittest.TestCase):
 		self.assertEqual((ti1._startOffset, ti1._endOffset), (3, 3))
 		ti1.start = ti2.end
 		self.assertEqual((ti1._startOffset, ti1._endOffset), (5, 5))
+
+
+class TestLineIndex(unittest.TestCase):
+	"""Tests that lines are found with the line index exactly as they are found by searching the text."""
+
+	def _randomTexts(self):
+		rand = random.Random(0)
+		for trial in range(300):
+			yield "".join(rand.choice("ab\r\n\U0001f926") for i in range(rand.randint(0, 15)))
+
+	def test_sameAsSearching(self):
+		for text in self._randomTexts():
+			lineIndex = _LineIndex(text, isWide=False)
+			for offset in range(-len(text), len(text) + 3):
+				self.assertEqual(
+					lineIndex.findStartOfLine(offset),
+					findStartOfLine(text, offset),
+					msg=f"text={text!r}, offset={offset}"
+				)
+				self.assertEqual(
+					lineIndex.findEndOfLine(offset),
+					findEndOfLine(text, offset),
+					msg=f"text={text!r}, offset={offset}"
+				)
+
+	def _moveByLines(self, info: textInfos.TextInfo, direction: int, endPoint: str) -> tuple:
+		"""Moves and expands by line, returning the outcome.
+		Searching for lines in texts which mix carriage returns and new lines can fail,
+		in which case the exception is part of the outcome.
+		"""
+		try:
+			moved = info.move(textInfos.UNIT_LINE, direction, endPoint=endPoint)
+			offsets = info.offsets
+			info.expand(textInfos.UNIT_LINE)
+			return (moved, offsets, info.offsets)
+		except ValueError as e:
+			return (str(e),)
+
+	def test_moveByLinesSameAsSearching(self):
+		for text in self._randomTexts():
+			obj = BasicTextProvider(text=text)
+			storyLength = obj.makeTextInfo(textInfos.POSITION_ALL)._endOffset
+			for offset in range(storyLength):
+				for direction in (-3, -1, 1, 2, 5):
+					for endPoint in (None, "start", "end"):
+						indexed = obj.makeTextInfo(Offsets(offset, offset))
+						searched = obj.makeTextInfo(Offsets(offset, offset))
+						searched.useLineIndex = False
+						self.assertEqual(
+							self._moveByLines(indexed, direction, endPoint),
+							self._moveByLines(searched, direction, endPoint),
+							msg=f"text={text!r}, offset={offset}, direction={direction}, endPoint={endPoint}"
+						)
+
+	def test_unitIndexAndCount(self):
+		obj = BasicTextProvider(text="first\nsecond \U0001f926\nthird")
+		ti = obj.makeTextInfo(textInfos.POSITION_FIRST)
+		self.assertEqual(ti.unitCount(textInfos.UNIT_LINE), 3)
+		self.assertEqual(ti.unitIndex(textInfos.UNIT_LINE), 1)
+		self.assertEqual(ti.move(textInfos.UNIT_LINE, 2), 2)
+		self.assertEqual(ti.unitIndex(textInfos.UNIT_LINE), 3)
+		ti.expand(textInfos.UNIT_LINE)
+		self.assertEqual(ti.text, "third")
+		# Line numbers are not reported in format fields, as the base implementation doesn't provide them.
+		formatField, offsets = ti._getFormatFieldAndOffsets(ti._startOffset, {"reportLineNumber": True}, False)
+		self.assertNotIn("line-number", formatField)
+
+	def test_indexRebuiltWhenTextChanges(self):
+		obj = BasicTextProvider(text="a\nb")
+		ti = obj.makeTextInfo(textInfos.POSITION_FIRST)
+		self.assertEqual(ti.unitCount(textInfos.UNIT_LINE), 2)
+		obj.basicText = "a\nb\nc"
+		self.assertEqual(ti.unitCount(textInfos.UNIT_LINE), 3)
+
+
+def _findByReversing(text: str, inText: str, caseSensitive: bool, reverse: bool):
+	"""Finds text as L{textInfos.offsets.OffsetsTextInfo.find} did before it searched in place,
+	reversing both strings to search backwards.
+	"""
+	if reverse:
+		text = text[::-1]
+		inText = inText[::-1]
+	m = re.search(re.escape(text), inText, (0 if caseSensitive else re.IGNORECASE) | re.UNICODE)
+	if not m:
+		return None
+	return len(inText) - m.end() if reverse else m.start()
+
+
+class TestFind(unittest.TestCase):
+
+	def test_sameAsReversing(self):
+		rand = random.Random(0)
+		for trial in range(1000):
+			inText = "".join(rand.choice("abAB ") for i in range(rand.randint(0, 20)))
+			text = "".join(rand.choice("abAB ") for i in range(rand.randint(1, 3)))
+			caseSensitive = rand.choice((True, False))
+			pattern = _SearchPattern(text, caseSensitive, useRegex=False, wholeWord=False)
+			span = pattern.search(inText)
+			self.assertEqual(span[0] if span else None, _findByReversing(text, inText, caseSensitive, False))
+			span = pattern.searchBackward(inText)
+			self.assertEqual(span[0] if span else None, _findByReversing(text, inText, caseSensitive, True))
+
+	def test_searchBackwardInLargeText(self):
+		inText = "x" * 10000 + "needle" + "x" * 10000 + "needle" + "x" * 20000
+		pattern = _SearchPattern("needle", caseSensitive=False, useRegex=False, wholeWord=False)
+		self.assertEqual(pattern.searchBackward(inText), (20006, 20012))
+		self.assertEqual(pattern.searchBackward(inText, end=20010), (10000, 10006))
+		self.assertIsNone(pattern.searchBackward(inText, start=10001, end=20010))
+		# Overlapping matches are found backwards just as they are forwards.
+		pattern = _SearchPattern("aa", caseSensitive=False, useRegex=False, wholeWord=False)
+		self.assertEqual(pattern.searchBackward("b" + "a" * 9000), (8999, 9001))
+
+	def test_forwardAndBackward(self):
+		obj = BasicTextProvider(text="one Two one two")
+		ti = obj.makeTextInfo(textInfos.POSITION_FIRST)
+		self.assertTrue(ti.find("one"))
+		self.assertEqual(ti.offsets, (8, 8))
+		self.assertFalse(ti.find("one"))
+		self.assertTrue(ti.find("two", reverse=True))
+		self.assertEqual(ti.offsets, (4, 4))
+		self.assertTrue(ti.find("two", caseSensitive=True))
+		self.assertEqual(ti.offsets, (12, 12))
+
+	def test_wholeWord(self):
+		obj = BasicTextProvider(text="cat concat cat-like cats")
+		ti = obj.makeTextInfo(textInfos.POSITION_FIRST)
+		self.assertTrue(ti.find("cat", wholeWord=True))
+		self.assertEqual(ti.offsets, (11, 11))
+		self.assertFalse(ti.find("cat", wholeWord=True))
+		self.assertTrue(ti.find("cat", reverse=True, wholeWord=True))
+		self.assertEqual(ti.offsets, (0, 0))
+		# A match which ends where the search ends is only a whole word
+		# if the character after it isn't a word character.
+		ti = obj.makeTextInfo(Offsets(23, 23))
+		self.assertTrue(ti.find("cat", reverse=True, wholeWord=True))
+		self.assertEqual(ti.offsets, (11, 11))
+		# A match which starts where the search starts is only a whole word if it starts a word.
+		ti = obj.makeTextInfo(Offsets(6, 6))
+		self.assertTrue(ti.find("cat", wholeWord=True))
+		self.assertEqual(ti.offsets, (11, 11))
+
+	def test_regex(self):
+		obj = BasicTextProvider(text="call 555-1234 or 555-9876")
+		ti = obj.makeTextInfo(textInfos.POSITION_FIRST)
+		self.assertTrue(ti.find(r"\d{3}-\d{4}", useRegex=True))
+		self.assertEqual(ti.offsets, (5, 5))
+		self.assertTrue(ti.find(r"\d{3}-\d{4}", useRegex=True))
+		self.assertEqual(ti.offsets, (17, 17))
+		self.assertTrue(ti.find(r"\d{3}-\d{4}", useRegex=True, reverse=True))
+		self.assertEqual(ti.offsets, (5, 5))
+		# Without useRegex, regular expression syntax is searched for literally.
+		self.assertFalse(ti.find(r"\d{3}"))
+		with self.assertRaises(re.error):
+			ti.find("(", useRegex=True)
+
+	def test_emptyMatchesSkipped(self):
+		pattern = _SearchPattern("x*", caseSensitive=False, useRegex=True, wholeWord=False)
+		self.assertEqual(pattern.search("abxxc"), (2, 4))
+		self.assertEqual(pattern.searchBackward("abxxc", end=4), (3, 4))
+		self.assertIsNone(pattern.searchBackward("abc", end=2))
+		obj = BasicTextProvider(text="one two")
+		ti = obj.makeTextInfo(Offsets(3, 3))
+		# Finding an empty match would leave the position where it is.
+		self.assertFalse(ti.find(r"\b", useRegex=True, reverse=True))
+		self.assertEqual(ti.offsets, (3, 3))
+		self.assertFalse(ti.find(r"(?=t)", useRegex=True))
+
+	def test_surrogatePairs(self):
+		obj = BasicTextProvider(text="\U0001f926a\U0001f926b\U0001f926a")
+		ti = obj.makeTextInfo(textInfos.POSITION_FIRST)
+		self.assertTrue(ti.find("a"))
+		self.assertEqual(ti.offsets, (2, 2))
+		self.assertTrue(ti.find("a"))
+		self.assertEqual(ti.offsets, (8, 8))
+		self.assertTrue(ti.find("b", reverse=True))
+		self.assertEqual(ti.offsets, (5, 5))
+		ti.expand(textInfos.UNIT_CHARACTER)
+		self.assertEqual(ti.text, "b")
+
+
+class TestWordBoundaries(unittest.TestCase):
+	"""Tests that words are found with word boundaries exactly as they are found by searching the text."""
+
+	#: Characters of every unicode category, and characters which are white space but not in category Z.
+	CHARS = (
+		"aZ\u01c5\u02b0\u05d0"  # Letters: Ll, Lu, Lt, Lm, Lo
+		"\u0301\u0903\u20dd"  # Marks: Mn, Mc, Me
+		"7\u2162\u00bd"  # Numbers: Nd, Nl, No
+		"_-()\u00ab\u00bb!"  # Punctuation: Pc, Pd, Ps, Pe, Pi, Pf, Po
+		"+$^\u00a9"  # Symbols: Sm, Sc, Sk, So
+		" \u2028\u2029\u3000"  # Separators: Zs, Zl, Zp
+		"\t\x00\u200b\ue000\U0001f926"  # Other: Cc, Cf, Co and a character outside the BMP
+	)
+
+	def test_sameAsSearching(self):
+		rand = random.Random(0)
+		for trial in range(2000):
+			text = "".join(rand.choice(self.CHARS) for i in range(rand.randint(0, 15)))
+			wordBoundaries = _WordBoundaries(text)
+			for offset in range(-len(text), len(text) + 3):
+				self.assertEqual(
+					wordBoundaries.findStartOfWord(offset),
+					findStartOfWord(text, offset),
+					msg=f"text={text!r}, offset={offset}"
+				)
+				self.assertEqual(
+					wordBoundaries.findEndOfWord(offset),
+					findEndOfWord(text, offset),
+					msg=f"text={text!r}, offset={offset}"
+				)
+
+	def test_moveByWord(self):
+		obj = BasicTextProvider(text="caf\u0065\u0301, na\U0001f926ve  text")
+		ti = obj.makeTextInfo(textInfos.POSITION_FIRST)
+		ti.expand(textInfos.UNIT_WORD)
+		self.assertEqual(ti.text, "caf\u0065\u0301")
+		words = [ti.text]
+		while ti.move(textInfos.UNIT_WORD, 1):
+			ti.expand(textInfos.UNIT_WORD)
+			words.append(ti.text)
+		self.assertEqual(words, ["caf\u0065\u0301", ", ", "na", "\U0001f926", "ve  ", "text"])
+
+
+class _SteppingTextInfo(BasicTextInfo):
+	"""A TextInfo which moves by getting the offsets of every unit one at a time."""
+
+	def _getUnitOffsetsBatch(self, unit, offset, count):
+		return None
+
+
+class TestMoveBatch(unittest.TestCase):
+	"""Tests that moving over several units at once has exactly the same result as moving one unit at a time."""
+
+	def _move(self, info: textInfos.TextInfo, unit: str, direction: int, endPoint: str) -> tuple:
+		try:
+			return (info.move(unit, direction, endPoint=endPoint), info.offsets)
+		except ValueError as e:
+			return (str(e),)
+
+	def _assertSameAsStepping(self, text: str, unit: str):
+		obj = BasicTextProvider(text=text)
+		storyLength = obj.makeTextInfo(textInfos.POSITION_ALL)._endOffset
+		for offset in range(storyLength + 2):
+			for direction in (-50, -3, -1, 1, 2, 50):
+				for endPoint in (None, "start", "end"):
+					batched = obj.makeTextInfo(Offsets(offset, offset))
+					stepping = _SteppingTextInfo(obj, Offsets(offset, offset))
+					self.assertEqual(
+						self._move(batched, unit, direction, endPoint),
+						self._move(stepping, unit, direction, endPoint),
+						msg=f"text={text!r}, offset={offset}, direction={direction}, endPoint={endPoint}"
+					)
+
+	def test_charactersSameAsStepping(self):
+		rand = random.Random(0)
+		for trial in range(50):
+			text = "".join(rand.choice("ab \n") for i in range(rand.randint(0, 15)))
+			self._assertSameAsStepping(text, textInfos.UNIT_CHARACTER)
+		self._assertSameAsStepping("a\U0001f926b", textInfos.UNIT_CHARACTER)
+
+	def test_linesSameAsStepping(self):
+		rand = random.Random(0)
+		for trial in range(200):
+			text = "".join(rand.choice("ab\r\n\U0001f926") for i in range(rand.randint(0, 15)))
+			self._assertSameAsStepping(text, textInfos.UNIT_LINE)
+
+	def test_unitOffsetsNotFetchedForEveryUnit(self):
+		obj = BasicTextProvider(text="line\n" * 2000)
+		with mock.patch.object(
+			OffsetsTextInfo,
+			"_getUnitOffsets",
+			autospec=True,
+			side_effect=OffsetsTextInfo._getUnitOffsets
+		) as getUnitOffsets:
+			ti = obj.makeTextInfo(textInfos.POSITION_FIRST)
+			self.assertEqual(ti.move(textInfos.UNIT_CHARACTER, 5000), 5000)
+			self.assertEqual(ti.offsets, (5000, 5000))
+			self.assertEqual(ti.move(textInfos.UNIT_LINE, 999), 999)
+			self.assertEqual(ti.offsets, (9995, 9995))
+			# Moving past the end of the last line fails.
+			self.assertEqual(ti.move(textInfos.UNIT_LINE, 2), 0)
+			self.assertEqual(ti.move(textInfos.UNIT_LINE, -1500), -1500)
+			self.assertEqual(ti.offsets, (2495, 2495))
+			self.assertEqual(getUnitOffsets.call_count, 0)
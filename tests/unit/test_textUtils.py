@@ -7,9 +7,15 @@
 
 """Unit tests for the textUtils module."""
 
+import random
 import unittest
 from textUtils import WideStringOffsetConverter
 
+from .benchmarkHelpers import (
+	benchmark,
+	reportTimes,
+)
+
 FACE_PALM = u"\U0001f926" # 🤦
 SMILE = u"\U0001f60a" # 😊
 THUMBS_UP = u"\U0001f44d" # 👍
@@ -229,3 +235,122 @@ class TestEdgeCases(unittest.TestCase):
 		self.assertRaises(IndexError, converter.strToWideOffsets, -1, 0, raiseOnError=True)
 		self.assertRaises(IndexError, converter.strToWideOffsets, 0, 4, raiseOnError=True)
 		self.assertRaises(ValueError, converter.strToWideOffsets, 1, 0)
+
+
+def _clamp(offset: int, length: int) -> int:
+	return max(0, min(offset, length))
+
+
+class TestOffsetIndex(unittest.TestCase):
+	"""
+	Compares converting offsets using the index of characters outside the basic multilingual plane
+	with converting them by encoding and decoding the string.
+	"""
+
+	TEXTS = (
+		"",
+		"abc",
+		FACE_PALM,
+		FACE_PALM + SMILE + THUMBS_UP,
+		u"a" + FACE_PALM + u"b",
+		SMILE + u"ab" + THUMBS_UP + u"c" + FACE_PALM,
+		# Surrogate characters in the str itself.
+		u"a" + u"\ud83e" + FACE_PALM + u"\udd26" + u"b",
+		u"\udd26a\ud83e",
+	)
+
+	def _assertSameAsEncoding(self, text: str):
+		converter = WideStringOffsetConverter(text=text)
+		strLength = converter.strLength
+		for start in range(-1, strLength + 2):
+			for end in range(start, strLength + 2):
+				self.assertEqual(
+					converter.strToWideOffsets(start, end),
+					converter._strToWideOffsetsByEncoding(_clamp(start, strLength), _clamp(end, strLength)),
+					msg=f"text={text!r}, start={start}, end={end}"
+				)
+		wideStringLength = converter.wideStringLength
+		for start in range(-1, wideStringLength + 2):
+			for end in range(start, wideStringLength + 2):
+				if 0 == _clamp(start, wideStringLength) == _clamp(end, wideStringLength):
+					# Handled before the offsets are converted.
+					continue
+				self.assertEqual(
+					converter.wideToStrOffsets(start, end),
+					converter._wideToStrOffsetsByDecoding(
+						_clamp(start, wideStringLength),
+						_clamp(end, wideStringLength)
+					),
+					msg=f"text={text!r}, start={start}, end={end}"
+				)
+
+	def test_texts(self):
+		for text in self.TEXTS:
+			self._assertSameAsEncoding(text)
+
+	def test_allShortTexts(self):
+		"""Every text of up to four characters, mixing characters in and outside the basic multilingual plane.
+		"""
+		alphabet = (u"a", FACE_PALM, SMILE)
+		texts = [u""]
+		for length in range(4):
+			texts = [text + char for text in texts for char in alphabet]
+			for text in texts:
+				self._assertSameAsEncoding(text)
+
+	def test_randomTexts(self):
+		rand = random.Random(0)
+		alphabet = (u"a", u"b", u" ", FACE_PALM, SMILE, THUMBS_UP)
+		for trial in range(200):
+			self._assertSameAsEncoding("".join(rand.choice(alphabet) for i in range(rand.randint(0, 20))))
+
+	#: Texts of about 1 MB, with and without surrogate pairs.
+	LARGE_TEXTS = (
+		(u"Some words " + FACE_PALM) * (1024 * 1024 // 12),
+		u"Some words without emoji " * (1024 * 1024 // 25),
+	)
+
+	def _getOffsetsNearEnd(self, converter: WideStringOffsetConverter):
+		"""Gets string and wide string offsets near the end of the text of a converter."""
+		strOffsets = [converter.strLength - i * 100 for i in range(1, 21)]
+		wideOffsets = [converter.wideStringLength - i * 100 for i in range(1, 21)]
+		return strOffsets, wideOffsets
+
+	def test_largeTexts(self):
+		"""Compares converting offsets near the end of 1 MB texts with encoding and decoding the string."""
+		for text in self.LARGE_TEXTS:
+			converter = WideStringOffsetConverter(text=text)
+			strOffsets, wideOffsets = self._getOffsetsNearEnd(converter)
+			for offset in strOffsets:
+				self.assertEqual(
+					converter.strToWideOffsets(offset, offset + 10),
+					converter._strToWideOffsetsByEncoding(offset, offset + 10)
+				)
+			for offset in wideOffsets:
+				self.assertEqual(
+					converter.wideToStrOffsets(offset, offset + 10),
+					converter._wideToStrOffsetsByDecoding(offset, offset + 10)
+				)
+
+	@benchmark
+	def test_largeTextBenchmark(self):
+		"""Reports how long converting offsets near the end of 1 MB texts takes,
+		with the index and by encoding and decoding the string.
+		"""
+		for text in self.LARGE_TEXTS:
+			converter = WideStringOffsetConverter(text=text)
+			strOffsets, wideOffsets = self._getOffsetsNearEnd(converter)
+
+			def convertWithIndex():
+				for offset in strOffsets:
+					converter.strToWideOffsets(offset, offset + 10)
+				for offset in wideOffsets:
+					converter.wideToStrOffsets(offset, offset + 10)
+
+			def convertByEncoding():
+				for offset in strOffsets:
+					converter._strToWideOffsetsByEncoding(offset, offset + 10)
+				for offset in wideOffsets:
+					converter._wideToStrOffsetsByDecoding(offset, offset + 10)
+
+			reportTimes(self, 5, index=convertWithIndex, encoding=convertByEncoding)
@@ -0,0 +1,44 @@
+# A part of NonVisual Desktop Access (NVDA)
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2023 NV Access Limited.
+
+"""Unit tests for the lruCache submodule.
+"""
+
+import unittest
+
+from utils.lruCache import LRUCache
+
+
+class Test_LRUCache(unittest.TestCase):
+
+	def test_leastRecentlyUsedIsDiscarded(self):
+		cache = LRUCache(maxSize=2)
+		cache.set("a", 1)
+		cache.set("b", 2)
+		cache.get("a")
+		cache.set("c", 3)
+		self.assertEqual(len(cache), 2)
+		self.assertEqual(cache.get("a"), 1)
+		self.assertIsNone(cache.get("b"))
+		self.assertEqual(cache.get("c"), 3)
+
+	def test_hitRate(self):
+		cache = LRUCache(maxSize=2)
+		self.assertEqual(cache.hitRate, 0.0)
+		cache.set("a", 1)
+		cache.get("a")
+		cache.get("b")
+		self.assertEqual(cache.hits, 1)
+		self.assertEqual(cache.misses, 1)
+		self.assertEqual(cache.hitRate, 0.5)
+
+	def test_clear(self):
+		cache = LRUCache(maxSize=2)
+		cache.set("a", 1)
+		cache.get("a")
+		cache.clear()
+		self.assertEqual(len(cache), 0)
+		self.assertIsNone(cache.get("a"))
+		self.assertEqual(cache.hits, 1)
@@ -0,0 +1,74 @@
+# A part of NonVisual Desktop Access (NVDA)
+# This file is covered by the GNU General Public License.
+# See the file COPYING for more details.
+# Copyright (C) 2023 NV Access Limited
+
+"""Unit tests for the virtualBuffers module.
+"""
+
+import unittest
+
+import config
+import textInfos
+from virtualBuffers import FieldsCache
+
+
+def _makeCommands(text: str) -> textInfos.TextInfo.TextWithFieldsT:
+	return [
+		textInfos.FieldCommand("controlStart", textInfos.ControlField(role="link", states={"focusable"})),
+		text,
+		textInfos.FieldCommand("controlEnd", None),
+	]
+
+
+class TestFieldsCache(unittest.TestCase):
+
+	def setUp(self):
+		self._oldMaxSize = config.conf["virtualBuffers"]["maxFieldsCacheSize"]
+		config.conf["virtualBuffers"]["maxFieldsCacheSize"] = 100
+
+	def tearDown(self):
+		config.conf["virtualBuffers"]["maxFieldsCacheSize"] = self._oldMaxSize
+
+	def test_getReturnsCopy(self):
+		cache = FieldsCache()
+		commands = _makeCommands("a")
+		cache.set(0, 1, commands, size=10, generation=cache.generation)
+		commands[0].field["role"] = "changed"
+		cached = cache.get(0, 1)
+		self.assertEqual(cached[0].field, {"role": "link", "states": {"focusable"}})
+		self.assertIsInstance(cached[0].field, textInfos.ControlField)
+		cached[0].field["role"] = "changed"
+		self.assertEqual(cache.get(0, 1)[0].field["role"], "link")
+		self.assertEqual((cache.hits, cache.misses), (2, 0))
+		self.assertIsNone(cache.get(0, 2))
+		self.assertEqual(cache.misses, 1)
+
+	def test_leastRecentlyUsedDiscarded(self):
+		cache = FieldsCache()
+		cache.set(0, 1, _makeCommands("a"), size=40, generation=cache.generation)
+		cache.set(1, 2, _makeCommands("b"), size=40, generation=cache.generation)
+		cache.get(0, 1)
+		cache.set(2, 3, _makeCommands("c"), size=40, generation=cache.generation)
+		self.assertEqual(cache.size, 80)
+		self.assertEqual(cache.evictions, 1)
+		self.assertIsNotNone(cache.get(0, 1))
+		self.assertIsNone(cache.get(1, 2))
+		self.assertIsNotNone(cache.get(2, 3))
+		# Ranges larger than the maximum size aren't cached at all.
+		cache.set(3, 4, _makeCommands("d"), size=101, generation=cache.generation)
+		self.assertIsNone(cache.get(3, 4))
+		self.assertEqual(len(cache), 2)
+
+	def test_clear(self):
+		cache = FieldsCache()
+		generation = cache.generation
+		cache.set(0, 1, _makeCommands("a"), size=10, generation=generation)
+		cache.clear()
+		self.assertIsNone(cache.get(0, 1))
+		self.assertEqual((cache.size, cache.invalidations), (0, 1))
+		# Fields fetched before the cache was cleared are out of date.
+		cache.set(0, 1, _makeCommands("a"), size=10, generation=generation)
+		self.assertIsNone(cache.get(0, 1))
+		cache.set(0, 1, _makeCommands("b"), size=10, generation=cache.generation)
+		self.assertEqual(cache.get(0, 1)[1], "b")